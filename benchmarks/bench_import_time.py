@@ -0,0 +1,95 @@
+"""
+Import-time benchmark: how long a fresh interpreter takes to start each
+entry point, and which packages dominate the import of a module.
+
+Run from the repository root:
+    python benchmarks/bench_import_time.py --runs 5
+    python benchmarks/bench_import_time.py --top evaluator
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+SRC = os.path.join(ROOT, "src")
+MODULES = ("main", "config_helper", "dry_run", "questions", "sharding", "evaluator")
+
+
+def wall_time(args, runs):
+    """
+    Returns the median wall time in seconds of running args in a fresh process.
+    """
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(args, cwd=ROOT, env=dict(os.environ, PYTHONPATH=SRC), capture_output=True, check=False)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def write_dry_run_configs(config_dir):
+    configs = {
+        "questions.json": {"questions": [{"id": f"q{i}", "question": f"Question {i}", "ground_truth": "A"} for i in range(1000)]},
+        "kg_config.json": {"neo4j_uri": "neo4j://localhost:7687", "neo4j_user": "neo4j", "neo4j_password": "password"},
+        "test_config.json": {
+            "retrieverLLM": {"model": "gpt-4o"},
+            "evaluatorLLM": {"model": "gpt-4o"},
+            "metrics": ["Faithfulness", "RougeScore"],
+            "retrievers": [{"name": "vector", "type": "vectorRetriever", "params": {"index_name": "chunks"}}],
+        },
+    }
+    for name, data in configs.items():
+        with open(os.path.join(config_dir, name), "w") as f:
+            json.dump(data, f)
+
+
+def top_imports(module, count):
+    """
+    Returns the count slowest top-level packages imported by module, by
+    cumulative microseconds reported by python -X importtime.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=dict(os.environ, PYTHONPATH=SRC), capture_output=True, text=True,
+    )
+    packages = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        # Top-level entries are not indented
+        if not name.startswith(" ") and "." not in name:
+            packages[name] = packages.get(name, 0) + int(cumulative)
+    return sorted(packages.items(), key=lambda item: item[1], reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup and import time of the evaluation entry points")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", default=None, help="Also list the slowest packages imported by this module")
+    args = parser.parse_args()
+
+    baseline = wall_time([sys.executable, "-c", "pass"], args.runs)
+    print(f"{'interpreter startup':<32} {baseline:6.2f}s")
+    for module in MODULES:
+        print(f"{'import ' + module:<32} {wall_time([sys.executable, '-c', f'import {module}'], args.runs):6.2f}s")
+    print(f"{'main.py --help':<32} {wall_time([sys.executable, 'src/main.py', '--help'], args.runs):6.2f}s")
+    with tempfile.TemporaryDirectory() as config_dir:
+        write_dry_run_configs(config_dir)
+        dry_run = [sys.executable, "src/main.py", "-q", "questions.json", "-k", "kg_config.json", "-t", "test_config.json",
+                   "-c", config_dir, "-o", config_dir, "-p", "bench", "--dry-run"]
+        print(f"{'main.py --dry-run (1000 q)':<32} {wall_time(dry_run, args.runs):6.2f}s")
+
+    if args.top:
+        print(f"\nSlowest packages imported by {args.top}:")
+        for name, microseconds in top_imports(args.top, 10):
+            print(f"  {name:<28} {microseconds / 1e6:6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
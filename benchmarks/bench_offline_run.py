@@ -0,0 +1,246 @@
+"""
+End-to-end benchmark of Evaluator.run_evaluation with no network: OpenAI and
+Neo4j are replaced by the deterministic stand-ins in offline_stubs.py, which
+sleep for a configurable latency per call. For each workload size a fresh
+process loads a synthetic questions file, runs the evaluation and reports
+throughput (question/retriever pairs per second), where the time went per
+stage, the harness overhead on top of the simulated latencies and the peak
+RSS.
+
+Run from the repository root:
+    python benchmarks/bench_offline_run.py --sizes 10,100,1000
+    python benchmarks/bench_offline_run.py --sizes 10000 --config my_settings.json --output bench.json
+
+--config takes a JSON object merged into the test config, e.g.
+{"concurrency": {"retrieval": 8, "evaluation": 4}, "scoring": {"batch_size": 50}}
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC)
+
+from offline_stubs import DEFAULT_SETTINGS
+
+RETRIEVERS = {
+    "vectorRetriever": {"index_name": "chunk_embeddings", "return_properties": ["text"]},
+    "vectorCypherRetriever": {
+        "index_name": "chunk_embeddings",
+        "retrieval_query": "OPTIONAL MATCH (e:__Entity__)-[:FROM_CHUNK]->(node) "
+                           "RETURN node {.text, .name, .description} AS startNode, 'MENTIONS' AS relationship, e {.name} AS endNode",
+    },
+    "text2CypherRetriever": {},
+}
+# Spans inside "rag" whose time is spent in a stand-in rather than in the harness
+STUB_SPANS = ("embed", "neo4j.query", "llm.generate")
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        # Not available on Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def write_workload(directory, questions, retriever_types, metrics, config_overrides):
+    """
+    Writes the questions, KG and test config files of a synthetic run and
+    returns the config_arg main would pass to Evaluator.get_evaluator.
+    """
+    with open(os.path.join(directory, "questions.json"), "w") as f:
+        json.dump({"questions": [
+            {"id": f"q{i}", "question": f"What does entity {i} connect to?", "ground_truth": f"Entity {i} connects to entity {i + 1}."}
+            for i in range(questions)
+        ]}, f)
+    with open(os.path.join(directory, "kg_config.json"), "w") as f:
+        json.dump({"name": "offline", "neo4j_uri": "neo4j://offline:7687", "neo4j_user": "neo4j", "neo4j_password": "offline"}, f)
+    config = {
+        "retrieverLLM": {"model": "stub-llm"},
+        "evaluatorLLM": {"model": "stub-judge"},
+        "retrievers": [
+            {"name": retriever_type, "type": retriever_type, "params": dict(RETRIEVERS[retriever_type])}
+            for retriever_type in retriever_types
+        ],
+        "metrics": metrics,
+    }
+    for retriever in config["retrievers"]:
+        # Text2CypherRetriever.search takes no top_k, so it gets an explicit
+        # empty retriever_config instead of the default {"top_k": 5}
+        retriever["retriever_config"] = {} if retriever["type"] == "text2CypherRetriever" else {"top_k": 5}
+    config.update(config_overrides)
+    with open(os.path.join(directory, "test_config.json"), "w") as f:
+        json.dump(config, f)
+    return {
+        "questions_json_path": os.path.join(directory, "questions.json"),
+        "kg_config_json_path": os.path.join(directory, "kg_config.json"),
+        "test_config_json_path": os.path.join(directory, "test_config.json"),
+        "output_report_path": os.path.join(directory, "offline_report.json"),
+    }
+
+
+def span_totals(span, totals):
+    """
+    Adds the duration of span and each of its descendants to totals by span name.
+    """
+    totals[span["name"]] = totals.get(span["name"], 0.0) + span["duration_ms"]
+    for child in span.get("children", []):
+        span_totals(child, totals)
+    return totals
+
+
+def stage_breakdown(report):
+    """
+    Returns the mean milliseconds per pair of each span inside "rag", the
+    harness overhead per pair (rag time not spent in a stand-in) and the
+    scoring time per row.
+    """
+    answers = [
+        retriever_entry["answers"][0]
+        for question_entry in report["report"]
+        for retriever_entry in question_entry["retrievers"]
+    ]
+    totals = {}
+    batches = {}
+    for answer in answers:
+        stages = answer.get("stages", {})
+        if "rag" in stages:
+            span_totals(stages["rag"], totals)
+        if "evaluation" in stages:
+            # Every row of a batch carries the same batch timing
+            key = (answer.get("eval_start_time"), answer.get("eval_batch_duration_sec"))
+            batches[key] = answer.get("eval_batch_size", 1)
+    pairs = max(len(answers), 1)
+    rag_ms = {name: round(total / pairs, 3) for name, total in sorted(totals.items())}
+    stub_ms = sum(totals.get(name, 0.0) for name in STUB_SPANS)
+    scored_rows = sum(batches.values())
+    eval_sec = sum(duration or 0.0 for _, duration in batches)
+    return {
+        "rag_ms_per_pair": rag_ms,
+        "rag_overhead_ms_per_pair": round((totals.get("rag", 0.0) - stub_ms) / pairs, 3),
+        "scoring_batches": len(batches),
+        "scoring_ms_per_row": round(eval_sec * 1000 / scored_rows, 3) if scored_rows else None,
+    }
+
+
+def run_worker(options):
+    """
+    Runs one workload in this process and returns its measurements.
+    """
+    os.environ.setdefault("RAGAS_DO_NOT_TRACK", "true")
+    from offline_stubs import offline_environment
+
+    rss_before_mb = peak_rss_mb()
+    with tempfile.TemporaryDirectory() as directory:
+        config_arg = write_workload(
+            directory, options["questions"], options["retrievers"], options["metrics"], options["config"]
+        )
+        with offline_environment(options["settings"]) as stubs:
+            from evaluator import Evaluator
+
+            start = time.perf_counter()
+            evaluator = Evaluator.get_evaluator(config_arg)
+            load_sec = time.perf_counter() - start
+            evaluator.run_evaluation()
+            total_sec = time.perf_counter() - start
+            evaluator.neo4j_driver.close()
+        with open(config_arg["output_report_path"]) as f:
+            report = json.load(f)
+    metadata = report["metadata"]
+    pipeline_sec = metadata["pipeline"]["wall_time_sec"]
+    pairs = sum(len(question_entry["retrievers"]) for question_entry in report["report"])
+    return {
+        "questions": options["questions"],
+        "pairs": pairs,
+        "load_sec": round(load_sec, 3),
+        "pipeline_sec": round(pipeline_sec, 3),
+        # Everything after the pipeline: report, charts, summary and writing
+        "post_sec": round(total_sec - load_sec - pipeline_sec, 3),
+        "total_sec": round(total_sec, 3),
+        "pairs_per_sec": round(pairs / pipeline_sec, 2) if pipeline_sec else None,
+        "stages": stage_breakdown(report),
+        "stubs": stubs.stats(),
+        "embedding_cache": metadata.get("embedding_cache"),
+        "rss_before_mb": rss_before_mb,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def run_size(options, verbose):
+    """
+    Runs one workload size in a fresh interpreter, so peak RSS and caches
+    are not shared between sizes, and returns its measurements.
+    """
+    with tempfile.NamedTemporaryFile("r", suffix=".json") as result_file:
+        process = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--worker", json.dumps(options), "--result", result_file.name],
+            stdout=None if verbose else subprocess.DEVNULL,
+            stderr=None if verbose else subprocess.PIPE,
+            text=True,
+        )
+        if process.returncode != 0:
+            raise RuntimeError(f"Benchmark of {options['questions']} questions failed:\n{(process.stderr or '')[-2000:]}")
+        return json.load(result_file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark of run_evaluation")
+    parser.add_argument("--sizes", default="10,100,1000", help="Comma-separated numbers of questions")
+    parser.add_argument("--retrievers", default="vectorRetriever,vectorCypherRetriever",
+                        help=f"Comma-separated retriever types out of {', '.join(RETRIEVERS)}")
+    parser.add_argument("--metrics", default="AnswerAccuracy,RougeScore",
+                        help="ragas metrics; LLM metrics other than the rating metrics fail against the stub judge")
+    parser.add_argument("--config", default=None, help="JSON file merged into the test config")
+    for name, value in DEFAULT_SETTINGS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=value)
+    parser.add_argument("--output", default=None, help="Write all measurements to this JSON file")
+    parser.add_argument("--verbose", action="store_true", help="Show the evaluator's output")
+    parser.add_argument("--worker", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--result", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        result = run_worker(json.loads(args.worker))
+        with open(args.result, "w") as f:
+            json.dump(result, f)
+        return
+
+    config_overrides = {}
+    if args.config:
+        with open(args.config) as f:
+            config_overrides = json.load(f)
+    settings = {name: getattr(args, name) for name in DEFAULT_SETTINGS}
+    print(f"Stand-in settings: {json.dumps(settings)}")
+    print(f"Config overrides: {json.dumps(config_overrides)}")
+    print(f"{'questions':>9} {'pairs':>6} {'pairs/s':>8} {'pipeline s':>10} {'post s':>7} "
+          f"{'rag ovh ms':>10} {'score ms/row':>12} {'peak MB':>8}")
+    results = []
+    for size in [int(size) for size in args.sizes.split(",")]:
+        result = run_size({
+            "questions": size,
+            "retrievers": args.retrievers.split(","),
+            "metrics": [metric for metric in args.metrics.split(",") if metric],
+            "config": config_overrides,
+            "settings": settings,
+        }, args.verbose)
+        results.append(result)
+        stages = result["stages"]
+        print(f"{size:>9} {result['pairs']:>6} {result['pairs_per_sec']:>8} {result['pipeline_sec']:>10} "
+              f"{result['post_sec']:>7} {stages['rag_overhead_ms_per_pair']:>10} "
+              f"{str(stages['scoring_ms_per_row']):>12} {str(result['peak_rss_mb']):>8}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"settings": settings, "config": config_overrides, "results": results}, f, indent=2)
+        print(f"Measurements written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Micro-benchmark for the per-row overhead of holding results.
+
+before: every response is wrapped in a one-row datasets.Dataset that stays in
+        the results list, and the report reads it back via column_names and [0]
+after:  every response is a ResultRecord; one Dataset is built per scoring batch
+
+Run from the repository root:
+    python benchmarks/bench_result_records.py --rows 5000 --batch-size 16
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import pyarrow as pa
+from datasets import Dataset
+from result_record import ResultRecord
+
+
+def make_row(i):
+    return {
+        "user_input": f"What does entity {i} connect to?",
+        "reference": f"Entity {i} connects to entity {i + 1}.",
+        "response": f"Entity {i} is connected to entity {i + 1} through RELATES_TO.",
+        "contexts": [f"Entity {i} connects to entity {i + 1}."],
+    }
+
+
+def run_before(rows, batch_size):
+    results = []
+    for i, row in enumerate(rows):
+        dataset = Dataset.from_dict({key: [value] for key, value in row.items()})
+        results.append({"question_id": i, "retriever_name": "vector", "test_data": dataset, "scores": {}})
+    report = []
+    for item in results:
+        test_data = item["test_data"]
+        reference = test_data["reference"][0] if "reference" in test_data.column_names else ""
+        response = test_data["response"][0] if "response" in test_data.column_names else ""
+        report.append((item["question_id"], reference, response))
+    return results, report
+
+
+def run_after(rows, batch_size):
+    results = []
+    for i, row in enumerate(rows):
+        results.append(ResultRecord(i, row["user_input"], "vector", row["reference"], row["response"], row["contexts"]))
+    for start in range(0, len(results), batch_size):
+        Dataset.from_list([record.to_row() for record in results[start:start + batch_size]])
+    report = [(record.question_id, record.reference, record.response) for record in results]
+    return results, report
+
+
+def measure(run, rows, batch_size):
+    # Timed without tracemalloc, which slows allocation-heavy code down
+    start = time.perf_counter()
+    run(rows, batch_size)
+    elapsed = time.perf_counter() - start
+
+    arrow_before = pa.total_allocated_bytes()
+    tracemalloc.start()
+    results, _ = run(rows, batch_size)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Arrow buffers are allocated outside the Python heap
+    retained += pa.total_allocated_bytes() - arrow_before
+    del results
+    return {
+        "us_per_row": elapsed / len(rows) * 1e6,
+        "retained_bytes_per_row": retained / len(rows),
+        "peak_mb": peak / 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-row overhead of result storage")
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=16)
+    args = parser.parse_args()
+
+    rows = [make_row(i) for i in range(args.rows)]
+    print(f"{args.rows} rows, scoring batches of {args.batch_size}")
+    for name, run in (("before", run_before), ("after", run_after)):
+        stats = measure(run, rows, args.batch_size)
+        print(f"{name:>6}: {stats['us_per_row']:9.1f} us/row  "
+              f"{stats['retained_bytes_per_row']:9.0f} bytes/row retained  "
+              f"{stats['peak_mb']:7.1f} MB Python heap peak")
+
+
+if __name__ == "__main__":
+    main()
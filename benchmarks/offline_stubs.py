@@ -0,0 +1,375 @@
+"""
+Deterministic local stand-ins for OpenAI and Neo4j, so an Evaluator can run
+end to end with no network: a retriever LLM, a ragas judge chat model, an
+embedder and an in-process Neo4j driver that answers the queries the
+neo4j_graphrag retrievers send with canned records. Each stand-in sleeps for
+its configured latency and counts its calls and the time it spent sleeping.
+
+offline_environment(settings) swaps them in for the OpenAI and Neo4j
+factories the Evaluator uses.
+"""
+import asyncio
+import hashlib
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import neo4j
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from neo4j_graphrag.llm import LLMInterface, LLMResponse
+
+DEFAULT_SETTINGS = {
+    "llm_latency_ms": 20,
+    "llm_tokens": 60,
+    "judge_latency_ms": 20,
+    "embed_latency_ms": 5,
+    "embedding_dimensions": 256,
+    "neo4j_latency_ms": 5,
+    "chunk_tokens": 80,
+    "chunk_count": 5000,
+}
+
+WORDS = (
+    "graph node relationship vector index query cypher database property label path "
+    "retriever context answer question score entity chunk document embedding model"
+).split()
+
+TEXT2CYPHER_MARKER = "Generate a Cypher statement"
+TEXT2CYPHER_QUERY = "MATCH (c:Chunk) RETURN c.text AS text LIMIT 5"
+# ragas' rating metrics (AnswerAccuracy, ContextRelevance, ResponseGroundedness)
+# read the first number of the judge's reply; 2 is a valid rating for all of them
+JUDGE_RATING = "2"
+
+
+def seeded_random(*parts):
+    digest = hashlib.sha256("\x1f".join(str(part) for part in parts).encode("utf-8")).digest()
+    return random.Random(int.from_bytes(digest[:8], "big"))
+
+
+def make_text(tokens, *seed):
+    rng = seeded_random(*seed)
+    return " ".join(rng.choice(WORDS) for _ in range(tokens))
+
+
+class CallStats:
+    """
+    Thread-safe count of a stand-in's calls, the seconds it slept and the
+    tokens it received and produced.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.busy_sec = 0.0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._lock = threading.Lock()
+
+    def record(self, busy_sec, prompt_tokens=0, completion_tokens=0):
+        with self._lock:
+            self.calls += 1
+            self.busy_sec += busy_sec
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+
+    def to_dict(self):
+        return {
+            "calls": self.calls,
+            "busy_sec": round(self.busy_sec, 3),
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+        }
+
+
+class StubLLM(LLMInterface):
+    """
+    Retriever LLM: answers a Text2Cypher prompt with a fixed Cypher query and
+    any other prompt with `tokens` words derived from the prompt.
+    """
+
+    def __init__(self, latency_ms, tokens, model_name="stub-llm"):
+        super().__init__(model_name=model_name, model_params={})
+        self.latency_sec = latency_ms / 1000
+        self.tokens = tokens
+        self.stats = CallStats()
+
+    def _respond(self, input):
+        if TEXT2CYPHER_MARKER in input:
+            return TEXT2CYPHER_QUERY
+        return make_text(self.tokens, "answer", input)
+
+    def invoke(self, input, message_history=None, system_instruction=None):
+        time.sleep(self.latency_sec)
+        content = self._respond(input)
+        self.stats.record(self.latency_sec, len(input) // 4, len(content.split()))
+        return LLMResponse(content=content)
+
+    async def ainvoke(self, input, message_history=None, system_instruction=None):
+        await asyncio.sleep(self.latency_sec)
+        content = self._respond(input)
+        self.stats.record(self.latency_sec, len(input) // 4, len(content.split()))
+        return LLMResponse(content=content)
+
+
+class StubChatModel(BaseChatModel):
+    """
+    ragas judge: replies to every prompt with a fixed rating.
+    """
+
+    latency_ms: float = 20
+    reply: str = JUDGE_RATING
+    stats: CallStats = None
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    @property
+    def _llm_type(self):
+        return "stub-chat"
+
+    def _result(self, messages):
+        prompt_tokens = sum(len(str(message.content)) for message in messages) // 4
+        self.stats.record(self.latency_ms / 1000, prompt_tokens, 1)
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": 1, "total_tokens": prompt_tokens + 1}
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content=self.reply))],
+            llm_output={"token_usage": usage},
+        )
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep(self.latency_ms / 1000)
+        return self._result(messages)
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(self.latency_ms / 1000)
+        return self._result(messages)
+
+
+class StubEmbedder(Embeddings):
+    """
+    Returns a unit vector derived from the hash of each text.
+    """
+
+    model = "stub-embedding"
+
+    def __init__(self, latency_ms, dimensions):
+        self.latency_sec = latency_ms / 1000
+        self.dimensions = dimensions
+        self.stats = CallStats()
+
+    def _vector(self, text):
+        rng = seeded_random("embedding", text)
+        vector = [rng.gauss(0, 1) for _ in range(self.dimensions)]
+        norm = sum(value * value for value in vector) ** 0.5
+        return [value / norm for value in vector]
+
+    def embed_query(self, text):
+        time.sleep(self.latency_sec)
+        self.stats.record(self.latency_sec, len(text) // 4)
+        return self._vector(text)
+
+    def embed_documents(self, texts):
+        time.sleep(self.latency_sec)
+        self.stats.record(self.latency_sec, sum(len(text) for text in texts) // 4)
+        return [self._vector(text) for text in texts]
+
+
+class FakeResult:
+    """
+    The part of a neo4j Result that execute_query's result_transformer_ uses.
+    """
+
+    def __init__(self, rows, summary):
+        self._records = iter([neo4j.Record(row) for row in rows])
+        self._keys = list(rows[0].keys()) if rows else []
+        self._next = None
+        self._summary = summary
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._next is not None:
+            record, self._next = self._next, None
+            return record
+        return next(self._records)
+
+    def peek(self):
+        if self._next is None:
+            self._next = next(self._records, None)
+        return self._next
+
+    def keys(self):
+        return self._keys
+
+    def consume(self):
+        self._records = iter(())
+        return self._summary
+
+    def to_eager_result(self):
+        return neo4j.EagerResult(list(self), self.consume(), self.keys())
+
+
+class FakeNeo4jDriver(neo4j.Driver):
+    """
+    In-process stand-in for a neo4j Driver. execute_query recognises the
+    version check, vector index lookup, vector search (with or without a
+    retrieval_query) and Text2Cypher queries of neo4j_graphrag and returns
+    canned records for a corpus of chunk_count chunks; anything else, such as
+    the schema queries, returns no records. Search results depend only on
+    the query vector. EXPLAIN returns a small read-only plan.
+    """
+
+    def __init__(self, latency_ms, dimensions, chunk_tokens, chunk_count):
+        # No connection pool; neo4j_graphrag only sets the pool's user agent
+        self._pool = SimpleNamespace(pool_config=SimpleNamespace(user_agent=None), close=lambda: None)
+        self._closed = False
+        self.latency_sec = latency_ms / 1000
+        self.dimensions = dimensions
+        self.chunk_tokens = chunk_tokens
+        self.chunk_count = chunk_count
+        self.stats = CallStats()
+
+    def chunk(self, chunk_id):
+        return {
+            "text": make_text(self.chunk_tokens, "chunk", chunk_id),
+            "name": f"Chunk {chunk_id}",
+            "description": make_text(8, "description", chunk_id),
+        }
+
+    def vector_matches(self, parameters):
+        top_k = int(parameters.get("top_k", 5))
+        rng = seeded_random("search", parameters.get("query_vector", [])[:8])
+        chunk_ids = rng.sample(range(self.chunk_count), min(top_k, self.chunk_count))
+        return [(chunk_id, round(0.95 - 0.01 * rank, 4)) for rank, chunk_id in enumerate(chunk_ids)]
+
+    def records_for(self, query, parameters):
+        if "dbms.components" in query:
+            return [{"name": "Neo4j Kernel", "versions": ["5.26.0"], "edition": "enterprise"}]
+        if "db.labels()" in query:
+            return [{"labels": ["Chunk", "__Entity__"], "types": ["FROM_CHUNK"], "property_keys": ["text", "name", "embedding"]}]
+        if "SHOW VECTOR INDEXES" in query:
+            return [{"labels": ["Chunk"], "properties": ["embedding"], "dimensions": self.dimensions}]
+        if "db.index.vector.queryNodes" in query:
+            projection = re.search(r"RETURN node \{([^}]*)\} AS node", query)
+            if projection:
+                properties = [prop.strip().lstrip(".") for prop in projection.group(1).split(",")]
+                return [
+                    {
+                        "node": {prop: self.chunk(chunk_id).get(prop) for prop in properties},
+                        "nodeLabels": ["Chunk"],
+                        "elementId": f"4:stub:{chunk_id}",
+                        "id": f"4:stub:{chunk_id}",
+                        "score": score,
+                    }
+                    for chunk_id, score in self.vector_matches(parameters)
+                ]
+            # A retrieval_query: one chunk and one related entity per match
+            return [
+                {
+                    "startNode": self.chunk(chunk_id),
+                    "relationship": "MENTIONS",
+                    "endNode": {"name": f"Entity {chunk_id % 97}", "text": None, "description": None},
+                }
+                for chunk_id, _ in self.vector_matches(parameters)
+            ]
+        if query.lstrip().upper().startswith("MATCH"):
+            return [{"text": self.chunk(chunk_id)["text"]} for chunk_id in range(min(5, self.chunk_count))]
+        return []
+
+    def execute_query(self, query_, parameters_=None, routing_=None, database_=None, result_transformer_=None, **kwargs):
+        query = getattr(query_, "text", query_)
+        parameters = dict(parameters_ or {})
+        parameters.update({key: value for key, value in kwargs.items() if not key.endswith("_")})
+        time.sleep(self.latency_sec)
+        self.stats.record(self.latency_sec)
+        summary = SimpleNamespace(plan=None, result_available_after=0, result_consumed_after=0)
+        if query.startswith("EXPLAIN "):
+            summary.plan = {"operatorType": "ProduceResults@neo4j", "args": {"EstimatedRows": 5.0}, "children": []}
+            rows = []
+        else:
+            rows = self.records_for(query, parameters)
+        return (result_transformer_ or FakeResult.to_eager_result)(FakeResult(rows, summary))
+
+    def verify_connectivity(self, **config):
+        time.sleep(self.latency_sec)
+
+    def close(self):
+        self._closed = True
+
+
+class OfflineStubs:
+    """
+    Builds the stand-ins from a settings dict (see DEFAULT_SETTINGS) and
+    exposes them as drop-in replacements for the config_helper and
+    neo4j_util factories.
+    """
+
+    def __init__(self, settings=None):
+        self.settings = dict(DEFAULT_SETTINGS, **(settings or {}))
+        self.retriever_llm_stats = CallStats()
+        self.judge_stats = CallStats()
+        self.embedder = None
+        self.driver = None
+
+    def get_retriever_llm(self, config, llm_cache=None):
+        from llm_cache import CachedLLM
+
+        llm = StubLLM(self.settings["llm_latency_ms"], self.settings["llm_tokens"])
+        llm.stats = self.retriever_llm_stats
+        return CachedLLM(llm, llm_cache) if llm_cache is not None else llm
+
+    def get_evaluator_llm(self, config, llm_cache=None):
+        from ragas.llms import LangchainLLMWrapper
+        from llm_cache import LangchainDiskCache
+
+        cache = LangchainDiskCache(llm_cache) if llm_cache is not None else None
+        return LangchainLLMWrapper(StubChatModel(
+            latency_ms=self.settings["judge_latency_ms"], stats=self.judge_stats, cache=cache
+        ))
+
+    def get_embedder(self, config):
+        self.embedder = StubEmbedder(self.settings["embed_latency_ms"], self.settings["embedding_dimensions"])
+        return self.embedder
+
+    def init_neo4j_driver(self, kg_config):
+        self.driver = FakeNeo4jDriver(
+            self.settings["neo4j_latency_ms"],
+            self.settings["embedding_dimensions"],
+            self.settings["chunk_tokens"],
+            self.settings["chunk_count"],
+        )
+        return self.driver
+
+    def stats(self):
+        return {
+            "retriever_llm": self.retriever_llm_stats.to_dict(),
+            "judge_llm": self.judge_stats.to_dict(),
+            "embedder": self.embedder.stats.to_dict() if self.embedder is not None else None,
+            "neo4j": self.driver.stats.to_dict() if self.driver is not None else None,
+        }
+
+
+@contextmanager
+def offline_environment(settings=None):
+    """
+    Replaces the Evaluator's LLM, embedder and Neo4j driver factories with
+    offline stand-ins for the duration of the block and yields the
+    OfflineStubs, whose stats() reports the calls each stand-in received.
+    """
+    import evaluator
+
+    stubs = OfflineStubs(settings)
+    replaced = ("get_retriever_llm", "get_evaluator_llm", "get_embedder", "init_neo4j_driver")
+    originals = {name: getattr(evaluator, name) for name in replaced}
+    for name in replaced:
+        setattr(evaluator, name, getattr(stubs, name))
+    try:
+        yield stubs
+    finally:
+        for name, original in originals.items():
+            setattr(evaluator, name, original)
@@ -0,0 +1,128 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+
+def hash_key(*parts):
+    """
+    Returns a stable sha256 hex digest for the given JSON-serializable parts.
+    """
+    payload = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """
+    A small key/value cache persisted in a SQLite file.
+
+    Several caches can share one file; entries are separated by namespace.
+    Entries older than max_age_days are treated as misses and deleted, and
+    once the namespace holds more than max_entries rows the least recently
+    used ones are evicted. Hit and miss counters are kept per instance.
+    """
+
+    EVICT_EVERY = 100
+
+    def __init__(self, path, namespace, max_entries=None, max_age_days=None):
+        self.path = path
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.max_age_sec = max_age_days * 86400 if max_age_days is not None else None
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+            "created_at REAL NOT NULL, accessed_at REAL NOT NULL, "
+            "PRIMARY KEY (namespace, key))"
+        )
+        self._conn.commit()
+        self.evict()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                (self.namespace, key),
+            ).fetchone()
+            now = time.time()
+            if row is not None and self.max_age_sec is not None and row[1] < now - self.max_age_sec:
+                self._conn.execute(
+                    "DELETE FROM cache_entries WHERE namespace = ? AND key = ?",
+                    (self.namespace, key),
+                )
+                self._conn.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE cache_entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                (now, self.namespace, key),
+            )
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def set(self, key, value):
+        with self._lock:
+            now = time.time()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (namespace, key, value, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (self.namespace, key, value, now, now),
+            )
+            self._conn.commit()
+            self._writes += 1
+            evict_now = self._writes % self.EVICT_EVERY == 0
+        if evict_now:
+            self.evict()
+
+    def evict(self):
+        """
+        Deletes expired entries and trims the namespace down to max_entries.
+        """
+        with self._lock:
+            if self.max_age_sec is not None:
+                self._conn.execute(
+                    "DELETE FROM cache_entries WHERE namespace = ? AND created_at < ?",
+                    (self.namespace, time.time() - self.max_age_sec),
+                )
+            if self.max_entries is not None:
+                self._conn.execute(
+                    "DELETE FROM cache_entries WHERE namespace = ? AND key IN ("
+                    "SELECT key FROM cache_entries WHERE namespace = ? "
+                    "ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self.namespace, self.namespace, self.max_entries),
+                )
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,))
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM cache_entries WHERE namespace = ?", (self.namespace,)
+            ).fetchone()[0]
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self),
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
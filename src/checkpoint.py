@@ -0,0 +1,95 @@
+import json
+import os
+import threading
+
+
+def result_key(question_id, retriever_name):
+    """
+    Identifies one (question, retriever) pair; provided answers use their source as retriever name.
+    """
+    return (question_id, retriever_name)
+
+
+def _ends_without_newline(path):
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return False
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) != b"\n"
+
+
+class CheckpointWriter:
+    """
+    Appends finished result entries to a JSONL file, one line per (question, retriever) pair.
+    Each line is flushed as soon as it is written so a crash loses at most the line in flight.
+    With append=False an existing file is truncated first.
+    """
+
+    def __init__(self, path, append=True):
+        self.path = path
+        self.append = append
+        self._lock = threading.Lock()
+        self._file = None
+
+    def __enter__(self):
+        checkpoint_dir = os.path.dirname(self.path)
+        if checkpoint_dir:
+            os.makedirs(checkpoint_dir, exist_ok=True)
+        needs_newline = self.append and _ends_without_newline(self.path)
+        self._file = open(self.path, "a" if self.append else "w", encoding="utf-8")
+        if needs_newline:
+            # Terminate a line truncated by a crash so new entries start on their own line
+            self._file.write("\n")
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._file.close()
+        self._file = None
+
+    def write(self, result):
+        line = json.dumps(result, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+
+def load_checkpoint(path):
+    """
+    Reads the result entries from a JSONL checkpoint. A truncated last line,
+    left behind when a run is killed mid-write, is ignored.
+    """
+    results = []
+    if not os.path.exists(path):
+        return results
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                results.append(json.loads(line))
+            except json.JSONDecodeError:
+                print(f"WARNING: skipping unreadable line {line_number} in checkpoint {path}")
+    return results
+
+
+def order_results(results, keys):
+    """
+    Returns the results matching keys, in the order of keys. When a pair was
+    written more than once the last entry wins; pairs not in keys are dropped.
+    """
+    by_key = {}
+    for result in results:
+        by_key[result_key(result["question_id"], result["retriever_name"])] = result
+    return [by_key[key] for key in keys if key in by_key]
+
+
+def completed_keys(results):
+    """
+    Returns the keys of the pairs whose last entry finished without an error.
+    Failed searches and failed scoring are left out, so a resumed run retries them.
+    """
+    errors = {}
+    for result in results:
+        errors[result_key(result["question_id"], result["retriever_name"])] = bool(result.get("error"))
+    return {key for key, error in errors.items() if not error}
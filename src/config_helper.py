@@ -1,12 +1,15 @@
+import ast
+import functools
+import importlib
+import importlib.util
 import json
-from neo4j_graphrag.generation import GraphRAG
-from neo4j_graphrag.llm import OpenAILLM
-from neo4j_graphrag.schema import get_schema
-from neo4j_graphrag.retrievers import VectorRetriever, VectorCypherRetriever, Text2CypherRetriever
-from ragas.llms import LangchainLLMWrapper
-from langchain_openai import ChatOpenAI
-from format_util import result_formatter
-from ragas.metrics import *
+import os
+
+# ragas, langchain and neo4j_graphrag take seconds to import, so they are
+# imported inside the functions that build LLMs, metrics and retrievers.
+# Reading and validating configs stays fast (see dry_run.py).
+
+RETRIEVER_TYPES = ("vectorRetriever", "vectorCypherRetriever", "text2CypherRetriever")
 
 def load_config_file(config_json_path):
     """
@@ -16,18 +19,28 @@ def load_config_file(config_json_path):
         config = json.load(f)
     return config
 
-def get_evaluator_llm(config):
+def get_evaluator_llm(config, llm_cache=None):
     """
     Loads the LLM config from a JSON and returns an OpenAILLM instance.
+    If an llm_cache DiskCache is given, judge calls are answered from it when possible.
     """
+    from ragas.llms import LangchainLLMWrapper
+    from langchain_openai import ChatOpenAI
+    from llm_cache import LangchainDiskCache
+
     model_name = config["evaluatorLLM"]["model"]
-    llm = LangchainLLMWrapper(ChatOpenAI(model=model_name))
+    cache = LangchainDiskCache(llm_cache) if llm_cache is not None else None
+    llm = LangchainLLMWrapper(ChatOpenAI(model=model_name, cache=cache))
     return llm
 
-def get_retriever_llm(config):
+def get_retriever_llm(config, llm_cache=None):
     """
     Loads the LLM config from a JSON and returns an OpenAILLM instance.
+    If an llm_cache DiskCache is given, the LLM is wrapped in a CachedLLM.
     """
+    from neo4j_graphrag.llm import OpenAILLM
+    from llm_cache import CachedLLM
+
     model_name = config["retrieverLLM"]["model"]
     llm = OpenAILLM(
         model_name=model_name,
@@ -36,8 +49,18 @@ def get_retriever_llm(config):
             # "response_format": {"type": "json_object"},
         },
     )
+    if llm_cache is not None:
+        llm = CachedLLM(llm, llm_cache)
     return llm
 
+def get_embedder(config):
+    """
+    Returns the embedder used for vector search queries and ragas metrics.
+    """
+    from langchain_openai import OpenAIEmbeddings
+
+    return OpenAIEmbeddings()
+
 def get_metrics(config):
     """
     Loads the metrics list from a JSON config and returns it.
@@ -45,12 +68,68 @@ def get_metrics(config):
     metrics = []
     return config.get("metrics", metrics)
 
-def get_retrievers(config, kg_config, neo4j_driver, llm, embedder, result_formatter=None):
+# Retriever types whose results are ordered by score with one record per node,
+# so a smaller top_k result is a prefix of a larger one.
+SHARED_TOP_K_TYPES = ("vectorRetriever",)
+
+def get_top_k_groups(config):
+    """
+    Finds retrievers that share type, params and retriever_config and differ only in top_k.
+    Returns {retriever_name: (group_key, max_top_k, member_count)} for every group
+    with more than one member. Set "share_top_k": false in the config to disable.
+    """
+    if not config.get("share_top_k", True):
+        return {}
+    groups = {}
+    for retriever_cfg in config.get("retrievers", []):
+        if retriever_cfg["type"] not in SHARED_TOP_K_TYPES:
+            continue
+        retriever_config = dict(get_retriever_config(config, retriever_cfg["name"]))
+        top_k = retriever_config.pop("top_k", 5)
+        group_key = json.dumps(
+            [retriever_cfg["type"], retriever_cfg.get("params", {}), retriever_config],
+            sort_keys=True
+        )
+        groups.setdefault(group_key, []).append((retriever_cfg["name"], top_k))
+
+    top_k_groups = {}
+    for group_key, members in groups.items():
+        if len(members) < 2:
+            continue
+        max_top_k = max(top_k for _, top_k in members)
+        for retriever_name, _ in members:
+            top_k_groups[retriever_name] = (group_key, max_top_k, len(members))
+    return top_k_groups
+
+def get_retrievers(config, kg_config, neo4j_driver, llm, embedder, result_formatter=None, tracer=None, cypher_cache=None,
+                   schema_cache=None, retrieval_cache=None):
     """
     Loads retrievers from a config JSON and returns a dictionary of retriever instances.
     The key is the retriever 'type' from the config.
+    Retrievers that differ only in top_k share one search at the largest top_k
+    and receive prefix slices of its result.
+    If a Tracer is given, each Neo4j retriever records its search, queries and
+    result formatting as spans.
+    Text2Cypher retrievers run their generated queries with the guards of
+    get_text2cypher_config and reuse queries from cypher_cache, a
+    CypherQueryCache, when one is given. Their graph schema comes from
+    schema_cache, a SchemaCache, so it is introspected once per KG.
+    Vector retrievers serve repeated searches from retrieval_cache, a
+    RetrievalCache, when one is given.
     """
+    from neo4j_graphrag.generation import GraphRAG
+    from neo4j_graphrag.retrievers import VectorRetriever, VectorCypherRetriever
+    from shared_retriever import SharedTopKSearch, TopKSliceRetriever, is_top_k_slice
+    from text2cypher import GuardedText2CypherRetriever
+    from schema_cache import SchemaCache
+    from retrieval_cache import cache_retriever_results, formatter_version
+    from tracing import instrument_retriever
+
     retrievers_dict = {}
+    top_k_groups = get_top_k_groups(config)
+    shared_searches = {}
+    if schema_cache is None:
+        schema_cache = SchemaCache()
     for retriever_cfg in config.get("retrievers", []):
         retriever_name = retriever_cfg["name"]
         retriever_type = retriever_cfg["type"]
@@ -59,7 +138,29 @@ def get_retrievers(config, kg_config, neo4j_driver, llm, embedder, result_format
         neo4j_database = kg_config.neo4j_database
         retriever = None
 
-        if retriever_type == "vectorRetriever":
+        if retriever_type == "vectorRetriever" and retriever_name in top_k_groups:
+            group_key, max_top_k, member_count = top_k_groups[retriever_name]
+            if group_key not in shared_searches:
+                print(f"Sharing one top_k={max_top_k} vector search across {member_count} retrievers")
+                shared_retriever = VectorRetriever(
+                    driver=neo4j_driver,
+                    neo4j_database=neo4j_database,
+                    index_name=index_name,
+                    embedder=embedder,
+                    return_properties=params.get("return_properties", ["text"]),
+                )
+                if retrieval_cache is not None:
+                    cache_retriever_results(shared_retriever, retrieval_cache, kg_config.name,
+                                            {"return_properties": shared_retriever.return_properties})
+                if tracer is not None:
+                    instrument_retriever(shared_retriever, tracer)
+                shared_searches[group_key] = SharedTopKSearch(
+                    shared_retriever,
+                    max_top_k=max_top_k,
+                    member_count=member_count,
+                )
+            retriever = TopKSliceRetriever(shared_searches[group_key])
+        elif retriever_type == "vectorRetriever":
             retriever = VectorRetriever(
                 driver=neo4j_driver,
                 neo4j_database=neo4j_database,
@@ -80,17 +181,31 @@ def get_retrievers(config, kg_config, neo4j_driver, llm, embedder, result_format
             examples = [
                 "USER INPUT: 'Which actors starred in the Matrix?' QUERY: MATCH (p:Person)-[:ACTED_IN]->(m:Movie) WHERE m.title = 'The Matrix' RETURN p.name"
             ]
-            graph_schema = get_schema(neo4j_driver, is_enhanced=False)
-            retriever = Text2CypherRetriever(
+            graph_schema = schema_cache.get_schema(
+                neo4j_driver, kg_config.name, neo4j_database, is_enhanced=params.get("enhanced_schema", False)
+            )
+            retriever = GuardedText2CypherRetriever(
                 driver=neo4j_driver,
                 llm=llm,  # type: ignore
                 neo4j_schema=graph_schema,
                 examples=examples,
-            )            
+                neo4j_database=neo4j_database,
+                cypher_cache=cypher_cache,
+                **get_text2cypher_config(params)
+            )
         else:
             raise ValueError(f"Unknown retriever type: {retriever_type}")
 
-        rag = GraphRAG(retriever=retriever, llm=llm) 
+        if retrieval_cache is not None and retriever_type == "vectorRetriever" and not is_top_k_slice(retriever):
+            cache_retriever_results(retriever, retrieval_cache, kg_config.name,
+                                    {"return_properties": retriever.return_properties})
+        elif retrieval_cache is not None and retriever_type == "vectorCypherRetriever":
+            cache_retriever_results(retriever, retrieval_cache, kg_config.name,
+                                    {"result_formatter": formatter_version(result_formatter)})
+
+        if tracer is not None and not is_top_k_slice(retriever):
+            instrument_retriever(retriever, tracer)
+        rag = GraphRAG(retriever=retriever, llm=llm)
         retrievers_dict[retriever_name] = rag
 
     return retrievers_dict
@@ -106,6 +221,32 @@ def get_retriever_config(config, retriever_name):
             return retriever.get("retriever_config", {"top_k": 5})
     return {"top_k": 5}    
 
+@functools.lru_cache(maxsize=None)
+def get_ragas_metric_names():
+    """
+    Returns the names exported by ragas.metrics (its __all__), read from the
+    package source so that checking a config does not import ragas.
+    """
+    # find_spec("ragas.metrics") would import the ragas package, so locate it from the top-level spec
+    spec = importlib.util.find_spec("ragas")
+    if spec is None:
+        raise ValueError("ragas is not installed")
+    path = os.path.join(spec.submodule_search_locations[0], "metrics", "__init__.py")
+    with open(path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(getattr(target, "id", None) == "__all__" for target in node.targets):
+            return frozenset(ast.literal_eval(node.value))
+    raise ValueError(f"Could not read the metric names exported by {path}")
+
+def get_metric_class(metric_name):
+    """
+    Returns the ragas.metrics class with the given name. ragas is imported on first use.
+    """
+    if metric_name not in get_ragas_metric_names():
+        raise ValueError(f"Metric class '{metric_name}' not found in ragas.metrics")
+    return getattr(importlib.import_module("ragas.metrics"), metric_name)
+
 def get_metrics_from_config(config):
     """
     Given a config dict with a 'metrics' list of class names as strings,
@@ -113,8 +254,263 @@ def get_metrics_from_config(config):
     """
     metrics = []
     for metric_name in config.get("metrics", []):
-        metric_class = globals().get(metric_name)
-        if metric_class is None:
-            raise ValueError(f"Metric class '{metric_name}' not found in ragas.metrics")
-        metrics.append(metric_class())
-    return metrics        
\ No newline at end of file
+        metrics.append(get_metric_class(metric_name)())
+    return metrics        
+def get_concurrency_config(config):
+    """
+    Given a config dict, return the number of workers for the retrieval and
+    evaluation stages. Missing values default to 1 (serial run).
+    """
+    concurrency = config.get("concurrency", {})
+    workers = {}
+    for stage in ("retrieval", "evaluation"):
+        value = concurrency.get(stage, 1)
+        if not isinstance(value, int) or value < 1:
+            raise ValueError(f"concurrency.{stage} must be a positive integer, got {value!r}")
+        workers[stage] = value
+    return workers
+
+def get_scoring_config(config):
+    """
+    Given a config dict, return the scoring settings. batch_size is the number
+    of responses sent to a single ragas evaluate call (default 100).
+    """
+    scoring = config.get("scoring", {})
+    batch_size = scoring.get("batch_size", 100)
+    if not isinstance(batch_size, int) or batch_size < 1:
+        raise ValueError(f"scoring.batch_size must be a positive integer, got {batch_size!r}")
+    return {"batch_size": batch_size}
+
+def get_llm_cache_config(config):
+    """
+    Given a config dict, return the llm_cache settings, or None when the cache
+    is not enabled. path is relative to the output directory.
+    """
+    llm_cache = config.get("llm_cache", {})
+    if not llm_cache.get("enabled", False):
+        return None
+    return {
+        "path": llm_cache.get("path", "llm_cache.sqlite"),
+        "max_entries": llm_cache.get("max_entries"),
+        "max_age_days": llm_cache.get("max_age_days"),
+    }
+
+def get_embedding_cache_config(config):
+    """
+    Given a config dict, return the embedding_cache settings. Vectors are always
+    memoised in memory; persist also stores them in a SQLite file under the output directory.
+    """
+    embedding_cache = config.get("embedding_cache", {})
+    return {
+        "persist": embedding_cache.get("persist", False),
+        "path": embedding_cache.get("path", "embedding_cache.sqlite"),
+        "max_age_days": embedding_cache.get("max_age_days"),
+        "prefetch_batch_size": embedding_cache.get("prefetch_batch_size", 500),
+    }
+
+def get_llm_rate_limits(config, llm_key):
+    """
+    Returns the provider limits configured in an LLM block ("retrieverLLM" or
+    "evaluatorLLM"). Limits left out are not enforced.
+    estimated_tokens_per_request is reserved before each retriever call and
+    corrected once the prompt and answer sizes are known.
+    """
+    llm_config = config.get(llm_key, {})
+    return {
+        "requests_per_minute": llm_config.get("requests_per_minute"),
+        "tokens_per_minute": llm_config.get("tokens_per_minute"),
+        "estimated_tokens_per_request": llm_config.get("estimated_tokens_per_request", 2000),
+    }
+
+def get_retry_config(config):
+    """
+    Returns the retry and circuit breaker settings used for 429/5xx errors.
+    """
+    retry = config.get("retry", {})
+    return {
+        "max_retries": retry.get("max_retries", 5),
+        "base_delay_sec": retry.get("base_delay_sec", 1.0),
+        "max_delay_sec": retry.get("max_delay_sec", 60.0),
+        "circuit_breaker_failures": retry.get("circuit_breaker_failures", 5),
+        "circuit_breaker_reset_sec": retry.get("circuit_breaker_reset_sec", 30),
+    }
+
+def get_tracing_config(config):
+    """
+    Returns the tracing settings. Per-stage timings are always added to each
+    answer; chrome_trace also writes every span to a Chrome trace JSON file.
+    """
+    tracing = config.get("tracing", {})
+    return {"chrome_trace": tracing.get("chrome_trace", False)}
+
+def get_load_test_config(config):
+    """
+    Returns the load test settings: the concurrency levels each retriever is run
+    at, how many times every question is repeated per level, and whether the
+    normal scored evaluation also runs afterwards.
+    """
+    load_test = config.get("load_test", {})
+    concurrency_levels = load_test.get("concurrency_levels", [1])
+    repetitions = load_test.get("repetitions", 1)
+    if not concurrency_levels or any(not isinstance(level, int) or level < 1 for level in concurrency_levels):
+        raise ValueError(f"load_test.concurrency_levels must be positive integers, got {concurrency_levels!r}")
+    if not isinstance(repetitions, int) or repetitions < 1:
+        raise ValueError(f"load_test.repetitions must be a positive integer, got {repetitions!r}")
+    return {
+        "concurrency_levels": list(concurrency_levels),
+        "repetitions": repetitions,
+        "score": load_test.get("score", False),
+    }
+
+def get_warmup_config(config):
+    """
+    Returns the warm-up settings. queries_per_retriever unscored searches are
+    run through every retriever, after a driver connectivity check, before
+    measurement starts. The default of 0 skips the warm-up phase.
+    """
+    warmup = config.get("warmup", {})
+    queries_per_retriever = warmup.get("queries_per_retriever", 0)
+    if not isinstance(queries_per_retriever, int) or queries_per_retriever < 0:
+        raise ValueError(f"warmup.queries_per_retriever must be a non-negative integer, got {queries_per_retriever!r}")
+    return {"queries_per_retriever": queries_per_retriever}
+
+def get_score_cache_config(config):
+    """
+    Given a config dict, return the score_cache settings, or None when the
+    score store is not enabled. path is relative to the output directory.
+    """
+    score_cache = config.get("score_cache", {})
+    if not score_cache.get("enabled", False):
+        return None
+    return {
+        "path": score_cache.get("path", "score_cache.sqlite"),
+        "max_age_days": score_cache.get("max_age_days"),
+    }
+
+def get_cypher_cache_config(config):
+    """
+    Given a config dict, return the cypher_cache settings, or None when the
+    cache of generated Text2Cypher queries is not enabled. path is relative to
+    the output directory.
+    """
+    cypher_cache = config.get("cypher_cache", {})
+    if not cypher_cache.get("enabled", False):
+        return None
+    return {
+        "path": cypher_cache.get("path", "cypher_cache.sqlite"),
+        "max_age_days": cypher_cache.get("max_age_days"),
+    }
+
+def get_schema_cache_config(config):
+    """
+    Given a config dict, return the schema_cache settings, or None when graph
+    schemas are not persisted between runs. path is relative to the output
+    directory.
+    """
+    schema_cache = config.get("schema_cache", {})
+    if not schema_cache.get("enabled", False):
+        return None
+    return {
+        "path": schema_cache.get("path", "schema_cache.sqlite"),
+        "max_age_days": schema_cache.get("max_age_days"),
+    }
+
+def get_retrieval_cache_config(config):
+    """
+    Given a config dict, return the retrieval_cache settings, or None when
+    vector retriever results are not cached. path is relative to the output
+    directory and max_age_days is how long a result may be reused.
+    """
+    retrieval_cache = config.get("retrieval_cache", {})
+    if not retrieval_cache.get("enabled", False):
+        return None
+    max_age_days = retrieval_cache.get("max_age_days", 7)
+    if max_age_days is not None and (not isinstance(max_age_days, (int, float)) or isinstance(max_age_days, bool) or max_age_days <= 0):
+        raise ValueError(f"retrieval_cache.max_age_days must be a positive number or null, got {max_age_days!r}")
+    return {
+        "path": retrieval_cache.get("path", "retrieval_cache.sqlite"),
+        "max_age_days": max_age_days,
+    }
+
+def get_text2cypher_config(params):
+    """
+    Given the params of a text2CypherRetriever, return its query guards:
+    whether each generated query is checked with EXPLAIN first, the largest
+    estimated row count a plan operator may have (max_estimated_rows), the
+    transaction timeout in seconds and the most rows read from a result.
+    Set a limit to null to disable it.
+    """
+    guards = {
+        "explain": params.get("explain", True),
+        "max_estimated_rows": params.get("max_estimated_rows", 1000000),
+        "query_timeout_sec": params.get("query_timeout_sec", 60),
+        "max_rows": params.get("max_rows", 1000),
+    }
+    if not isinstance(guards["explain"], bool):
+        raise ValueError(f"explain must be true or false, got {guards['explain']!r}")
+    for name in ("max_estimated_rows", "query_timeout_sec"):
+        value = guards[name]
+        if value is not None and (not isinstance(value, (int, float)) or isinstance(value, bool) or value <= 0):
+            raise ValueError(f"{name} must be a positive number or null, got {value!r}")
+    max_rows = guards["max_rows"]
+    if max_rows is not None and (not isinstance(max_rows, int) or isinstance(max_rows, bool) or max_rows < 1):
+        raise ValueError(f"max_rows must be a positive integer or null, got {max_rows!r}")
+    return guards
+
+def get_pipeline_config(config):
+    """
+    Returns the settings of the retrieval -> scoring pipeline. Responses wait in
+    a queue of queue_size (default: one scoring batch per evaluation worker)
+    and a partial scoring batch is sent after batch_wait_sec without new responses.
+    """
+    batch_size = get_scoring_config(config)["batch_size"]
+    evaluation_workers = get_concurrency_config(config)["evaluation"]
+    pipeline = config.get("pipeline", {})
+    queue_size = pipeline.get("queue_size", batch_size * evaluation_workers)
+    if not isinstance(queue_size, int) or queue_size < 1:
+        raise ValueError(f"pipeline.queue_size must be a positive integer, got {queue_size!r}")
+    return {
+        "queue_size": queue_size,
+        "batch_size": batch_size,
+        "batch_wait_sec": pipeline.get("batch_wait_sec", 2.0),
+    }
+
+def get_output_config(config):
+    """
+    Returns the report output settings. columnar ("parquet" or "arrow") also
+    writes one row per (question, retriever) answer next to the JSON report;
+    compact_json writes the JSON report without indentation, and page_size is
+    the number of questions per page of the HTML report.
+    """
+    output = config.get("output", {})
+    columnar = output.get("columnar")
+    if columnar not in (None, "parquet", "arrow"):
+        raise ValueError(f"output.columnar must be \"parquet\" or \"arrow\", got {columnar!r}")
+    page_size = output.get("page_size", 50)
+    if not isinstance(page_size, int) or page_size < 1:
+        raise ValueError(f"output.page_size must be a positive integer, got {page_size!r}")
+    return {
+        "columnar": columnar,
+        "compact_json": bool(output.get("compact_json", False)),
+        "page_size": page_size,
+    }
+
+def get_summary_config(config):
+    """
+    Returns the settings of the LLM report summary. The prompt holds a digest
+    of score statistics, latency percentiles and the worst_n answers of each
+    retriever, cut down to fit max_tokens. With hierarchical, each retriever
+    is summarised in its own call (concurrency calls at a time) and a final
+    call combines those summaries.
+    """
+    summary = config.get("summary", {})
+    settings = {
+        "max_tokens": summary.get("max_tokens", 4000),
+        "worst_n": summary.get("worst_n", 5),
+        "hierarchical": bool(summary.get("hierarchical", False)),
+        "concurrency": summary.get("concurrency", 4),
+    }
+    for key, minimum in (("max_tokens", 1), ("worst_n", 0), ("concurrency", 1)):
+        if not isinstance(settings[key], int) or settings[key] < minimum:
+            raise ValueError(f"summary.{key} must be an integer >= {minimum}, got {settings[key]!r}")
+    return settings
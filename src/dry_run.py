@@ -0,0 +1,144 @@
+import math
+from config_helper import load_config_file, get_ragas_metric_names, get_top_k_groups, RETRIEVER_TYPES
+from config_helper import get_concurrency_config, get_scoring_config, get_llm_cache_config, get_embedding_cache_config
+from config_helper import get_retry_config, get_tracing_config, get_load_test_config, get_warmup_config
+from config_helper import get_score_cache_config, get_pipeline_config, get_output_config, get_summary_config
+from config_helper import get_cypher_cache_config, get_schema_cache_config, get_retrieval_cache_config, get_text2cypher_config
+from knowledge_graph_config import KnowledgeGraphConfig
+from questions import iter_questions
+
+# Config getters that raise ValueError on invalid settings
+CONFIG_GETTERS = (
+    get_concurrency_config,
+    get_scoring_config,
+    get_llm_cache_config,
+    get_embedding_cache_config,
+    get_retry_config,
+    get_tracing_config,
+    get_load_test_config,
+    get_warmup_config,
+    get_score_cache_config,
+    get_pipeline_config,
+    get_output_config,
+    get_summary_config,
+    get_cypher_cache_config,
+    get_schema_cache_config,
+    get_retrieval_cache_config,
+)
+
+
+def check_test_config(config):
+    """
+    Returns the problems found in a test config: invalid settings, unknown
+    metric names, and retrievers with a missing name, params or index_name, a
+    repeated name or an unknown type. Nothing is imported from ragas or
+    neo4j_graphrag and no connection is made.
+    """
+    problems = []
+    for llm_key in ("retrieverLLM", "evaluatorLLM"):
+        if not config.get(llm_key, {}).get("model"):
+            problems.append(f"{llm_key}.model is required")
+    for getter in CONFIG_GETTERS:
+        try:
+            getter(config)
+        except (ValueError, TypeError) as e:
+            # Some getters call others, e.g. get_pipeline_config reads the concurrency
+            if str(e) not in problems:
+                problems.append(str(e))
+    metric_names = get_ragas_metric_names()
+    for metric_name in config.get("metrics", []):
+        if metric_name not in metric_names:
+            problems.append(f"Metric class '{metric_name}' not found in ragas.metrics")
+    retrievers = config.get("retrievers", [])
+    if not retrievers:
+        problems.append("No retrievers configured")
+    names = set()
+    for position, retriever in enumerate(retrievers):
+        name = retriever.get("name")
+        label = name or f"retrievers[{position}]"
+        if not name:
+            problems.append(f"{label} has no name")
+        elif name in names:
+            problems.append(f"Retriever name '{name}' is used more than once")
+        names.add(name)
+        if retriever.get("type") not in RETRIEVER_TYPES:
+            problems.append(f"{label} has unknown type {retriever.get('type')!r}; expected one of {', '.join(RETRIEVER_TYPES)}")
+        if not isinstance(retriever.get("params"), dict):
+            problems.append(f"{label} has no params")
+        elif retriever.get("type") in ("vectorRetriever", "vectorCypherRetriever") and not retriever["params"].get("index_name"):
+            problems.append(f"{label} needs params.index_name")
+        elif retriever.get("type") == "text2CypherRetriever":
+            try:
+                get_text2cypher_config(retriever["params"])
+            except ValueError as e:
+                problems.append(f"{label}: {e}")
+    return problems
+
+
+def plan_run(config_arg):
+    """
+    Validates the questions, KG and test configs of config_arg (the dict main
+    passes to Evaluator.get_evaluator) and returns the planned run: the work
+    item count per retriever or provided-answer source, scoring batches,
+    shared top_k searches and the problems found. Questions are streamed
+    with the same filters as a real run.
+    """
+    problems = []
+    try:
+        KnowledgeGraphConfig.from_json(config_arg["kg_config_json_path"])
+    except (OSError, ValueError) as e:
+        problems.append(f"KG config: {e}")
+    try:
+        config = load_config_file(config_arg["test_config_json_path"])
+    except (OSError, ValueError) as e:
+        problems.append(f"Test config: {e}")
+        config = {}
+    problems.extend(check_test_config(config) if config else [])
+
+    retriever_names = [retriever.get("name") for retriever in config.get("retrievers", [])]
+    work_matrix = {name: 0 for name in retriever_names}
+    question_count = 0
+    question_filters = dict(config_arg.get("question_filters") or {}, shard=config_arg.get("shard"))
+    try:
+        for question in iter_questions(config_arg["questions_json_path"], **question_filters):
+            question_count += 1
+            for answer_obj in question.answers:
+                source = answer_obj.get("source", "ProvidedAnswer")
+                work_matrix[source] = work_matrix.get(source, 0) + 1
+            for name in retriever_names:
+                work_matrix[name] += 1
+    except (OSError, ValueError, KeyError) as e:
+        problems.append(f"Questions: {e!r}")
+
+    work_items = sum(work_matrix.values())
+    try:
+        batch_size = get_scoring_config(config)["batch_size"]
+        shared_groups = len(set(group[0] for group in get_top_k_groups(config).values()))
+    except (KeyError, ValueError):
+        # Already reported by check_test_config
+        batch_size, shared_groups = 1, 0
+    return {
+        "questions": question_count,
+        "metrics": config.get("metrics", []),
+        "work_matrix": work_matrix,
+        "work_items": work_items,
+        "scoring_batches": math.ceil(work_items / batch_size) if work_items else 0,
+        "shared_top_k_searches": shared_groups,
+        "problems": problems,
+    }
+
+
+def print_plan(plan):
+    print(f"Questions: {plan['questions']}")
+    print(f"Metrics: {', '.join(plan['metrics']) or '-'}")
+    print("Work items per retriever / answer source:")
+    for name, count in plan["work_matrix"].items():
+        print(f"  {name}: {count}")
+    print(f"Total: {plan['work_items']} responses in {plan['scoring_batches']} scoring batches"
+          f" ({plan['shared_top_k_searches']} shared top_k searches)")
+    if plan["problems"]:
+        print(f"Found {len(plan['problems'])} problem(s):")
+        for problem in plan["problems"]:
+            print(f"  - {problem}")
+    else:
+        print("Config OK")
@@ -0,0 +1,108 @@
+import collections
+import json
+import threading
+from langchain_core.embeddings import Embeddings
+from cache_store import hash_key
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wraps a langchain Embeddings instance so each distinct text is embedded once.
+
+    Vectors are memoised in an in-memory LRU of up to max_memory_entries texts
+    and, when a DiskCache is given, persisted across runs. Because every vector
+    retriever and the ragas evaluator share this instance, a question is only
+    sent to the embedding model once per run however many retrievers use it.
+    Setting enabled to False passes every call straight to the wrapped embedder.
+    """
+
+    def __init__(self, embedder, disk_cache=None, max_memory_entries=10000):
+        self.embedder = embedder
+        self.disk_cache = disk_cache
+        self.max_memory_entries = max_memory_entries
+        self.model_name = getattr(embedder, "model", type(embedder).__name__)
+        self.enabled = True
+        self.hits = 0
+        self.misses = 0
+        self._memory = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, text):
+        return hash_key(self.model_name, text)
+
+    def _lookup(self, text):
+        key = self._key(text)
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return vector
+        if self.disk_cache is not None:
+            value = self.disk_cache.get(key)
+            if value is not None:
+                vector = json.loads(value)
+                self._remember(key, vector)
+                with self._lock:
+                    self.hits += 1
+                return vector
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def _remember(self, key, vector):
+        with self._lock:
+            self._memory[key] = vector
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+
+    def _store(self, text, vector):
+        key = self._key(text)
+        self._remember(key, vector)
+        if self.disk_cache is not None:
+            self.disk_cache.set(key, json.dumps(vector))
+
+    def embed_query(self, text):
+        if not self.enabled:
+            return self.embedder.embed_query(text)
+        vector = self._lookup(text)
+        if vector is None:
+            vector = self.embedder.embed_query(text)
+            self._store(text, vector)
+        return vector
+
+    def embed_documents(self, texts):
+        if not self.enabled:
+            return self.embedder.embed_documents(texts)
+        vectors = {}
+        missing = []
+        for text in dict.fromkeys(texts):
+            vector = self._lookup(text)
+            if vector is None:
+                missing.append(text)
+            else:
+                vectors[text] = vector
+        if missing:
+            for text, vector in zip(missing, self.embedder.embed_documents(missing)):
+                self._store(text, vector)
+                vectors[text] = vector
+        return [vectors[text] for text in texts]
+
+    def prefetch(self, texts, batch_size=500):
+        """
+        Embeds all texts up front in batched embed_documents calls so later
+        embed_query calls are answered from the cache.
+        """
+        texts = list(dict.fromkeys(texts))
+        for i in range(0, len(texts), batch_size):
+            self.embed_documents(texts[i:i + batch_size])
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "model": self.model_name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -1,20 +1,179 @@
-import seaborn as sns
-import matplotlib.pyplot as plt
 import os
-from langchain_openai import OpenAIEmbeddings
-from ragas import evaluate
-from config_helper import get_retriever_config, get_metrics_from_config, get_evaluator_llm, get_retriever_llm, load_config_file
+from config_helper import get_retriever_config, get_metrics_from_config, get_evaluator_llm, get_retriever_llm, get_embedder, load_config_file
 from neo4j_util import init_neo4j_driver
 from knowledge_graph_config import KnowledgeGraphConfig
 from questions import Questions
-from config_helper import get_metrics, get_retrievers
-from datasets import Dataset
+from config_helper import get_metrics, get_retrievers, get_concurrency_config, get_llm_cache_config, get_embedding_cache_config
+from config_helper import get_llm_rate_limits, get_retry_config, get_tracing_config, get_warmup_config, get_score_cache_config
+from config_helper import get_pipeline_config, get_output_config, get_summary_config, get_cypher_cache_config, get_schema_cache_config
+from config_helper import get_retrieval_cache_config
+from tracing import Tracer, MetricTimingHandler, instrument_method, attach_judge_error_handler, collect_judge_errors
+from pipeline import run_pipeline
+from load_test import run_load_level, generate_load_test_charts, latency_by_phase
+from llm_cache import CachedLLM
+from shared_retriever import is_top_k_slice
+from incremental import fingerprint, load_previous_answers, result_from_previous_answer
+from embedding_cache import CachedEmbeddings
+from score_cache import ScoreCache
+from text2cypher import CypherQueryCache
+from schema_cache import SchemaCache
+from retrieval_cache import RetrievalCache
+from cache_store import DiskCache
+from result_record import ResultRecord
+from report_output import write_report
+from report_digest import summarize_digest
+from checkpoint import CheckpointWriter, load_checkpoint, order_results, result_key, completed_keys
+from scheduler import StageScheduler, RateLimiter, CircuitBreaker, is_retryable_error, estimate_tokens, chars_to_tokens
+import asyncio
 import collections
 import json
+import threading
 import time
 from datetime import datetime, timezone
 import ast
 
+def get_llm_caches(config, output_dir):
+    """
+    Opens the retriever and evaluator LLM caches configured in the test config.
+    Returns an empty dict when llm_cache is not enabled.
+    """
+    cache_config = get_llm_cache_config(config)
+    if cache_config is None:
+        return {}
+    cache_path = os.path.join(output_dir, cache_config["path"])
+    print(f"Using LLM response cache: {cache_path}")
+    return {
+        name: DiskCache(
+            cache_path,
+            namespace=name,
+            max_entries=cache_config["max_entries"],
+            max_age_days=cache_config["max_age_days"],
+        )
+        for name in ("retriever_llm", "evaluator_llm")
+    }
+
+def get_embedding_disk_cache(embedding_cache_config, output_dir):
+    """
+    Opens the persistent embedding cache, or returns None when persist is off.
+    """
+    if not embedding_cache_config["persist"]:
+        return None
+    cache_path = os.path.join(output_dir, embedding_cache_config["path"])
+    print(f"Using embedding cache: {cache_path}")
+    return DiskCache(
+        cache_path,
+        namespace="embeddings",
+        max_age_days=embedding_cache_config["max_age_days"],
+    )
+
+def get_score_disk_cache(config, output_dir):
+    """
+    Opens the persistent score store, or returns None when score_cache is not enabled.
+    """
+    cache_config = get_score_cache_config(config)
+    if cache_config is None:
+        return None
+    cache_path = os.path.join(output_dir, cache_config["path"])
+    print(f"Using score cache: {cache_path}")
+    return DiskCache(
+        cache_path,
+        namespace="scores",
+        max_age_days=cache_config["max_age_days"],
+    )
+
+def get_cypher_disk_cache(config, output_dir):
+    """
+    Opens the cache of generated Text2Cypher queries, or returns None when cypher_cache is not enabled.
+    """
+    cache_config = get_cypher_cache_config(config)
+    if cache_config is None:
+        return None
+    cache_path = os.path.join(output_dir, cache_config["path"])
+    print(f"Using Cypher query cache: {cache_path}")
+    return DiskCache(
+        cache_path,
+        namespace="cypher",
+        max_age_days=cache_config["max_age_days"],
+    )
+
+def get_schema_disk_cache(config, output_dir):
+    """
+    Opens the persistent store of graph schemas, or returns None when schema_cache is not enabled.
+    """
+    cache_config = get_schema_cache_config(config)
+    if cache_config is None:
+        return None
+    cache_path = os.path.join(output_dir, cache_config["path"])
+    print(f"Using schema cache: {cache_path}")
+    return DiskCache(
+        cache_path,
+        namespace="schemas",
+        max_age_days=cache_config["max_age_days"],
+    )
+
+def get_retrieval_disk_cache(config, output_dir, kg_name):
+    """
+    Opens the cache of vector retriever results of one KG, or returns None when retrieval_cache is not enabled.
+    Each KG has its own namespace, so clearing it after the graph changed leaves other KGs' results alone.
+    """
+    cache_config = get_retrieval_cache_config(config)
+    if cache_config is None:
+        return None
+    cache_path = os.path.join(output_dir, cache_config["path"])
+    print(f"Using retrieval cache: {cache_path}")
+    return DiskCache(
+        cache_path,
+        namespace=f"retrieval:{kg_name}",
+        max_age_days=cache_config["max_age_days"],
+    )
+
+def get_checkpoint_path(output_report_path):
+    """
+    Returns the JSONL checkpoint path written next to the report.
+    """
+    return f"{os.path.splitext(output_report_path)[0]}.checkpoint.jsonl"
+
+def create_rate_limiters(config, llm_keys=("retrieverLLM", "evaluatorLLM")):
+    """
+    Returns {llm_key: RateLimiter} for the LLM blocks. Provider limits apply
+    per model, so blocks naming the same model share one limiter, using the
+    lower of their requests_per_minute and tokens_per_minute.
+    """
+    limits_by_model = collections.OrderedDict()
+    for llm_key in llm_keys:
+        rate_limits = get_llm_rate_limits(config, llm_key)
+        model_limits = limits_by_model.setdefault(config.get(llm_key, {}).get("model", llm_key), {})
+        for name in ("requests_per_minute", "tokens_per_minute"):
+            limits = [limit for limit in (model_limits.get(name), rate_limits[name]) if limit]
+            model_limits[name] = min(limits) if limits else None
+    limiters = {
+        model: RateLimiter(model_limits["requests_per_minute"], model_limits["tokens_per_minute"])
+        for model, model_limits in limits_by_model.items()
+    }
+    return {llm_key: limiters[config.get(llm_key, {}).get("model", llm_key)] for llm_key in llm_keys}
+
+def create_stage_scheduler(config, stage, limiter, concurrency):
+    """
+    Builds the StageScheduler for one stage from the RateLimiter of its LLM
+    (see create_rate_limiters) and the retry settings.
+    """
+    retry = get_retry_config(config)
+    return StageScheduler(
+        stage,
+        concurrency,
+        limiter=limiter,
+        circuit_breaker=CircuitBreaker(retry["circuit_breaker_failures"], retry["circuit_breaker_reset_sec"]),
+        max_retries=retry["max_retries"],
+        base_delay_sec=retry["base_delay_sec"],
+        max_delay_sec=retry["max_delay_sec"],
+    )
+
+def get_trace_path(output_report_path):
+    """
+    Returns the Chrome trace path written next to the report.
+    """
+    return f"{os.path.splitext(output_report_path)[0]}_trace.json"
+
 def format_duration(seconds):
     seconds = int(seconds)
     hours, remainder = divmod(seconds, 3600)
@@ -50,41 +209,20 @@ def transform_all_results_to_report(all_results, metadata):
     """
     # Group by question_text
     question_map = collections.OrderedDict()
-    for item in all_results:
-        question = item["question_text"]
-        reference = item["test_data"]["reference"][0] if "reference" in item["test_data"].column_names else ""
-        retriever_name = item["retriever_name"]
-        response = item["test_data"]["response"][0] if "response" in item["test_data"].column_names else ""
-        scores = item["scores"]
-        rag_start_time = item.get("rag_start_time")
-        rag_duration = item.get("rag_duration")
-        rag_duration_sec = item.get("rag_duration_sec")
-        eval_start_time = item.get("eval_start_time")
-        eval_duration = item.get("eval_duration")
-        eval_duration_sec = item.get("eval_duration_sec")
-        context_length = item.get("context_length", 0)
-
+    for record in all_results:
+        question = record.question_text
         if question not in question_map:
             question_map[question] = {
                 "question": question,
-                "reference": reference,
+                "question_id": record.question_id,
+                "reference": record.reference,
                 "retrievers": []
             }
+        answer = {"response": record.response}
+        answer.update(record.answer_fields())
         retriever_entry = {
-            "name": retriever_name,
-            "answers": [
-                {
-                    "response": response,
-                    "scores": scores,
-                    "rag_start_time": rag_start_time,
-                    "rag_duration": rag_duration,
-                    "rag_duration_sec": rag_duration_sec,
-                    "eval_start_time": eval_start_time,
-                    "eval_duration": eval_duration,
-                    "eval_duration_sec": eval_duration_sec,
-                    "context_length": context_length
-                }
-            ]
+            "name": record.retriever_name,
+            "answers": [answer]
         }
         question_map[question]["retrievers"].append(retriever_entry)
 
@@ -107,6 +245,8 @@ def generate_report_charts(results_json, output_report_path):
             retriever = r["name"]
             answer = r["answers"][0]
             for metric, score in answer["scores"].items():
+                if score is None:
+                    continue
                 # Metric per retriever
                 metric_scores.setdefault(metric, {}).setdefault(retriever, []).append(score)
                 # Retriever per metric
@@ -115,13 +255,22 @@ def generate_report_charts(results_json, output_report_path):
     # Prepare data for a grouped bar chart: metrics on x-axis, retrievers as groups
     retrievers = sorted(retriever_scores.keys())
     metrics = sorted(metric_scores.keys())
-    import pandas as pd
+    if not metrics:
+        # e.g. a shard that received no questions
+        print("No scores to chart")
+        return
     data = []
     for metric in metrics:
         for retr in retrievers:
             scores = retriever_scores[retr].get(metric, [])
             avg_score = sum(scores)/len(scores) if scores else 0
             data.append({"Metric": metric, "Retriever": retr, "Average Score": avg_score})
+
+    # Plotting libraries take a while to import, so only charting loads them
+    import pandas as pd
+    import seaborn as sns
+    import matplotlib.pyplot as plt
+
     df = pd.DataFrame(data)
     # Plot grouped vertical bars: metrics on x-axis, retrievers as hue
     plt.figure(figsize=(max(8, len(metrics)*1.5), 6))
@@ -135,222 +284,780 @@ def generate_report_charts(results_json, output_report_path):
     plt.savefig(chart_path)
     plt.close()
 
-def summarize_report_with_llm(report_json, retriever_llm):
+def summarize_report_with_llm(report_json, retriever_llm, summary_config=None):
     """
-    Summarize the report using the retriever LLM and a system prompt. Returns the summary string.
+    Summarize the report using the retriever LLM. The prompt is a token-budgeted
+    digest of the report (see report_digest) rather than the report itself;
+    summary_config defaults to the summary settings of the report's test config.
+    The digest statistics are recorded in metadata.summary_digest.
+    Returns the summary string.
     """
-    system_prompt = (
-        "You are an expert summarizing the report. I have RAGAs retrievers metrics data. "
-        "Give me consise summary and the insights for the context data which helps me identify which retrievers are performing best."
-    )
-    # Compose the input for the LLM
-    user_content = json.dumps(report_json, indent=2)
-    prompt = f"{system_prompt}\n\nReport Data:\n{user_content}"
-    # Use retriever_llm to get summary (assume it has a .invoke or .predict method)
-    try:
-        if hasattr(retriever_llm, "invoke"):
-            summary = retriever_llm.invoke(prompt)
-        elif hasattr(retriever_llm, "predict"):
-            summary = retriever_llm.predict(prompt)
-        else:
-            summary = "[LLM summarization not supported for this retriever_llm type.]"
-    except Exception as e:
-        summary = f"[Error during LLM summarization: {e}]"
+    if summary_config is None:
+        summary_config = get_summary_config(report_json["metadata"].get("config", {}))
+    summary, stats = summarize_digest(report_json, retriever_llm, summary_config)
+    report_json["metadata"]["summary_digest"] = stats
     print(f"Report Summary: {summary}")
-    return summary.content
+    return summary
 
 class Evaluator:
-    def __init__(self, questions, kg_config, config, output_report_path):
-        self.evaluator_llm = get_evaluator_llm(config)
-        self.retriever_llm = get_retriever_llm(config)
+    def __init__(self, questions, kg_config, config, output_report_path, resume_checkpoint_path=None, previous_report_path=None,
+                 shard=None, summarize=True, refresh_schema=False, graph_changed=False):
+        self.llm_caches = get_llm_caches(config, os.path.dirname(output_report_path))
+        self.evaluator_llm = attach_judge_error_handler(
+            get_evaluator_llm(config, llm_cache=self.llm_caches.get("evaluator_llm"))
+        )
+        self.retriever_llm = get_retriever_llm(config, llm_cache=self.llm_caches.get("retriever_llm"))
         self.neo4j_driver = init_neo4j_driver(kg_config)
+        pool_size = kg_config.driver_config["max_connection_pool_size"]
+        if get_concurrency_config(config)["retrieval"] > pool_size:
+            print(f"WARNING: concurrency.retrieval is above the driver's max_connection_pool_size of {pool_size}; "
+                  "retrieval workers will wait for connections")
         self.kg_config = kg_config
         self.config = config
         self.questions = questions
-        self.embedder = OpenAIEmbeddings()
+        self.embedding_cache_config = get_embedding_cache_config(config)
+        self.embedding_disk_cache = get_embedding_disk_cache(self.embedding_cache_config, os.path.dirname(output_report_path))
+        self.embedder = CachedEmbeddings(get_embedder(config), disk_cache=self.embedding_disk_cache)
+        self.tracing_config = get_tracing_config(config)
+        self.tracer = Tracer(keep_spans=self.tracing_config["chrome_trace"])
+        instrument_method(self.tracer, self.embedder, "embed_query", "embed")
+        instrument_method(self.tracer, self.retriever_llm, "invoke", "llm.generate", model=config["retrieverLLM"]["model"])
         self.metrics = get_metrics_from_config(config)        
+        self.score_disk_cache = get_score_disk_cache(config, os.path.dirname(output_report_path))
+        self.score_cache = ScoreCache(self.score_disk_cache, config["evaluatorLLM"]["model"]) if self.score_disk_cache is not None else None
+        self.warmup_config = get_warmup_config(config)
+        self.warmup_metadata = None
+        self.warm_retrievers = set()
+        self._warm_lock = threading.Lock()
         self.output_report_path = output_report_path
+        self.output_config = get_output_config(config)
+        self.resume_checkpoint_path = resume_checkpoint_path
+        # A resumed run keeps appending to the checkpoint it was resumed from
+        self.checkpoint_path = resume_checkpoint_path or get_checkpoint_path(output_report_path)
+        self.previous_report_path = previous_report_path
+        self.shard = shard
+        self.summarize = summarize
+        self.cypher_disk_cache = get_cypher_disk_cache(config, os.path.dirname(output_report_path))
+        self.cypher_cache = CypherQueryCache(self.cypher_disk_cache) if self.cypher_disk_cache is not None else None
+        self.schema_disk_cache = get_schema_disk_cache(config, os.path.dirname(output_report_path))
+        self.schema_cache = SchemaCache(self.schema_disk_cache, refresh=refresh_schema or graph_changed)
+        self.retrieval_disk_cache = get_retrieval_disk_cache(config, os.path.dirname(output_report_path), kg_config.name)
+        self.retrieval_cache = RetrievalCache(self.retrieval_disk_cache) if self.retrieval_disk_cache is not None else None
+        if graph_changed and self.retrieval_cache is not None:
+            print(f"Graph changed: clearing the retrieval cache of {kg_config.name}")
+            self.retrieval_cache.clear()
         self.retrievers = get_retrievers(
             config,
             kg_config=kg_config,
             neo4j_driver=self.neo4j_driver,
             llm=self.retriever_llm,
             embedder=self.embedder,
+            tracer=self.tracer,
+            cypher_cache=self.cypher_cache,
+            schema_cache=self.schema_cache,
+            retrieval_cache=self.retrieval_cache,
         )
 
     def __del__(self):
         self.neo4j_driver.close()
+        for cache in self.llm_caches.values():
+            cache.close()
+        if self.embedding_disk_cache is not None:
+            self.embedding_disk_cache.close()
+        if self.score_disk_cache is not None:
+            self.score_disk_cache.close()
+        if self.cypher_disk_cache is not None:
+            self.cypher_disk_cache.close()
+        if self.schema_disk_cache is not None:
+            self.schema_disk_cache.close()
+        if self.retrieval_disk_cache is not None:
+            self.retrieval_disk_cache.close()
 
     @staticmethod
-    def load_config_files(questions_json_path, kg_config_json_path, test_config_json_path):
-        questions = Questions.load_from_json(questions_json_path)
+    def load_config_files(questions_json_path, kg_config_json_path, test_config_json_path, question_filters=None):
+        questions = Questions.load_from_json(questions_json_path, **(question_filters or {}))
         kg_config = KnowledgeGraphConfig.from_json(kg_config_json_path)
         config = load_config_file(test_config_json_path)
         return questions, kg_config, config
 
     @staticmethod
     def get_evaluator(config_arg):
+        shard = config_arg.get("shard")
+        # Question filters and the shard are applied while the questions file is scanned
+        question_filters = dict(config_arg.get("question_filters") or {}, shard=shard)
         questions, kg_config, config = Evaluator.load_config_files(
             config_arg["questions_json_path"],
             config_arg["kg_config_json_path"],
-            config_arg["test_config_json_path"]            
+            config_arg["test_config_json_path"],
+            question_filters=question_filters
+        )
+        print(f"Loaded {len(questions)} questions")
+        return Evaluator(
+            questions,
+            kg_config,
+            config,
+            output_report_path=config_arg["output_report_path"],
+            resume_checkpoint_path=config_arg.get("resume_checkpoint_path"),
+            previous_report_path=config_arg.get("previous_report_path"),
+            shard=shard,
+            summarize=config_arg.get("summarize", True),
+            refresh_schema=config_arg.get("refresh_schema", False),
+            graph_changed=config_arg.get("graph_changed", False),
         )
-        return Evaluator(questions, kg_config, config, output_report_path=config_arg["output_report_path"])    
 
-    def evaluate_response(self, response_dataset):
+    def evaluate_responses(self, response_dataset, metrics=None):
+        """
+        Scores every row of response_dataset with a single ragas evaluate call,
+        using metrics or all configured metrics. Returns one score dict per row,
+        in dataset order, and the per-row milliseconds spent in each metric as
+        {row_index: {metric: ms}}. Scores ragas could not compute are None.
+        Judge errors are raised rather than scored as NaN, and ragas does not
+        retry them itself, so the evaluation scheduler backs off and retries.
+        A retryable judge error swallowed by a metric is raised as well.
+        """
+        import pandas as pd
+        from ragas import evaluate
+        from ragas.run_config import RunConfig
+
         print(f"Response dataset: {response_dataset}")
 
-        score = evaluate(
-            dataset=response_dataset,
-            metrics=self.metrics,
-            llm=self.evaluator_llm,
-            embeddings=self.embedder,
-        )
+        metric_timing = MetricTimingHandler()
+        with self.tracer.span("ragas.evaluate", rows=len(response_dataset)), collect_judge_errors() as judge_errors:
+            score = evaluate(
+                dataset=response_dataset,
+                metrics=metrics or self.metrics,
+                llm=self.evaluator_llm,
+                embeddings=self.embedder,
+                callbacks=[metric_timing],
+                raise_exceptions=True,
+                # One attempt per call; retries belong to the StageScheduler
+                run_config=RunConfig(max_retries=1),
+            )
+        retryable_errors = [error for error in judge_errors if is_retryable_error(error)]
+        if retryable_errors:
+            raise retryable_errors[0]
 
-        df = score.to_pandas().fillna(0).round(4)
+        df = score.to_pandas().round(4)
         exclude_cols = {"user_input", "retrieved_contexts", "response", "reference"}
-        score_dict = {
-            col: float(df[col].iloc[0])
-            for col in df.columns
-            if col not in exclude_cols
-        }        
-        print(score_dict)
-        return score_dict
+        score_cols = [col for col in df.columns if col not in exclude_cols]
+        score_dicts = [
+            {
+                col: None if pd.isna(df[col].iloc[row]) else float(df[col].iloc[row])
+                for col in score_cols
+            }
+            for row in range(len(df))
+        ]
+        print(score_dicts)
+        return score_dicts, metric_timing.row_metrics
 
-    def run_evaluation(self):
-        all_results = []
+    def get_latency_phase(self, retriever_name):
+        """
+        Returns "cold" for a search that starts before any search of the same
+        retriever has completed (connections, page cache and vector index not
+        yet warm), and "warm" otherwise.
+        """
+        with self._warm_lock:
+            return "warm" if retriever_name in self.warm_retrievers else "cold"
 
-        # 1. Capture start time
+    def mark_warm(self, retriever_name):
+        with self._warm_lock:
+            self.warm_retrievers.add(retriever_name)
+
+    def warm_up(self):
+        """
+        Verifies driver connectivity and runs the configured number of unscored
+        searches through every retriever before measurement starts, so that
+        measured answers are tagged warm. Caches are bypassed so the warm-up
+        does not pre-fill the answers that are measured afterwards. Runs once
+        per Evaluator and returns the warm-up metadata, or None when disabled.
+        """
+        queries_per_retriever = self.warmup_config["queries_per_retriever"]
+        if self.warmup_metadata is not None or queries_per_retriever == 0:
+            return self.warmup_metadata
+        questions = list(self.questions)
+        print(f"Warming up: {queries_per_retriever} unscored queries per retriever")
         start_time_epoch = time.time()
-        start_dt = datetime.fromtimestamp(start_time_epoch)
-        gmt_dt = datetime.fromtimestamp(start_time_epoch, tz=timezone.utc)
-        date_run = start_dt.strftime("%Y-%m-%d")
-        gmt_time = gmt_dt.strftime("%H:%M:%S")
-        start_time = start_dt.strftime("%H:%M:%S")
+        errors = 0
+        with self.tracer.span("warmup"):
+            self.neo4j_driver.verify_connectivity()
+            self.set_caches_enabled(False)
+            try:
+                for retriever_name, rag in self.retrievers.items():
+                    retriever_config = get_retriever_config(self.config, retriever_name)
+                    for i in range(queries_per_retriever if questions else 0):
+                        question = questions[i % len(questions)]
+                        try:
+                            rag.search(query_text=question.question, return_context=True, retriever_config=retriever_config)
+                            self.mark_warm(retriever_name)
+                        except Exception as e:
+                            errors += 1
+                            print(f"Warm-up search failed for {retriever_name}: {e}")
+            finally:
+                self.set_caches_enabled(True)
+        self.warmup_metadata = {
+            "queries_per_retriever": queries_per_retriever,
+            "duration_sec": round(time.time() - start_time_epoch, 3),
+            "errors": errors,
+        }
+        return self.warmup_metadata
 
-        questions_dict = self.questions.get_questions()
-        for question in questions_dict.values():
-            question_id = question.id
-            question_text = question.question
-            ground_truth = question.ground_truth
+    def score_rows(self, rows):
+        """
+        Returns one score dict per row and the per-row metric timings. Without a
+        score cache every row goes to a single evaluate call. With one, each
+        metric score is looked up first; the rows still missing scores are
+        deduplicated and evaluated once per set of missing metrics, and the new
+        scores are stored. Scores that could not be computed stay None.
+        """
+        from datasets import Dataset
 
-            print(f"questionId = {question_id}")
-            print(f"questionText = {question_text}")
+        if self.score_cache is None:
+            scores_list, row_metrics = self.evaluate_responses(Dataset.from_list(rows))
+        else:
+            scores_list = [{} for _ in rows]
+            row_metrics = {}
+            # {missing metric names: {row identity: [row indexes]}}
+            missing = collections.OrderedDict()
+            for index, row in enumerate(rows):
+                missing_names = []
+                for metric in self.metrics:
+                    cached = self.score_cache.lookup(row, metric)
+                    if cached is None:
+                        missing_names.append(metric.name)
+                    else:
+                        scores_list[index].update(cached)
+                if missing_names:
+                    identity = json.dumps(row, sort_keys=True)
+                    missing.setdefault(tuple(missing_names), collections.OrderedDict()).setdefault(identity, []).append(index)
+            for missing_names, distinct_rows in missing.items():
+                metrics = [metric for metric in self.metrics if metric.name in missing_names]
+                row_indexes = list(distinct_rows.values())
+                dataset = Dataset.from_list([rows[indexes[0]] for indexes in row_indexes])
+                group_scores, group_metrics = self.evaluate_responses(dataset, metrics)
+                for group_index, (indexes, scores) in enumerate(zip(row_indexes, group_scores)):
+                    computed = {column: value for column, value in scores.items() if value is not None}
+                    for metric in metrics:
+                        self.score_cache.store(rows[indexes[0]], metric, computed)
+                    for index in indexes:
+                        scores_list[index].update(scores)
+                        row_metrics[index] = group_metrics.get(group_index, {})
+        return scores_list, row_metrics
 
-            responses = []
+    def get_provided_answer_response(self, question, answer_obj):
+        """
+        Builds the response item for an answer supplied in the questions file.
+        """
+        source_name = answer_obj.get("source", "ProvidedAnswer")
+        answer_text = answer_obj.get("answer", "")
+        print(f"Evaluating provided answer from source: {source_name}")
 
-            # Evaluate provided answers (from sources)
-            for answer_obj in question.answers:
-                source_name = answer_obj.get("source", "ProvidedAnswer")
-                answer_text = answer_obj.get("answer", "")
-                print(f"Evaluating provided answer from source: {source_name}")
-
-                # No retriever logic, just use the provided answer
-                rag_start_time_epoch = time.time()
-                rag_start_time = datetime.fromtimestamp(rag_start_time_epoch).strftime("%H:%M:%S")
-                rag_duration_sec = 0
-                rag_duration = format_duration(rag_duration_sec)
-                context_length = len(answer_text)
-
-                response_dataset = Dataset.from_dict(
-                    {
-                        "user_input": [question_text],
-                        "reference": [ground_truth],
-                        "response": [answer_text],
-                        "contexts": [[ground_truth]]
-                    }
-                )
-                responses.append({
-                    "question_id": question_id,
-                    "question_text": question_text,
-                    "retriever_name": source_name,
-                    "context_length": context_length,
-                    "response_dataset": response_dataset,
-                    "rag_start_time": rag_start_time,
-                    "rag_duration": rag_duration,
-                    "rag_duration_sec": rag_duration_sec
-                })
-
-            # Evaluate retrievers as before (if needed)
-            for retriever_name, rag in self.retrievers.items():
-                print(f"Running evaluation for retriever: {retriever_name}")
-
-                rag_start_time_epoch = time.time()
-                rag_start_time = datetime.fromtimestamp(rag_start_time_epoch).strftime("%H:%M:%S")
-                retriever_config = get_retriever_config(self.config, retriever_name)
-                try:
-                    response = rag.search(query_text=question_text, return_context=True, retriever_config=retriever_config)
-                    answer_text = response.answer
-                    print(f"Response: {response.answer}")
-                    length = get_total_context_text_length(response.retriever_result)
-                    print(f"Total context text length sent to LLM: {length} characters")
-                except Exception as e:
-                    answer_text = f"Error occurred during RAG search: {str(e)}"
-                    length = 0  # No context available when there's an error
-                    print(f"RAG search failed: {answer_text}")
-
-                rag_duration_sec = time.time() - rag_start_time_epoch
-                rag_duration = format_duration(rag_duration_sec)
-
-                response_dataset = Dataset.from_dict(
-                    {
-                        "user_input": [question_text],
-                        "reference": [ground_truth],
-                        "response": [answer_text],
-                        "contexts": [[ground_truth]]
-                    }
+        # No retriever logic, just use the provided answer
+        rag_start_time_epoch = time.time()
+        rag_start_time = datetime.fromtimestamp(rag_start_time_epoch).strftime("%H:%M:%S")
+        rag_duration_sec = 0
+        rag_duration = format_duration(rag_duration_sec)
+        context_length = len(answer_text)
+
+        return ResultRecord(
+            question_id=question.id,
+            question_text=question.question,
+            retriever_name=source_name,
+            reference=question.ground_truth,
+            response=answer_text,
+            context_length=context_length,
+            rag_start_time=rag_start_time,
+            rag_duration=rag_duration,
+            rag_duration_sec=rag_duration_sec
+        )
+
+    def get_retriever_response(self, question, retriever_name):
+        """
+        Runs one retriever for one question and builds its response item.
+        Timings are taken inside the task so they exclude any time spent queued.
+        """
+        print(f"Running evaluation for retriever: {retriever_name} (questionId = {question.id})")
+        rag = self.retrievers[retriever_name]
+
+        rag_start_time_epoch = time.time()
+        rag_start_time = datetime.fromtimestamp(rag_start_time_epoch).strftime("%H:%M:%S")
+        retriever_config = get_retriever_config(self.config, retriever_name)
+        if is_top_k_slice(rag.retriever):
+            # Shared top_k searches are keyed on the question, not only its text
+            retriever_config = dict(retriever_config, question_id=question.id)
+        latency_phase = self.get_latency_phase(retriever_name)
+        error = None
+        with self.tracer.span("rag", question_id=question.id, retriever=retriever_name, latency_phase=latency_phase) as rag_span:
+            try:
+                response = rag.search(query_text=question.question, return_context=True, retriever_config=retriever_config)
+                answer_text = response.answer
+                print(f"Response: {response.answer}")
+                length = get_total_context_text_length(response.retriever_result)
+                print(f"Total context text length sent to LLM: {length} characters")
+                llm_chars = len(question.question) + len(answer_text) + sum(
+                    len(str(item.content)) for item in response.retriever_result.items
                 )
-                responses.append({
-                    "question_id": question_id,
-                    "question_text": question_text,
-                    "retriever_name": retriever_name,
-                    "context_length": length,
-                    "response_dataset": response_dataset,
-                    "rag_start_time": rag_start_time,
-                    "rag_duration": rag_duration,
-                    "rag_duration_sec": rag_duration_sec
-                })
-
-            for response_item in responses:
-                item_dataset = response_item["response_dataset"]
-                # 5. Capture eval_start_time
-                eval_start_time_epoch = time.time()
-                eval_start_time = datetime.fromtimestamp(eval_start_time_epoch).strftime("%H:%M:%S")
-                scores = self.evaluate_response(item_dataset)
-                eval_duration_sec = time.time() - eval_start_time_epoch
-                eval_duration = format_duration(eval_duration_sec)
-                all_results.append({
-                    "scores": scores,
-                    "question_id": response_item["question_id"],
-                    "question_text": response_item["question_text"],
-                    "retriever_name": response_item["retriever_name"],
-                    "test_data": item_dataset,
-                    "rag_start_time": response_item["rag_start_time"],
-                    "rag_duration": response_item["rag_duration"],
-                    "rag_duration_sec": response_item["rag_duration_sec"],
-                    "eval_start_time": eval_start_time,
-                    "eval_duration": eval_duration,
-                    "eval_duration_sec": eval_duration_sec,
-                    "context_length": response_item["context_length"]
-                })
+                self.mark_warm(retriever_name)
+            except Exception as e:
+                if is_retryable_error(e):
+                    # Rate-limit and transient errors are retried by the scheduler
+                    raise
+                error = e
+        if error is not None:
+            record = self.get_error_response(question, retriever_name, error, rag_start_time_epoch, rag_stages=rag_span.to_dict())
+            record.latency_phase = latency_phase
+            return record
+
+        rag_duration_sec = time.time() - rag_start_time_epoch
+        rag_duration = format_duration(rag_duration_sec)
+
+        return ResultRecord(
+            question_id=question.id,
+            question_text=question.question,
+            retriever_name=retriever_name,
+            reference=question.ground_truth,
+            response=answer_text,
+            context_length=length,
+            rag_start_time=rag_start_time,
+            rag_duration=rag_duration,
+            rag_duration_sec=rag_duration_sec,
+            rag_stages=rag_span.to_dict(),
+            latency_phase=latency_phase,
+            llm_chars=llm_chars,
+            cypher=(response.retriever_result.metadata or {}).get("cypher_check"),
+        )
+
+    def get_error_response(self, question, retriever_name, error, rag_start_time_epoch, rag_stages=None):
+        """
+        Builds the response item for a failed RAG search. It carries an error
+        field so the scoring stage skips it instead of scoring the error text.
+        """
+        answer_text = f"Error occurred during RAG search: {str(error)}"
+        print(f"RAG search failed: {answer_text}")
+        rag_duration_sec = time.time() - rag_start_time_epoch
+        return ResultRecord(
+            question_id=question.id,
+            question_text=question.question,
+            retriever_name=retriever_name,
+            reference=question.ground_truth,
+            response=answer_text,
+            context_length=0,  # No context available when there's an error
+            rag_start_time=datetime.fromtimestamp(rag_start_time_epoch).strftime("%H:%M:%S"),
+            rag_duration=format_duration(rag_duration_sec),
+            rag_duration_sec=rag_duration_sec,
+            rag_stages=rag_stages,
+            error=str(error),
+            # Why a generated Text2Cypher query was rejected or failed
+            cypher=getattr(error, "cypher_check", None),
+        )
+
+    def get_response(self, work_item):
+        """
+        Dispatches a (kind, question, target) work item to the matching response builder.
+        """
+        kind, question, target = work_item
+        if kind == "provided":
+            response = self.get_provided_answer_response(question, target)
+        else:
+            response = self.get_retriever_response(question, target)
+        response.fingerprint = self.get_work_item_fingerprint(work_item)
+        return response
+
+    def score_responses(self, records):
+        """
+        Scores a chunk of result records with one ragas evaluate call, filling in
+        their scores and evaluation timings, and returns them. eval_duration_sec
+        is the chunk wall time amortised over its rows; the wall time itself is
+        kept in eval_batch_duration_sec. Failed RAG searches are not scored and
+        keep empty scores.
+        """
+        # Capture eval_start_time
+        eval_start_time_epoch = time.time()
+        eval_start_time = datetime.fromtimestamp(eval_start_time_epoch).strftime("%H:%M:%S")
+        rows_to_score = [record.to_row() for record in records if not record.error]
+        scores_list = []
+        row_metrics = {}
+        if rows_to_score:
+            scores_list, row_metrics = self.score_rows(rows_to_score)
+        if len(scores_list) != len(rows_to_score):
+            raise ValueError(f"Expected {len(rows_to_score)} score rows from ragas, got {len(scores_list)}")
+        eval_batch_duration_sec = time.time() - eval_start_time_epoch
+        eval_duration_sec = eval_batch_duration_sec / max(len(rows_to_score), 1)
+        eval_duration = format_duration(eval_duration_sec)
+
+        scores_iter = iter(enumerate(scores_list))
+        for record in records:
+            stages = {}
+            if record.rag_stages:
+                stages["rag"] = record.rag_stages
+            if not record.error:
+                row_index, record.scores = next(scores_iter)
+                stages["evaluation"] = {
+                    "batch_duration_ms": round(eval_batch_duration_sec * 1000, 3),
+                    "metrics_ms": row_metrics.get(row_index, {}),
+                }
+            record.stages = stages
+            record.eval_start_time = eval_start_time
+            record.eval_duration = eval_duration
+            record.eval_duration_sec = eval_duration_sec
+            record.eval_batch_size = len(rows_to_score)
+            record.eval_batch_duration_sec = eval_batch_duration_sec
+        return records
+
+    def get_llm_requests_per_search(self, retriever_name):
+        """
+        Returns the retriever LLM calls one search makes: a Text2Cypher search
+        generates the Cypher query and then the answer, other retrievers only
+        the answer.
+        """
+        for retriever_cfg in self.config.get("retrievers", []):
+            if retriever_cfg.get("name") == retriever_name and retriever_cfg.get("type") == "text2CypherRetriever":
+                return 2
+        return 1
+
+    async def retrieve(self, scheduler, work_item):
+        """
+        Runs one work item through the retrieval scheduler. Provided answers are
+        not throttled; retriever calls are, and a search that still fails after
+        the scheduler's retries is recorded as an error response.
+        """
+        kind, question, target = work_item
+        if kind == "provided":
+            response, _ = await scheduler.run(self.get_response, work_item, throttled=False)
+            return response
+        estimated_tokens = get_llm_rate_limits(self.config, "retrieverLLM")["estimated_tokens_per_request"]
+        requests = self.get_llm_requests_per_search(target)
+        rag_start_time_epoch = time.time()
+        try:
+            response, throttle_wait_sec = await scheduler.run(
+                self.get_response, work_item, requests=requests, tokens=estimated_tokens * requests
+            )
+        except Exception as e:
+            return self.get_error_response(question, target, e, rag_start_time_epoch)
+        # llm_chars covers the answer call; a Cypher generation call keeps its estimate
+        generation_calls = requests - 1
+        if generation_calls and (response.cypher or {}).get("cache_hit"):
+            # A cached Cypher query skipped the generation call
+            scheduler.limiter.adjust_requests(-generation_calls)
+            generation_calls = 0
+        used_tokens = chars_to_tokens(response.llm_chars) + estimated_tokens * generation_calls
+        scheduler.limiter.adjust_tokens(used_tokens - estimated_tokens * requests)
+        response.rag_throttle_wait_sec = throttle_wait_sec
+        return response
+
+    async def score(self, scheduler, records):
+        """
+        Runs one scoring chunk through the evaluation scheduler. Each row is
+        expected to cost one judge request per metric. When scoring still fails
+        after the scheduler's retries, the chunk's rows are marked as errors so
+        --resume scores them again.
+        """
+        rows = [record.to_row() for record in records if not record.error]
+        metric_count = max(len(self.metrics), 1)
+        tokens = metric_count * sum(
+            estimate_tokens(row["user_input"], row["reference"], row["response"], *row["contexts"]) for row in rows
+        )
+        try:
+            results, throttle_wait_sec = await scheduler.run(
+                self.score_responses, records, requests=max(len(rows), 1) * metric_count, tokens=tokens
+            )
+        except Exception as e:
+            print(f"Scoring failed for {len(rows)} responses: {e}")
+            for record in records:
+                if not record.error:
+                    record.error = f"Scoring failed: {e}"
+            return records
+        for record in results:
+            record.eval_throttle_wait_sec = throttle_wait_sec
+        return results
+
+    async def run_stages(self, pending_items, checkpoint, retrieval_scheduler, evaluation_scheduler, pipeline_config):
+        """
+        Runs retrieval and scoring as a pipeline: retrieval workers push finished
+        responses into a bounded queue that scoring workers drain in batches, so
+        Neo4j and the judge LLM are busy at the same time. Scored results are
+        written to the checkpoint as each batch finishes. Returns the queue statistics.
+        """
+        async def score_batch(records):
+            for record in await self.score(evaluation_scheduler, records):
+                checkpoint.write(record.to_dict())
+
+        return await run_pipeline(
+            pending_items,
+            produce=lambda work_item: self.retrieve(retrieval_scheduler, work_item),
+            consume=score_batch,
+            producers=retrieval_scheduler.concurrency,
+            consumers=evaluation_scheduler.concurrency,
+            queue_size=pipeline_config["queue_size"],
+            batch_size=pipeline_config["batch_size"],
+            batch_wait_sec=pipeline_config["batch_wait_sec"],
+        )
+
+    def get_work_items(self):
+        """
+        Returns the (kind, question, target) work items in report order:
+        for each question, its provided answers first and then every retriever.
+        """
+        work_items = []
+        for question in self.questions:
+            for answer_obj in question.answers:
+                work_items.append(("provided", question, answer_obj))
+            for retriever_name in self.retrievers:
+                work_items.append(("retriever", question, retriever_name))
+        return work_items
+
+    def prefetch_question_embeddings(self, work_items):
+        """
+        Embeds every distinct question of the retriever work items once, in
+        batches, before retrieval starts so the vector retrievers share the
+        cached query vectors. Questions with no search left to run, e.g. after
+        --resume or --incremental, are not embedded.
+        """
+        vector_types = ("vectorRetriever", "vectorCypherRetriever")
+        if not any(r.get("type") in vector_types for r in self.config.get("retrievers", [])):
+            return
+        texts = list(dict.fromkeys(question.question for kind, question, _ in work_items if kind == "retriever"))
+        if not texts:
+            return
+        print(f"Embedding {len(texts)} distinct questions")
+        with self.tracer.span("embed.prefetch", texts=len(texts)):
+            self.embedder.prefetch(texts, batch_size=self.embedding_cache_config["prefetch_batch_size"])
+
+    def get_work_item_key(self, work_item):
+        """
+        Returns the (question_id, retriever_name) key a work item's result is stored under.
+        """
+        kind, question, target = work_item
+        if kind == "provided":
+            return result_key(question.id, target.get("source", "ProvidedAnswer"))
+        return result_key(question.id, target)
+
+    def get_run_metadata(self, start_time_epoch):
+        """
+        Returns the metadata every report starts with: when the run started, how
+        long it took, the KG config (without the password) and the test config.
+        Neo4j pool usage is recorded under neo4j_pool, and a shard run also
+        records which shard it covered.
+        """
+        start_dt = datetime.fromtimestamp(start_time_epoch)
+        gmt_dt = datetime.fromtimestamp(start_time_epoch, tz=timezone.utc)
 
         # Remove password from kg_config for metadata
         kg_config_metadata = dict(self.kg_config.__dict__)
         if "neo4j_password" in kg_config_metadata:
             kg_config_metadata["neo4j_password"] = "***"
 
-        # 2. Record total time elapsed before results_json
+        # Record total time elapsed before results_json
         total_duration_sec = time.time() - start_time_epoch
         total_duration = format_duration(total_duration_sec)
 
         metadata = {
-            "date_run": date_run,
-            "gmt_time": gmt_time,
-            "start_time": start_time,
+            "date_run": start_dt.strftime("%Y-%m-%d"),
+            "gmt_time": gmt_dt.strftime("%H:%M:%S"),
+            "start_time": start_dt.strftime("%H:%M:%S"),
             "total_duration": total_duration,
+            "start_time_epoch": start_time_epoch,
+            "total_duration_sec": round(total_duration_sec, 3),
             "kg_config": kg_config_metadata,
             "config": self.config
         }
+        # Only set on drivers created by init_neo4j_driver
+        pool_stats = getattr(self.neo4j_driver, "pool_stats", None)
+        if pool_stats is not None:
+            metadata["neo4j_pool"] = pool_stats.stats()
+        if self.shard is not None:
+            metadata["shard"] = {
+                "index": self.shard[0],
+                "count": self.shard[1],
+                "questions": len(self.questions),
+            }
+        return metadata
+
+    def set_caches_enabled(self, enabled):
+        """
+        Turns the embedding cache, the retriever LLM cache, the Cypher query
+        cache, the retrieval cache and top_k result sharing on or off, so a
+        load test measures real calls every time.
+        """
+        self.embedder.enabled = enabled
+        if isinstance(self.retriever_llm, CachedLLM):
+            self.retriever_llm.enabled = enabled
+        if self.cypher_cache is not None:
+            self.cypher_cache.enabled = enabled
+        if self.retrieval_cache is not None:
+            self.retrieval_cache.enabled = enabled
+        for rag in self.retrievers.values():
+            if is_top_k_slice(rag.retriever):
+                rag.retriever.shared_search.enabled = enabled
+
+    def run_load_test(self, concurrency_levels, repetitions=1, score=False):
+        """
+        Replays the questions against each retriever at every concurrency level
+        and records latency percentiles, throughput and error rate per level in
+        the report metadata under load_test. Caches are bypassed while the load
+        test runs. With score=True the normal scored evaluation runs afterwards
+        and its report carries the load test results; otherwise a report with
+        only the load test metadata is written.
+        """
+        start_time_epoch = time.time()
+        self.warm_up()
+        questions = list(self.questions)
+        load_test = {
+            "concurrency_levels": concurrency_levels,
+            "repetitions": repetitions,
+            "questions": len(questions),
+            "retrievers": {},
+        }
+        self.set_caches_enabled(False)
+        try:
+            for retriever_name in self.retrievers:
+                levels = []
+                for concurrency in concurrency_levels:
+                    print(f"Load testing {retriever_name}: {len(questions) * repetitions} requests at concurrency {concurrency}")
+                    level = run_load_level(
+                        lambda question: self.get_retriever_response(question, retriever_name),
+                        questions,
+                        concurrency,
+                        repetitions,
+                    )
+                    print(f"{retriever_name} @ {concurrency}: p50 {level['latency_sec']['p50']}s, "
+                          f"p95 {level['latency_sec']['p95']}s, {level['throughput_qps']} q/s, "
+                          f"error rate {level['error_rate']}")
+                    levels.append(level)
+                load_test["retrievers"][retriever_name] = levels
+        finally:
+            self.set_caches_enabled(True)
+        load_test["chart_path"] = generate_load_test_charts(load_test, self.output_report_path)
+
+        if score:
+            return self.run_evaluation(extra_metadata={"load_test": load_test})
+
+        metadata = self.get_run_metadata(start_time_epoch)
+        if self.warmup_metadata is not None:
+            metadata["warmup"] = self.warmup_metadata
+        metadata["load_test"] = load_test
+        results_json = transform_all_results_to_report([], metadata)
+        write_report(results_json, self.output_report_path, self.output_config)
+        return []
+
+    def get_work_item_fingerprint(self, work_item):
+        kind, question, target = work_item
+        return fingerprint(self.config, self.kg_config, question, kind, target)
+
+    def get_reusable_results(self, work_items):
+        """
+        Returns {work item key: result entry} for the work items whose
+        fingerprint matches an answer in the previous report.
+        """
+        previous_answers = load_previous_answers(self.previous_report_path)
+        reusable = {}
+        for work_item in work_items:
+            key = self.get_work_item_key(work_item)
+            _, question, _ = work_item
+            previous = previous_answers.get((question.question, key[1]))
+            if previous is None:
+                continue
+            reference, answer = previous
+            if answer["fingerprint"] == self.get_work_item_fingerprint(work_item):
+                reusable[key] = result_from_previous_answer(question, key[1], reference, answer)
+        return reusable
+
+    def run_evaluation(self, extra_metadata=None):
+        # 1. Capture start time
+        start_time_epoch = time.time()
+
+        concurrency = get_concurrency_config(self.config)
+        work_items = self.get_work_items()
+        work_item_keys = [self.get_work_item_key(work_item) for work_item in work_items]
+
+        pending_items = work_items
+        resumed_count = 0
+        if self.resume_checkpoint_path:
+            completed = completed_keys(load_checkpoint(self.resume_checkpoint_path))
+            pending_items = [
+                work_item for work_item, key in zip(work_items, work_item_keys)
+                if key not in completed
+            ]
+            resumed_count = len(work_items) - len(pending_items)
+            print(f"Resuming from {self.resume_checkpoint_path}: {resumed_count} of {len(work_items)} responses already completed")
+        reusable_results = {}
+        if self.previous_report_path:
+            reusable_results = self.get_reusable_results(pending_items)
+            pending_items = [
+                work_item for work_item in pending_items
+                if self.get_work_item_key(work_item) not in reusable_results
+            ]
+            print(f"Reusing {len(reusable_results)} unchanged results from {self.previous_report_path}")
+        print(f"Running {len(pending_items)} responses with concurrency {concurrency}")
+        print(f"Writing results to checkpoint: {self.checkpoint_path}")
+
+        # Nothing to measure, so no warm-up queries
+        if pending_items:
+            self.warm_up()
+        self.prefetch_question_embeddings(pending_items)
+
+        # Responses flow from retrieval to scoring through a bounded queue, so
+        # at most queue_size responses plus one partial batch per scoring worker
+        # are held in memory; scored results go straight to the checkpoint.
+        pipeline_config = get_pipeline_config(self.config)
+        limiters = create_rate_limiters(self.config)
+        retrieval_scheduler = create_stage_scheduler(self.config, "retrieval", limiters["retrieverLLM"], concurrency["retrieval"])
+        evaluation_scheduler = create_stage_scheduler(self.config, "evaluation", limiters["evaluatorLLM"], concurrency["evaluation"])
+        try:
+            with CheckpointWriter(self.checkpoint_path, append=bool(self.resume_checkpoint_path)) as checkpoint:
+                for record in reusable_results.values():
+                    checkpoint.write(record.to_dict())
+                pipeline_stats = asyncio.run(self.run_stages(
+                    pending_items, checkpoint, retrieval_scheduler, evaluation_scheduler, pipeline_config
+                ))
+        finally:
+            retrieval_scheduler.shutdown()
+            evaluation_scheduler.shutdown()
+
+        # Rebuild the results from the checkpoint stream in report order; this
+        # also picks up the results completed before a resume.
+        all_results = [
+            ResultRecord.from_dict(result)
+            for result in order_results(load_checkpoint(self.checkpoint_path), work_item_keys)
+        ]
+
+        # 2. Record total time elapsed before results_json
+        metadata = self.get_run_metadata(start_time_epoch)
+        metadata["checkpoint_path"] = self.checkpoint_path
+        metadata["scheduler"] = {
+            "retrieval": retrieval_scheduler.stats(pipeline_stats["wall_time_sec"]),
+            "evaluation": evaluation_scheduler.stats(pipeline_stats["wall_time_sec"]),
+        }
+        metadata["pipeline"] = pipeline_stats
+        if self.resume_checkpoint_path:
+            metadata["resumed_from"] = self.resume_checkpoint_path
+            metadata["resumed_results"] = resumed_count
+        if self.previous_report_path:
+            metadata["incremental"] = {
+                "previous_report": self.previous_report_path,
+                "reused_results": len(reusable_results),
+                "rerun_results": len(pending_items),
+            }
+        if self.warmup_metadata is not None:
+            metadata["warmup"] = self.warmup_metadata
+        metadata["latency_by_phase"] = latency_by_phase(all_results)
+        metadata["embedding_cache"] = self.embedder.stats()
+        if self.score_cache is not None:
+            metadata["score_cache"] = self.score_cache.stats()
+        if self.cypher_cache is not None:
+            metadata["cypher_cache"] = self.cypher_cache.stats()
+        if self.retrieval_cache is not None:
+            metadata["retrieval_cache"] = self.retrieval_cache.stats()
+        if self.schema_cache.stats():
+            metadata["schemas"] = self.schema_cache.stats()
+        if self.llm_caches:
+            metadata["llm_cache"] = {name: cache.stats() for name, cache in self.llm_caches.items()}
+
+        if self.tracing_config["chrome_trace"]:
+            trace_path = get_trace_path(self.output_report_path)
+            self.tracer.write_chrome_trace(trace_path)
+            metadata["trace_path"] = trace_path
+            print(f"Chrome trace written to: {trace_path}")
+        metadata.update(extra_metadata or {})
 
         results_json = transform_all_results_to_report(all_results, metadata)
 
@@ -358,16 +1065,15 @@ class Evaluator:
         generate_report_charts(results_json, self.output_report_path)
 
         # Summarize report using retriever LLM
-
-        report_summary = summarize_report_with_llm(results_json, self.retriever_llm)
-        # If LLMResponse or other non-serializable, convert to string
-        if not isinstance(report_summary, str):
-            report_summary = str(report_summary)
-        results_json["report_summary"] = report_summary
+        if self.summarize:
+            report_summary = summarize_report_with_llm(results_json, self.retriever_llm)
+            # If LLMResponse or other non-serializable, convert to string
+            if not isinstance(report_summary, str):
+                report_summary = str(report_summary)
+            results_json["report_summary"] = report_summary
 
         # Save updated report with summary
-        with open(self.output_report_path, "w") as f:
-            f.write(json.dumps(results_json, indent=4))
+        write_report(results_json, self.output_report_path, self.output_config)
 
         return all_results
 
@@ -0,0 +1,64 @@
+import json
+from cache_store import hash_key
+from result_record import ResultRecord
+
+
+def get_retriever_block(config, retriever_name):
+    """
+    Returns the full config block (type, params, retriever_config) of a retriever.
+    """
+    for retriever in config.get("retrievers", []):
+        if retriever.get("name") == retriever_name:
+            return retriever
+    return {}
+
+
+def fingerprint(config, kg_config, question, kind, target):
+    """
+    Hashes everything that determines the result of one (question, retriever)
+    pair: question text and ground truth, the retriever config block (or the
+    provided answer), the Neo4j URI and database, both LLM models and the metrics.
+    """
+    if kind == "provided":
+        source = target
+        kg = None
+    else:
+        source = get_retriever_block(config, target)
+        kg = (getattr(kg_config, "neo4j_uri", None), getattr(kg_config, "neo4j_database", None))
+    return hash_key(
+        question.question,
+        question.ground_truth,
+        kind,
+        source,
+        kg,
+        config.get("retrieverLLM", {}).get("model"),
+        config.get("evaluatorLLM", {}).get("model"),
+        sorted(config.get("metrics", [])),
+    )
+
+
+def load_previous_answers(report_path):
+    """
+    Reads a report written by transform_all_results_to_report and returns
+    {(question_text, retriever_name): (reference, answer)} for every answer
+    that has a fingerprint and did not fail. Reports written before
+    fingerprints were added yield nothing, so every pair is rerun.
+    """
+    with open(report_path, "r", encoding="utf-8") as f:
+        report = json.load(f)
+    answers = {}
+    for question_entry in report.get("report", []):
+        for retriever_entry in question_entry["retrievers"]:
+            answer = retriever_entry["answers"][0]
+            if answer.get("fingerprint") and not answer.get("error"):
+                answers[(question_entry["question"], retriever_entry["name"])] = (question_entry["reference"], answer)
+    return answers
+
+
+def result_from_previous_answer(question, retriever_name, reference, answer):
+    """
+    Turns an answer copied from a previous report back into a result record.
+    """
+    record = ResultRecord.from_answer(question.id, question.question, retriever_name, reference, answer)
+    record.reused = True
+    return record
@@ -1,5 +1,36 @@
 import json
 
+# Driver settings a KG config can override; the values are the neo4j driver defaults
+DRIVER_DEFAULTS = {
+    "max_connection_pool_size": 100,
+    "connection_acquisition_timeout": 60.0,
+    "max_connection_lifetime": 3600.0,
+    "fetch_size": 1000,
+    "verify_connectivity": True,
+}
+
+def get_driver_config(driver_dict):
+    """
+    Returns the driver settings of a KG config: pool size, seconds to wait
+    for a free connection, seconds before a connection is replaced, records
+    fetched per batch and whether to check connectivity when the driver is created.
+    """
+    unknown = sorted(set(driver_dict) - set(DRIVER_DEFAULTS))
+    if unknown:
+        raise ValueError(f"Unknown driver settings: {', '.join(unknown)}")
+    driver_config = dict(DRIVER_DEFAULTS, **driver_dict)
+    for name in ("max_connection_pool_size", "fetch_size"):
+        value = driver_config[name]
+        if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+            raise ValueError(f"driver.{name} must be a positive integer, got {value!r}")
+    for name in ("connection_acquisition_timeout", "max_connection_lifetime"):
+        value = driver_config[name]
+        if not isinstance(value, (int, float)) or isinstance(value, bool) or value <= 0:
+            raise ValueError(f"driver.{name} must be a positive number of seconds, got {value!r}")
+    if not isinstance(driver_config["verify_connectivity"], bool):
+        raise ValueError(f"driver.verify_connectivity must be true or false, got {driver_config['verify_connectivity']!r}")
+    return driver_config
+
 class KnowledgeGraphConfig:
     def __init__(self, config_dict):
         # Validate required fields
@@ -21,6 +52,7 @@ class KnowledgeGraphConfig:
             self.name = f"{self.neo4j_uri}_{self.neo4j_database}"
 
         self.description = config_dict.get("description", "")
+        self.driver_config = get_driver_config(config_dict.get("driver", {}))
 
     @staticmethod
     def from_json(json_filename):
@@ -32,5 +64,6 @@ class KnowledgeGraphConfig:
         return (
             f"KnowledgeGraphConfig(name={self.name!r}, description={self.description!r}, "
             f"neo4j_uri={self.neo4j_uri!r}, neo4j_user={self.neo4j_user!r}, "
-            f"neo4j_password={'***'}, neo4j_database={self.neo4j_database!r})"
+            f"neo4j_password={'***'}, neo4j_database={self.neo4j_database!r}, "
+            f"driver_config={self.driver_config!r})"
         )
\ No newline at end of file
@@ -0,0 +1,83 @@
+import json
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+from neo4j_graphrag.llm import LLMInterface
+from neo4j_graphrag.llm.types import LLMResponse
+from cache_store import hash_key
+
+
+def _message_history_key(message_history):
+    if message_history is None:
+        return None
+    # MessageHistory objects expose their messages; plain lists are used as is
+    messages = getattr(message_history, "messages", message_history)
+    return [dict(message) for message in messages]
+
+
+class CachedLLM(LLMInterface):
+    """
+    Wraps a neo4j_graphrag LLM so that identical calls are answered from a DiskCache.
+    The key covers the LLM class, model name, model params, system instruction,
+    message history and the full input text. Setting enabled to False bypasses the cache.
+    """
+
+    def __init__(self, llm, cache):
+        super().__init__(model_name=llm.model_name, model_params=llm.model_params)
+        self.llm = llm
+        self.cache = cache
+        self.enabled = True
+
+    def _cache_key(self, input, message_history, system_instruction):
+        return hash_key(
+            type(self.llm).__name__,
+            self.llm.model_name,
+            self.llm.model_params,
+            system_instruction,
+            _message_history_key(message_history),
+            input,
+        )
+
+    def invoke(self, input, message_history=None, system_instruction=None):
+        if not self.enabled:
+            return self.llm.invoke(input, message_history, system_instruction=system_instruction)
+        key = self._cache_key(input, message_history, system_instruction)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return LLMResponse(content=cached)
+        response = self.llm.invoke(input, message_history, system_instruction=system_instruction)
+        self.cache.set(key, response.content)
+        return response
+
+    async def ainvoke(self, input, message_history=None, system_instruction=None):
+        if not self.enabled:
+            return await self.llm.ainvoke(input, message_history, system_instruction=system_instruction)
+        key = self._cache_key(input, message_history, system_instruction)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return LLMResponse(content=cached)
+        response = await self.llm.ainvoke(input, message_history, system_instruction=system_instruction)
+        self.cache.set(key, response.content)
+        return response
+
+
+class LangchainDiskCache(BaseCache):
+    """
+    langchain cache backed by a DiskCache, for the ChatOpenAI model wrapped by ragas.
+    langchain passes the model name and all call params in llm_string.
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def lookup(self, prompt, llm_string):
+        value = self.cache.get(hash_key(llm_string, prompt))
+        if value is None:
+            return None
+        return [loads(generation) for generation in json.loads(value)]
+
+    def update(self, prompt, llm_string, return_val):
+        value = json.dumps([dumps(generation) for generation in return_val])
+        self.cache.set(hash_key(llm_string, prompt), value)
+
+    def clear(self, **kwargs):
+        self.cache.clear()
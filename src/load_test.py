@@ -0,0 +1,116 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def percentile(values, p):
+    """
+    Returns the p-th percentile of values using linear interpolation between
+    closest ranks (the same method as numpy's default). Returns None for no values.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * p / 100.0
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def latency_stats(latencies):
+    """
+    Summarises latency samples (seconds) as mean/min/max and p50/p90/p95/p99.
+    """
+    stats = {
+        "count": len(latencies),
+        "mean": round(sum(latencies) / len(latencies), 4) if latencies else None,
+        "min": round(min(latencies), 4) if latencies else None,
+        "max": round(max(latencies), 4) if latencies else None,
+    }
+    for p in PERCENTILES:
+        value = percentile(latencies, p)
+        stats[f"p{p}"] = round(value, 4) if value is not None else None
+    return stats
+
+
+def run_load_level(search, questions, concurrency, repetitions):
+    """
+    Replays every question repetitions times through search(question) with
+    concurrency calls in flight. search returns a ResultRecord; a record with
+    an error, or an exception, counts as a failed request. Latency is
+    timed inside each call so it does not include time waiting for a worker.
+    """
+    tasks = [question for _ in range(repetitions) for question in questions]
+
+    def timed_search(question):
+        start = time.perf_counter()
+        try:
+            ok = not search(question).error
+        except Exception as e:
+            print(f"Load test request failed: {e}")
+            ok = False
+        return time.perf_counter() - start, ok
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(timed_search, tasks))
+    wall_time_sec = time.perf_counter() - wall_start
+
+    latencies = [latency for latency, ok in results if ok]
+    errors = len(results) - len(latencies)
+    return {
+        "concurrency": concurrency,
+        "requests": len(results),
+        "errors": errors,
+        "error_rate": round(errors / len(results), 4) if results else 0.0,
+        "wall_time_sec": round(wall_time_sec, 3),
+        "throughput_qps": round(len(latencies) / wall_time_sec, 3) if wall_time_sec > 0 else None,
+        "latency_sec": latency_stats(latencies),
+    }
+
+
+def generate_load_test_charts(load_test, output_report_path):
+    """
+    Plots p50/p95 latency and throughput against concurrency for every retriever
+    and saves the chart next to the report. Returns the chart path.
+    """
+    import matplotlib.pyplot as plt
+
+    fig, (latency_ax, throughput_ax) = plt.subplots(1, 2, figsize=(14, 6))
+    for retriever_name, levels in load_test["retrievers"].items():
+        concurrency = [level["concurrency"] for level in levels]
+        for p, style in (("p50", "-o"), ("p95", "--o")):
+            latency_ax.plot(concurrency, [level["latency_sec"][p] for level in levels], style, label=f"{retriever_name} {p}")
+        throughput_ax.plot(concurrency, [level["throughput_qps"] for level in levels], "-o", label=retriever_name)
+    latency_ax.set_title("Latency vs Concurrency")
+    latency_ax.set_xlabel("Concurrent requests")
+    latency_ax.set_ylabel("Latency (s)")
+    latency_ax.legend()
+    throughput_ax.set_title("Throughput vs Concurrency")
+    throughput_ax.set_xlabel("Concurrent requests")
+    throughput_ax.set_ylabel("Queries / sec")
+    throughput_ax.legend()
+    plt.tight_layout()
+    chart_path = f"{os.path.splitext(output_report_path)[0]}_load_test_chart.png"
+    plt.savefig(chart_path)
+    plt.close(fig)
+    return chart_path
+
+
+def latency_by_phase(results):
+    """
+    Groups the rag_duration_sec of result records by retriever and latency
+    phase ("cold" or "warm") and returns latency_stats for each group.
+    Records without a latency_phase (provided answers) are skipped.
+    """
+    durations = {}
+    for record in results:
+        if record.latency_phase is None:
+            continue
+        durations.setdefault(record.retriever_name, {}).setdefault(record.latency_phase, []).append(record.rag_duration_sec)
+    return {
+        retriever_name: {phase: latency_stats(values) for phase, values in phases.items()}
+        for retriever_name, phases in durations.items()
+    }
@@ -2,7 +2,8 @@ import sys
 import os
 import argparse
 from datetime import datetime
-from evaluator import Evaluator
+from config_helper import get_load_test_config
+from sharding import parse_shard, shard_report_path, run_local_shards, write_merged_report
 from dotenv import load_dotenv
 import shutil
 
@@ -10,16 +11,51 @@ process_dir = os.getcwd()
 env_file = os.path.join(process_dir, ".env")
 load_dotenv(dotenv_path=env_file, override=True)
 
+def merge_main(argv):
+    parser = argparse.ArgumentParser(prog="main.py merge", description="Merge shard reports into one report.")
+    parser.add_argument("reports", nargs="+", help="Shard report JSON files")
+    parser.add_argument("-o", "--output_dir", required=True, help="Directory where the merged report is stored")
+    parser.add_argument("-p", "--output_prefix", required=True, help="Prefix for the merged report file")
+    parser.add_argument("-q", "--questions", default=None, help="Path to the questions JSON file, used to restore question order")
+    parser.add_argument("--summarize", action="store_true", help="Summarize the merged report with the retriever LLM")
+    args = parser.parse_args(argv)
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    output_report_path = os.path.join(args.output_dir, f"{args.output_prefix}_{timestamp}.json")
+    write_merged_report(args.reports, output_report_path, args.questions, summarize=args.summarize)
+    print(f"✅ Merged report has been written to: {output_report_path}")
+
 def main():
-    parser = argparse.ArgumentParser(description="Run evaluation with config files.")
+    if len(sys.argv) > 1 and sys.argv[1] == "merge":
+        merge_main(sys.argv[2:])
+        return
+
+    parser = argparse.ArgumentParser(description="Run evaluation with config files. Use 'main.py merge' to merge shard reports.")
     parser.add_argument("-q", "--questions", required=True, help="Path to questions JSON file")
     parser.add_argument("-k", "--kg_config", required=True, help="Path to KG config JSON file")
     parser.add_argument("-t", "--test_config", required=True, help="Path to test config JSON file")
     parser.add_argument("-c", "--config_dir", required=True, help="Directory where config files are located")
     parser.add_argument("-o", "--output_dir", required=True, help="Directory where output files are stored")
     parser.add_argument("-p", "--output_prefix", required=True, help="Prefix for an output file")
+    parser.add_argument("--resume", default=None, help="Path to a JSONL checkpoint of an interrupted run to resume")
+    parser.add_argument("--incremental", default=None, help="Path to a previous report; only pairs whose inputs changed since then are rerun")
+    parser.add_argument("--load-test", action="store_true", help="Run each retriever at several concurrency levels and report latency percentiles")
+    parser.add_argument("--concurrency-levels", default=None, help="Comma-separated concurrency levels for --load-test, e.g. 1,5,20")
+    parser.add_argument("--repetitions", type=int, default=None, help="Times each question is repeated per concurrency level in --load-test")
+    parser.add_argument("--skip-scoring", action="store_true", help="With --load-test, only measure retrieval and skip the scored evaluation")
+    parser.add_argument("--ids", default=None, help="Comma-separated question ids to evaluate")
+    parser.add_argument("--tag", action="append", default=None, help="Only evaluate questions with this tag (repeatable)")
+    parser.add_argument("--sample", type=int, default=None, help="Evaluate a random sample of N questions")
+    parser.add_argument("--shard", default=None, help="Only evaluate shard i of N (i/N, numbered from 0), e.g. 0/4")
+    parser.add_argument("--processes", type=int, default=None, help="Evaluate N shards in local worker processes and merge their reports")
+    parser.add_argument("--refresh-schema", action="store_true", help="Introspect the graph schema again instead of using the schema cache")
+    parser.add_argument("--graph-changed", action="store_true", help="The graph was updated: clear the retrieval cache and introspect the schema again")
+    parser.add_argument("--dry-run", action="store_true", help="Validate the config files and print the planned work without running anything")
 
     args = parser.parse_args()
+    if args.processes is not None and (args.processes < 1 or args.shard or args.resume or args.load_test):
+        parser.error("--processes must be a positive number and cannot be combined with --shard, --resume or --load-test")
+    shard = parse_shard(args.shard) if args.shard else None
 
     questions_json = args.questions
     kg_config_json = args.kg_config
@@ -38,19 +74,58 @@ def main():
     output_report_path = os.path.join(
         output_dir, f"{output_prefix}_{timestamp}.json"
     )
+    if shard is not None:
+        output_report_path = shard_report_path(output_report_path, *shard)
 
     # Prepare config dictionary for Evaluator.get_evaluator
     config = {
         "questions_json_path": questions_json,
         "kg_config_json_path": kg_config_json,
         "test_config_json_path": test_config_json,
-        "output_report_path": output_report_path
+        "output_report_path": output_report_path,
+        "resume_checkpoint_path": args.resume,
+        "previous_report_path": args.incremental,
+        "shard": shard,
+        "refresh_schema": args.refresh_schema,
+        "graph_changed": args.graph_changed,
+        "question_filters": {
+            "ids": args.ids.split(",") if args.ids else None,
+            "tags": args.tag,
+            "sample": args.sample
+        }
     }
     print(config)
 
-    evaluator = Evaluator.get_evaluator(config)
-    # print("Evaluator instance created successfully.")
-    all_results = evaluator.run_evaluation()
+    if args.dry_run:
+        # Only the config modules are imported, so this returns quickly
+        from dry_run import plan_run, print_plan
+        plan = plan_run(config)
+        print_plan(plan)
+        sys.exit(1 if plan["problems"] else 0)
+
+    if args.processes:
+        # Each worker process runs one shard; the shard reports are merged into output_report_path
+        run_local_shards(config, args.processes)
+    else:
+        # Imported here so argument errors and --dry-run do not wait for ragas and langchain
+        from evaluator import Evaluator
+        evaluator = Evaluator.get_evaluator(config)
+        # print("Evaluator instance created successfully.")
+        if args.load_test:
+            load_test_config = get_load_test_config(evaluator.config)
+            if args.concurrency_levels:
+                load_test_config["concurrency_levels"] = [int(level) for level in args.concurrency_levels.split(",")]
+            if args.repetitions:
+                load_test_config["repetitions"] = args.repetitions
+            if args.skip_scoring:
+                load_test_config["score"] = False
+            all_results = evaluator.run_load_test(
+                load_test_config["concurrency_levels"],
+                repetitions=load_test_config["repetitions"],
+                score=load_test_config["score"],
+            )
+        else:
+            all_results = evaluator.run_evaluation()
     # print(f"All results: {all_results}")
 
     # Save evaluation_report.html to output_dir if not present
@@ -1,10 +1,117 @@
-
+import threading
+import time
 from neo4j import GraphDatabase
 
+
+class PoolStats:
+    """
+    Counts the execute_query calls of a driver, how many ran at once and how
+    long its sessions waited to get a connection from the pool, including
+    opening new connections. A peak above max_connection_pool_size means
+    some queries waited for a connection to be released.
+    """
+
+    def __init__(self, max_connection_pool_size):
+        self.max_connection_pool_size = max_connection_pool_size
+        self.queries = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.acquisitions = 0
+        self.acquire_wait_sec = 0.0
+        self.max_acquire_wait_sec = 0.0
+        self._lock = threading.Lock()
+
+    def started(self):
+        with self._lock:
+            self.queries += 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+
+    def finished(self):
+        with self._lock:
+            self.in_use -= 1
+
+    def acquired(self, wait_sec):
+        with self._lock:
+            self.acquisitions += 1
+            self.acquire_wait_sec += wait_sec
+            self.max_acquire_wait_sec = max(self.max_acquire_wait_sec, wait_sec)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "max_connection_pool_size": self.max_connection_pool_size,
+                "queries": self.queries,
+                "peak_in_use": self.peak_in_use,
+                "connection_acquisitions": self.acquisitions,
+                "acquire_wait_sec": round(self.acquire_wait_sec, 3),
+                "max_acquire_wait_ms": round(self.max_acquire_wait_sec * 1000, 3),
+            }
+
+
+def track_pool_usage(driver, max_connection_pool_size):
+    """
+    Replaces driver.execute_query on the instance with a version that counts
+    the queries running at once, and times every connection the driver's
+    sessions take from its pool. Calls are passed through unchanged; the
+    driver's own pool still decides when a query gets a connection. Usage is
+    kept in driver.pool_stats.
+    """
+    execute_query = driver.execute_query
+    pool_stats = PoolStats(max_connection_pool_size)
+
+    def counted_execute_query(query_, *args, **kwargs):
+        # Same parameter name as neo4j's Driver.execute_query; Text2CypherRetriever passes query_=
+        pool_stats.started()
+        try:
+            return execute_query(query_, *args, **kwargs)
+        finally:
+            pool_stats.finished()
+
+    # Sessions share the driver's pool object and call its acquire for every
+    # connection, so this is where waiting for a free connection shows up
+    pool = getattr(driver, "_pool", None)
+    acquire = getattr(pool, "acquire", None)
+    if acquire is not None:
+        def timed_acquire(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return acquire(*args, **kwargs)
+            finally:
+                # A timed-out acquisition waited too
+                pool_stats.acquired(time.perf_counter() - start)
+
+        pool.acquire = timed_acquire
+
+    driver.execute_query = counted_execute_query
+    driver.pool_stats = pool_stats
+    return driver
+
+
+def get_driver_kwargs(kg_config):
+    """
+    Returns the auth and pool settings of kg_config as driver keyword arguments.
+    """
+    driver_config = kg_config.driver_config
+    return {
+        "auth": (kg_config.neo4j_user, kg_config.neo4j_password),
+        "max_connection_pool_size": driver_config["max_connection_pool_size"],
+        "connection_acquisition_timeout": driver_config["connection_acquisition_timeout"],
+        "max_connection_lifetime": driver_config["max_connection_lifetime"],
+        "fetch_size": driver_config["fetch_size"],
+    }
+
+
 def init_neo4j_driver(kg_config):
+    """
+    Creates the driver shared by all retrievers with the pool settings of
+    kg_config, checks that the database can be reached (unless
+    driver.verify_connectivity is false) and tracks its pool usage.
+    """
+    driver = GraphDatabase.driver(kg_config.neo4j_uri, **get_driver_kwargs(kg_config))
+    if kg_config.driver_config["verify_connectivity"]:
+        start = time.perf_counter()
+        driver.verify_connectivity()
+        print(f"Connected to {kg_config.neo4j_uri} in {round((time.perf_counter() - start) * 1000)} ms")
+    return track_pool_usage(driver, kg_config.driver_config["max_connection_pool_size"])
 
-    driver = GraphDatabase.driver(
-        kg_config.neo4j_uri,
-        auth=(kg_config.neo4j_user, kg_config.neo4j_password),
-    )
-    return driver
\ No newline at end of file
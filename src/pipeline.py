@@ -0,0 +1,90 @@
+import asyncio
+import time
+from load_test import latency_stats
+
+
+async def _get_within(queue, timeout):
+    """
+    Waits up to timeout seconds for the next queue entry. Returns (True, entry),
+    or (False, None) on timeout without losing an entry that arrives meanwhile.
+    Cancelling the caller cancels the wait and is not mistaken for a timeout.
+    """
+    get_task = asyncio.ensure_future(queue.get())
+    try:
+        done, _ = await asyncio.wait({get_task}, timeout=timeout)
+        if not done:
+            get_task.cancel()
+            # Raises CancelledError only if the caller itself is cancelled
+            await asyncio.wait({get_task})
+    except asyncio.CancelledError:
+        get_task.cancel()
+        raise
+    if get_task.cancelled():
+        return False, None
+    return True, get_task.result()
+
+
+async def run_pipeline(items, produce, consume, producers, consumers, queue_size, batch_size, batch_wait_sec):
+    """
+    Streams items through two stages connected by a bounded asyncio queue.
+
+    producers coroutines take the next item and push await produce(item) onto
+    the queue; consumers coroutines collect up to batch_size outputs and call
+    await consume(batch). A partial batch is consumed once nothing new has
+    arrived for batch_wait_sec, or when production has finished. Producers
+    wait while the queue is full, so at most queue_size outputs plus one
+    partial batch per consumer are held at once.
+
+    Returns the queue statistics: the largest depth reached, time producers
+    spent blocked on a full queue, and how long outputs waited between being
+    produced and their batch starting.
+    """
+    queue = asyncio.Queue(maxsize=queue_size)
+    item_iter = iter(items)
+    stats = {"max_depth": 0, "producer_blocked_sec": 0.0, "batches": 0}
+    queue_waits = []
+
+    async def producer():
+        for item in item_iter:
+            output = await produce(item)
+            ready = time.perf_counter()
+            await queue.put((output, ready))
+            stats["producer_blocked_sec"] += time.perf_counter() - ready
+            stats["max_depth"] = max(stats["max_depth"], queue.qsize())
+
+    async def produce_all():
+        await asyncio.gather(*(producer() for _ in range(producers)))
+        for _ in range(consumers):
+            await queue.put(None)
+
+    async def consumer():
+        finished = False
+        while not finished:
+            entry = await queue.get()
+            if entry is None:
+                break
+            batch = [entry]
+            while len(batch) < batch_size:
+                received, entry = await _get_within(queue, batch_wait_sec)
+                if not received:
+                    break
+                if entry is None:
+                    finished = True
+                    break
+                batch.append(entry)
+            started = time.perf_counter()
+            queue_waits.extend(started - ready for _, ready in batch)
+            stats["batches"] += 1
+            await consume([output for output, _ in batch])
+
+    start = time.perf_counter()
+    await asyncio.gather(produce_all(), *(consumer() for _ in range(consumers)))
+    return {
+        "queue_size": queue_size,
+        "batch_size": batch_size,
+        "wall_time_sec": round(time.perf_counter() - start, 3),
+        "batches": stats["batches"],
+        "max_queue_depth": stats["max_depth"],
+        "producer_blocked_sec": round(stats["producer_blocked_sec"], 3),
+        "queue_wait_sec": latency_stats(queue_waits),
+    }
@@ -1,11 +1,28 @@
+import hashlib
 import json
+import random
+import re
+
+_WHITESPACE = re.compile(r"\s*")
+
+def shard_index(question_id, shard_count):
+    """
+    Returns the shard (0 to shard_count - 1) a question id belongs to. The id is
+    hashed so the split is stable across machines and Python processes.
+    """
+    digest = hashlib.sha256(str(question_id).encode("utf-8")).hexdigest()
+    return int(digest, 16) % shard_count
 
 class Question:
-    def __init__(self, id, question, ground_truth, answers=None):
+    # Fixed slots keep each record small when tens of thousands are loaded
+    __slots__ = ("_id", "_question", "_ground_truth", "_answers", "_tags")
+
+    def __init__(self, id, question, ground_truth, answers=None, tags=None):
         self._id = id
         self._question = question
         self._ground_truth = ground_truth
         self._answers = answers if answers is not None else []
+        self._tags = tuple(tags) if tags else ()
 
     @property
     def id(self):
@@ -39,6 +56,157 @@ class Question:
     def answers(self, value):
         self._answers = value
 
+    @property
+    def tags(self):
+        return self._tags
+
+    @tags.setter
+    def tags(self, value):
+        self._tags = tuple(value) if value else ()
+
+
+class _JsonStream:
+    """
+    Reads JSON values from a text file a chunk at a time, so a large document
+    can be walked without loading it whole.
+    """
+
+    def __init__(self, f, chunk_size=1 << 16):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        # Drop what has already been consumed before growing the buffer
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """
+        Skips whitespace and returns the next character, or "" at the end of the file.
+        """
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Expected '{char}' in questions file, got {self.peek()!r}")
+        self.pos += 1
+
+    def value(self):
+        """
+        Decodes the next JSON value, reading more of the file while it is incomplete.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # A number cut off by the end of the buffer ("2." or "12") may continue in the next chunk
+                cut_off = end == len(self.buffer) or self.buffer[end] in ".eE+-"
+                if self.eof or not cut_off or not isinstance(value, (int, float)):
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+
+def _iter_json_questions(f):
+    """
+    Yields the entries of the top-level "questions" array one at a time.
+    """
+    stream = _JsonStream(f)
+    stream.expect("{")
+    while stream.peek() not in ("}", ""):
+        key = stream.value()
+        stream.expect(":")
+        if key != "questions":
+            stream.value()
+        else:
+            stream.expect("[")
+            while stream.peek() != "]":
+                yield stream.value()
+                if stream.peek() == ",":
+                    stream.pos += 1
+            stream.pos += 1
+        if stream.peek() == ",":
+            stream.pos += 1
+
+
+def _iter_jsonl_questions(f):
+    for line in f:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def iter_questions(path, ids=None, tags=None, sample=None, shard=None, seed=0):
+    """
+    Streams Question records from a questions file: a JSON document with a
+    "questions" array or, for .jsonl files, one question object per line.
+
+    Filters are applied during the scan: ids keeps only the given ids, tags
+    keeps questions with at least one of the tags, and shard = (index, count)
+    keeps one shard. sample = N keeps a uniform random sample of N of the
+    remaining questions (reservoir sampling with the given seed), yielded in
+    file order once the scan ends. The sample is drawn before the shard split,
+    so the shards of a sampled run together cover the same N questions as an
+    unsharded run with that sample. Duplicate ids anywhere in the file raise
+    ValueError; ids are remembered as 8-byte digests rather than full strings.
+    """
+    ids = set(str(question_id) for question_id in ids) if ids else None
+    tags = set(tags) if tags else None
+    seen_ids = set()
+    reservoir = []
+    rng = random.Random(seed)
+    matched = 0
+    with open(path, "r", encoding="utf-8") as f:
+        entries = _iter_jsonl_questions(f) if path.endswith(".jsonl") else _iter_json_questions(f)
+        for entry in entries:
+            digest = hashlib.blake2b(str(entry["id"]).encode("utf-8"), digest_size=8).digest()
+            if digest in seen_ids:
+                raise ValueError(f"Question with id '{entry['id']}' already exists.")
+            seen_ids.add(digest)
+            if ids is not None and str(entry["id"]) not in ids:
+                continue
+            if tags is not None and not tags.intersection(entry.get("tags", ())):
+                continue
+            if sample is None and shard is not None and shard_index(entry["id"], shard[1]) != shard[0]:
+                continue
+            question = Question(
+                id=entry["id"],
+                question=entry["question"],
+                ground_truth=entry["ground_truth"],
+                answers=entry.get("answers", []),
+                tags=entry.get("tags"),
+            )
+            if sample is None:
+                yield question
+                continue
+            if len(reservoir) < sample:
+                reservoir.append((matched, question))
+            else:
+                slot = rng.randint(0, matched)
+                if slot < sample:
+                    reservoir[slot] = (matched, question)
+            matched += 1
+    for _, question in sorted(reservoir, key=lambda entry: entry[0]):
+        if shard is None or shard_index(question.id, shard[1]) == shard[0]:
+            yield question
+
 
 class Questions:
     def __init__(self):
@@ -61,19 +229,32 @@ class Questions:
     def get_questions(self):
         # Return a shallow copy to prevent external modification
         return self._questions.copy()
+
+    def __iter__(self):
+        # Iterates the questions without copying the dict
+        return iter(self._questions.values())
+
+    def __len__(self):
+        return len(self._questions)
+
+    def get_shard(self, index, count):
+        """
+        Returns a Questions holding only the questions of shard index out of count.
+        """
+        shard = Questions()
+        for question in self._questions.values():
+            if shard_index(question.id, count) == index:
+                shard.add_question(question)
+        return shard
         
     @staticmethod
-    def load_from_json(json_filename):
-        with open(json_filename, "r", encoding="utf-8") as f:
-            data = json.load(f)
+    def load_from_json(json_filename, ids=None, tags=None, sample=None, shard=None):
+        """
+        Loads a JSON or JSONL questions file with iter_questions, applying the
+        ids/tags/sample/shard filters while the file is scanned.
+        """
         questions = Questions()
-        for q in data.get("questions", []):
-            question = Question(
-                id=q["id"],
-                question=q["question"],
-                ground_truth=q["ground_truth"],
-                answers=q.get("answers", [])
-            )
+        for question in iter_questions(json_filename, ids=ids, tags=tags, sample=sample, shard=shard):
             questions.add_question(question)
         return questions
 
@@ -84,7 +265,8 @@ class Questions:
                     "id": q.id,
                     "question": q.question,
                     "ground_truth": q.ground_truth,
-                    "answers": q.answers
+                    "answers": q.answers,
+                    **({"tags": list(q.tags)} if q.tags else {})
                 }
                 for q in self._questions.values()
             ]
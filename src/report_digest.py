@@ -0,0 +1,199 @@
+import heapq
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from report_output import aggregate_report
+from scheduler import estimate_tokens
+
+# Longest question/response text kept for a worst answer
+TEXT_LIMIT = 300
+
+SYSTEM_PROMPT = (
+    "You are an expert summarizing the report. I have RAGAs retrievers metrics data. "
+    "Give me consise summary and the insights for the context data which helps me identify which retrievers are performing best."
+)
+RETRIEVER_PROMPT = (
+    "You are an expert reviewing one retriever of a RAGAs evaluation. Summarise its scores, latency "
+    "and errors in a few sentences, and describe what its worst answers have in common."
+)
+
+
+def truncate(text, limit=TEXT_LIMIT):
+    text = str(text or "")
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+def answer_score(answer):
+    """
+    Returns the mean of an answer's numeric scores; failed or unscored answers rank lowest.
+    """
+    scores = [score for score in answer.get("scores", {}).values() if isinstance(score, (int, float))]
+    if answer.get("error") or not scores:
+        return float("-inf")
+    return sum(scores) / len(scores)
+
+
+def worst_answers(results_json, n):
+    """
+    Returns {retriever: the n answers with the lowest mean score}, keeping only
+    n entries per retriever while the report is scanned.
+    """
+    heaps = {}
+    for position, question_entry in enumerate(results_json["report"]):
+        for retriever_entry in question_entry["retrievers"]:
+            answer = retriever_entry["answers"][0]
+            heap = heaps.setdefault(retriever_entry["name"], [])
+            # heapq keeps the largest negated score on top, i.e. the best of the worst n
+            item = (-answer_score(answer), -position, question_entry, answer)
+            if len(heap) < n:
+                heapq.heappush(heap, item)
+            elif n and item > heap[0]:
+                heapq.heapreplace(heap, item)
+    worst = {}
+    for name, heap in heaps.items():
+        worst[name] = []
+        for _, _, question_entry, answer in sorted(heap, reverse=True):
+            entry = {
+                "question": truncate(question_entry["question"]),
+                "response": truncate(answer.get("response")),
+                "scores": answer.get("scores", {}),
+            }
+            if answer.get("error"):
+                entry["error"] = truncate(answer["error"])
+            worst[name].append(entry)
+    return worst
+
+
+def retriever_settings(config):
+    """
+    Returns the name, type and top_k of each configured retriever, leaving
+    out long fields such as Cypher queries.
+    """
+    return [
+        {
+            "name": retriever.get("name"),
+            "type": retriever.get("type"),
+            "top_k": retriever.get("retriever_config", {}).get("top_k"),
+        }
+        for retriever in config.get("retrievers", [])
+    ]
+
+
+def build_digest(results_json, aggregate, worst_n, retrievers=None):
+    """
+    Builds the statistical digest the summary prompt is made of: run details,
+    retriever settings, score statistics, RAG latency percentiles, answer and
+    error counts and the worst_n answers of each retriever. retrievers limits
+    the digest to those retrievers.
+    """
+    metadata = results_json["metadata"]
+    config = metadata.get("config", {})
+    names = retrievers if retrievers is not None else aggregate["retrievers"]
+    worst = worst_answers(results_json, worst_n) if worst_n else {}
+    return {
+        "run": {
+            "date_run": metadata.get("date_run"),
+            "total_duration": metadata.get("total_duration"),
+            "questions": aggregate["questions"],
+            "retriever_model": config.get("retrieverLLM", {}).get("model"),
+            "evaluator_model": config.get("evaluatorLLM", {}).get("model"),
+        },
+        "retrievers": [settings for settings in retriever_settings(config) if settings["name"] in names],
+        "scores": {name: aggregate["scores"][name] for name in names},
+        "rag_latency_sec": {
+            name: {key: aggregate["latency_sec"][name]["rag_duration_sec"].get(key) for key in ("p50", "p95", "p99")}
+            for name in names
+        },
+        "answers": {name: aggregate["answers"][name] for name in names},
+        "worst_answers": {name: worst.get(name, []) for name in names},
+    }
+
+
+def fit_digest(results_json, aggregate, instructions, max_tokens, worst_n, retrievers=None):
+    """
+    Returns (prompt, tokens) for the largest number of worst answers, starting
+    at worst_n and halving, whose prompt fits in max_tokens. A prompt that does
+    not fit even without worst answers is returned with a warning.
+    """
+    while True:
+        digest = build_digest(results_json, aggregate, worst_n, retrievers)
+        prompt = f"{instructions}\n\nReport Data:\n{json.dumps(digest, separators=(',', ':'))}"
+        tokens = estimate_tokens(prompt)
+        if tokens <= max_tokens:
+            return prompt, tokens
+        if worst_n == 0:
+            print(f"WARNING: summary prompt is about {tokens} tokens, over the budget of {max_tokens}")
+            return prompt, tokens
+        worst_n //= 2
+
+
+def fit_notes(names, notes, max_tokens):
+    """
+    Joins the per-retriever notes into at most max_tokens, cutting every note
+    to an equal share of the budget when they do not all fit.
+    """
+    sections = [f"Retriever {name}:\n{note}" for name, note in zip(names, notes)]
+    notes_text = "\n\n".join(sections)
+    if estimate_tokens(notes_text) <= max_tokens:
+        return notes_text
+    # Four characters per token, less the separators and the "..." of each cut note
+    share = max(0, (max(max_tokens - 1, 0) * 4 - 2 * len(sections)) // max(len(sections), 1) - 3)
+    return "\n\n".join(truncate(section, share) for section in sections)
+
+
+def invoke_llm(llm, prompt):
+    """
+    Sends one prompt to the LLM and returns the response text, or an error note.
+    """
+    try:
+        if hasattr(llm, "invoke"):
+            summary = llm.invoke(prompt)
+        elif hasattr(llm, "predict"):
+            summary = llm.predict(prompt)
+        else:
+            summary = "[LLM summarization not supported for this retriever_llm type.]"
+    except Exception as e:
+        summary = f"[Error during LLM summarization: {e}]"
+    return getattr(summary, "content", summary)
+
+
+def summarize_digest(results_json, llm, summary_config):
+    """
+    Summarises a report from its digest rather than its full contents, so
+    the prompt size and the number of LLM calls do not grow with the number
+    of questions. Returns (summary, stats) where stats records the calls
+    made, the largest prompt in tokens and the time taken.
+    """
+    start = time.perf_counter()
+    max_tokens = summary_config["max_tokens"]
+    worst_n = summary_config["worst_n"]
+    aggregate = aggregate_report(results_json)
+    retrievers = aggregate["retrievers"]
+    if not summary_config["hierarchical"] or len(retrievers) < 2:
+        prompt, tokens = fit_digest(results_json, aggregate, SYSTEM_PROMPT, max_tokens, worst_n)
+        summary = invoke_llm(llm, prompt)
+        prompt_tokens = [tokens]
+    else:
+        # Each retriever gets the whole budget for its own digest
+        prompts = [
+            fit_digest(results_json, aggregate, RETRIEVER_PROMPT, max_tokens, worst_n, [name])
+            for name in retrievers
+        ]
+        with ThreadPoolExecutor(max_workers=summary_config["concurrency"]) as pool:
+            notes = list(pool.map(lambda prompt_tokens: invoke_llm(llm, prompt_tokens[0]), prompts))
+        # The notes get whatever the final digest leaves of the budget
+        prompt, tokens = fit_digest(results_json, aggregate, SYSTEM_PROMPT, max_tokens, 0)
+        prompt = f"{prompt}\n\nPer-retriever summaries:\n"
+        notes_text = fit_notes(retrievers, notes, max_tokens - estimate_tokens(prompt))
+        prompt += notes_text
+        tokens = estimate_tokens(prompt)
+        if tokens > max_tokens:
+            print(f"WARNING: summary prompt is about {tokens} tokens, over the budget of {max_tokens}")
+        summary = invoke_llm(llm, prompt)
+        prompt_tokens = [tokens for _, tokens in prompts] + [tokens]
+    stats = {
+        "llm_calls": len(prompt_tokens),
+        "max_prompt_tokens": max(prompt_tokens),
+        "duration_sec": round(time.perf_counter() - start, 3),
+    }
+    return summary, stats
@@ -0,0 +1,240 @@
+import json
+import os
+import statistics
+from load_test import percentile, latency_stats
+
+COLUMNAR_EXTENSIONS = {"parquet": ".parquet", "arrow": ".arrow"}
+SCORE_PERCENTILES = (10, 25, 75, 90)
+
+# Scalar answer fields copied into columns, in column order. Nested fields
+# (stages) stay in the JSON report only.
+ANSWER_COLUMNS = (
+    "response",
+    "context_length",
+    "rag_start_time",
+    "rag_duration_sec",
+    "rag_throttle_wait_sec",
+    "eval_start_time",
+    "eval_duration_sec",
+    "eval_batch_size",
+    "eval_batch_duration_sec",
+    "eval_throttle_wait_sec",
+    "latency_phase",
+    "fingerprint",
+    "reused",
+    "error",
+)
+
+
+def report_rows(results_json):
+    """
+    Flattens a report written by transform_all_results_to_report into one row
+    per (question, retriever) answer. Each metric score gets a score_<metric>
+    column; a row without that score (e.g. a failed search) holds None.
+    """
+    rows = []
+    for question_index, question_entry in enumerate(results_json["report"]):
+        for retriever_entry in question_entry["retrievers"]:
+            answer = retriever_entry["answers"][0]
+            row = {
+                "question_index": question_index,
+                # Ids can be numbers in one file and strings in another
+                "question_id": None if question_entry.get("question_id") is None else str(question_entry["question_id"]),
+                "question": question_entry["question"],
+                "reference": question_entry["reference"],
+                "retriever_name": retriever_entry["name"],
+            }
+            for column in ANSWER_COLUMNS:
+                row[column] = answer.get(column)
+            for metric, score in answer.get("scores", {}).items():
+                row[f"score_{metric}"] = score
+            rows.append(row)
+    return rows
+
+
+def rows_to_table(rows):
+    """
+    Builds an Arrow table from rows that may not all have the same keys.
+    Columns appear in first-seen order and missing values are null.
+    """
+    import pyarrow as pa
+
+    columns = {}
+    for row in rows:
+        for column in row:
+            columns.setdefault(column, None)
+    return pa.table({column: [row.get(column) for row in rows] for column in columns})
+
+
+def columnar_report_path(output_report_path, columnar):
+    return os.path.splitext(output_report_path)[0] + COLUMNAR_EXTENSIONS[columnar]
+
+
+def write_columnar_report(results_json, path, columnar):
+    """
+    Writes the report rows as a Parquet file or an Arrow IPC file. Arrow IPC
+    files can be memory-mapped with pyarrow.memory_map.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = rows_to_table(report_rows(results_json))
+    if columnar == "parquet":
+        pq.write_table(table, path)
+    else:
+        with pa.OSFile(path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    return path
+
+
+def summary_report_path(output_report_path):
+    return os.path.splitext(output_report_path)[0] + "_summary.json"
+
+
+def score_stats(scores):
+    """
+    Summarises metric scores as count, mean, median, standard deviation, min,
+    max and p10/p25/p75/p90. Returns only the count when there are no scores.
+    """
+    if not scores:
+        return {"count": 0}
+    stats = {
+        "count": len(scores),
+        "mean": round(statistics.fmean(scores), 4),
+        "median": round(statistics.median(scores), 4),
+        "stddev": round(statistics.pstdev(scores), 4),
+        "min": round(min(scores), 4),
+        "max": round(max(scores), 4),
+    }
+    for p in SCORE_PERCENTILES:
+        stats[f"p{p}"] = round(percentile(scores, p), 4)
+    return stats
+
+
+def aggregate_report(results_json):
+    """
+    Pre-aggregates a report for viewers that should not load every answer:
+    score_stats per retriever and metric, rag and eval latency_stats and the
+    answer and error counts per retriever. Failed answers are not part of
+    the score statistics.
+    """
+    retrievers = []
+    metrics = []
+    scores = {}
+    latencies = {}
+    counts = {}
+    for question_entry in results_json["report"]:
+        for retriever_entry in question_entry["retrievers"]:
+            name = retriever_entry["name"]
+            answer = retriever_entry["answers"][0]
+            if name not in counts:
+                retrievers.append(name)
+                scores[name] = {}
+                latencies[name] = {"rag_duration_sec": [], "eval_duration_sec": []}
+                counts[name] = {"answers": 0, "errors": 0}
+            counts[name]["answers"] += 1
+            if answer.get("error"):
+                counts[name]["errors"] += 1
+            for field, values in latencies[name].items():
+                if answer.get(field) is not None:
+                    values.append(answer[field])
+            for metric, score in answer.get("scores", {}).items():
+                if metric not in metrics:
+                    metrics.append(metric)
+                if isinstance(score, (int, float)):
+                    scores[name].setdefault(metric, []).append(score)
+    return {
+        "questions": len(results_json["report"]),
+        "retrievers": retrievers,
+        "metrics": metrics,
+        "scores": {
+            name: {metric: score_stats(scores[name].get(metric, [])) for metric in metrics}
+            for name in retrievers
+        },
+        "latency_sec": {
+            name: {field: latency_stats(values) for field, values in latencies[name].items()}
+            for name in retrievers
+        },
+        "answers": counts,
+    }
+
+
+def write_json_report(results_json, path, indent=None):
+    """
+    Writes results_json exactly as json.dumps(results_json, indent=indent)
+    would, and returns the (start, end) byte offsets of every entry of its
+    "report" list, so a viewer can read some questions without parsing the
+    whole file. json.dumps escapes non-ASCII text, so characters are bytes.
+    """
+    newline = "" if indent is None else "\n"
+    key_separator = ", " if indent is None else ","
+
+    def nested(value, depth):
+        text = json.dumps(value, indent=indent)
+        # JSON strings cannot hold raw newlines, so this only re-indents structure
+        return text if indent is None else text.replace("\n", "\n" + " " * (indent * depth))
+
+    offsets = []
+    position = 0
+    # newline="" keeps "\n" from becoming "\r\n" on Windows, which would shift the offsets
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        def write(text):
+            nonlocal position
+            f.write(text)
+            position += len(text)
+
+        write("{" + newline)
+        for key_index, (key, value) in enumerate(results_json.items()):
+            if key_index:
+                write(key_separator + newline)
+            write(" " * (indent or 0) + json.dumps(key) + ": ")
+            if key != "report" or not value:
+                write(nested(value, 1))
+                continue
+            write("[" + newline)
+            for entry_index, entry in enumerate(value):
+                if entry_index:
+                    write(key_separator + newline)
+                write(" " * (2 * (indent or 0)))
+                start = position
+                write(nested(entry, 2))
+                offsets.append((start, position))
+            write(newline + " " * (indent or 0) + "]")
+        write(newline + "}")
+    return offsets
+
+
+def write_report(results_json, output_report_path, output_config):
+    """
+    Writes the JSON report, indented unless compact_json is set, and the
+    pre-aggregated summary file next to it. The summary also records where
+    each page of page_size questions starts and ends in the JSON report. With
+    columnar set, the flat table is written first. The columnar and summary
+    paths and the page size are recorded in the report metadata.
+    """
+    if output_config["columnar"]:
+        path = columnar_report_path(output_report_path, output_config["columnar"])
+        results_json["metadata"]["columnar_report_path"] = path
+        write_columnar_report(results_json, path, output_config["columnar"])
+        print(f"Columnar report written to: {path}")
+    summary_path = summary_report_path(output_report_path)
+    results_json["metadata"]["summary_path"] = summary_path
+    # Lets the HTML viewer page a report opened without its summary the same way
+    results_json["metadata"]["page_size"] = output_config["page_size"]
+    indent = None if output_config["compact_json"] else 4
+    offsets = write_json_report(results_json, output_report_path, indent)
+
+    page_size = output_config["page_size"]
+    summary = {
+        "metadata": results_json["metadata"],
+        "report_summary": results_json.get("report_summary"),
+        "report_file": os.path.basename(output_report_path),
+        "page_size": page_size,
+        "pages": [
+            [offsets[start][0], offsets[min(start + page_size, len(offsets)) - 1][1]]
+            for start in range(0, len(offsets), page_size)
+        ],
+    }
+    summary.update(aggregate_report(results_json))
+    with open(summary_path, "w", encoding="utf-8") as f:
+        f.write(json.dumps(summary, indent=indent))
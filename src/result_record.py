@@ -0,0 +1,161 @@
+class ResultRecord:
+    """
+    One (question, retriever) result as it moves through the evaluation: the
+    response and its timings after retrieval, then its scores after scoring.
+    Records are plain slotted objects; the ragas Dataset is only built from
+    their rows at the batch-scoring boundary.
+    """
+    # Fixed slots keep each record small when a run holds tens of thousands
+    __slots__ = (
+        "question_id",
+        "question_text",
+        "retriever_name",
+        "user_input",
+        "reference",
+        "response",
+        "contexts",
+        "context_length",
+        "scores",
+        "rag_start_time",
+        "rag_duration",
+        "rag_duration_sec",
+        "rag_throttle_wait_sec",
+        "eval_start_time",
+        "eval_duration",
+        "eval_duration_sec",
+        "eval_batch_size",
+        "eval_batch_duration_sec",
+        "eval_throttle_wait_sec",
+        "latency_phase",
+        "fingerprint",
+        "error",
+        "reused",
+        "stages",
+        "cypher",
+        # Only needed between retrieval and scoring; not written to checkpoints
+        "rag_stages",
+        "llm_chars",
+    )
+
+    # Fields copied to and from the flat result entry of a checkpoint or report answer
+    _TIMING_FIELDS = (
+        "rag_start_time",
+        "rag_duration",
+        "rag_duration_sec",
+        "eval_start_time",
+        "eval_duration",
+        "eval_duration_sec",
+        "eval_batch_size",
+        "eval_batch_duration_sec",
+        "rag_throttle_wait_sec",
+        "eval_throttle_wait_sec",
+        "context_length",
+    )
+    _OPTIONAL_FIELDS = ("latency_phase", "fingerprint", "reused", "stages", "error", "cypher")
+
+    def __init__(self, question_id, question_text, retriever_name, reference, response, contexts=None,
+                 user_input=None, context_length=0, scores=None, rag_start_time=None, rag_duration=None,
+                 rag_duration_sec=None, rag_throttle_wait_sec=0, eval_start_time=None, eval_duration=None,
+                 eval_duration_sec=None, eval_batch_size=None, eval_batch_duration_sec=None,
+                 eval_throttle_wait_sec=0, latency_phase=None, fingerprint=None, error=None, reused=False,
+                 stages=None, cypher=None, rag_stages=None, llm_chars=0):
+        self.question_id = question_id
+        self.question_text = question_text
+        self.retriever_name = retriever_name
+        self.user_input = question_text if user_input is None else user_input
+        self.reference = reference
+        self.response = response
+        self.contexts = contexts if contexts is not None else [reference]
+        self.context_length = context_length
+        self.scores = scores if scores is not None else {}
+        self.rag_start_time = rag_start_time
+        self.rag_duration = rag_duration
+        self.rag_duration_sec = rag_duration_sec
+        self.rag_throttle_wait_sec = rag_throttle_wait_sec
+        self.eval_start_time = eval_start_time
+        self.eval_duration = eval_duration
+        self.eval_duration_sec = eval_duration_sec
+        self.eval_batch_size = eval_batch_size
+        self.eval_batch_duration_sec = eval_batch_duration_sec
+        self.eval_throttle_wait_sec = eval_throttle_wait_sec
+        self.latency_phase = latency_phase
+        self.fingerprint = fingerprint
+        self.error = error
+        self.reused = reused
+        self.stages = stages if stages is not None else {}
+        # Text2Cypher query, cache hit, plan check time and any rejection reason
+        self.cypher = cypher
+        self.rag_stages = rag_stages
+        self.llm_chars = llm_chars
+
+    def to_row(self):
+        """
+        Returns the ragas row (user_input, reference, response, contexts) this result is scored on.
+        """
+        return {
+            "user_input": self.user_input,
+            "reference": self.reference,
+            "response": self.response,
+            "contexts": self.contexts,
+        }
+
+    def answer_fields(self):
+        """
+        Returns the scores, timings and optional fields of a report answer.
+        Optional fields are left out when they are not set.
+        """
+        fields = {"scores": self.scores}
+        for name in self._TIMING_FIELDS:
+            fields[name] = getattr(self, name)
+        for name in self._OPTIONAL_FIELDS:
+            if getattr(self, name):
+                fields[name] = getattr(self, name)
+        return fields
+
+    def to_dict(self):
+        """
+        Returns the result entry written to checkpoints, with the ragas row under test_data.
+        """
+        result = {
+            "question_id": self.question_id,
+            "question_text": self.question_text,
+            "retriever_name": self.retriever_name,
+            "test_data": self.to_row(),
+        }
+        result.update(self.answer_fields())
+        return result
+
+    @classmethod
+    def from_dict(cls, result):
+        """
+        Rebuilds a record from a result entry written by to_dict.
+        """
+        test_data = result.get("test_data", {})
+        fields = {
+            name: result[name]
+            for name in cls._TIMING_FIELDS + cls._OPTIONAL_FIELDS + ("scores",)
+            if result.get(name) is not None
+        }
+        return cls(
+            question_id=result["question_id"],
+            question_text=result["question_text"],
+            retriever_name=result["retriever_name"],
+            user_input=test_data.get("user_input"),
+            reference=test_data.get("reference", ""),
+            response=test_data.get("response", ""),
+            contexts=test_data.get("contexts"),
+            **fields
+        )
+
+    @classmethod
+    def from_answer(cls, question_id, question_text, retriever_name, reference, answer):
+        """
+        Rebuilds a record from one answer of a report written by transform_all_results_to_report.
+        """
+        return cls.from_dict(dict(
+            answer,
+            question_id=question_id,
+            question_text=question_text,
+            retriever_name=retriever_name,
+            test_data={"reference": reference, "response": answer.get("response", "")},
+        ))
@@ -0,0 +1,109 @@
+import inspect
+import json
+from neo4j_graphrag.types import RetrieverResult, RetrieverResultItem
+from cache_store import hash_key
+
+
+class RetrievalCache:
+    """
+    Formatted vector retriever results memoised in a DiskCache, keyed on the
+    KG, database, index, query text, a hash of the query vector, top_k and a
+    hash of the retrieval_query and other search settings. Entries expire
+    after max_age_days; clear() drops the entries of the cache's namespace,
+    which holds a single KG, after that graph changed.
+    Setting enabled to False bypasses the cache.
+    """
+
+    def __init__(self, disk_cache):
+        self.disk_cache = disk_cache
+        self.enabled = True
+
+    @staticmethod
+    def key(kg_name, database, index_name, query_text, query_vector, top_k, retrieval_query=None, settings=None):
+        return hash_key(
+            "retrieval",
+            kg_name,
+            database,
+            index_name,
+            query_text,
+            hash_key(query_vector),
+            top_k,
+            hash_key(retrieval_query),
+            settings,
+        )
+
+    def get(self, key):
+        """
+        Returns the cached (items, metadata) of a search, or None.
+        """
+        if not self.enabled:
+            return None
+        value = self.disk_cache.get(key)
+        if value is None:
+            return None
+        entry = json.loads(value)
+        items = [RetrieverResultItem(content=item["content"], metadata=item["metadata"]) for item in entry["items"]]
+        return items, entry["metadata"]
+
+    def set(self, key, items, metadata):
+        if self.enabled:
+            self.disk_cache.set(key, json.dumps({
+                "items": [{"content": item.content, "metadata": item.metadata} for item in items],
+                "metadata": metadata,
+            }, default=str))
+
+    def clear(self):
+        self.disk_cache.clear()
+
+    def stats(self):
+        return self.disk_cache.stats()
+
+
+def formatter_version(result_formatter):
+    """
+    Returns the name and a hash of the source of a result_formatter, so
+    results formatted by an edited formatter are not served from the cache.
+    Falls back to the compiled code when the source is not available.
+    """
+    if result_formatter is None:
+        return None
+    try:
+        code = inspect.getsource(result_formatter)
+    except (OSError, TypeError):
+        code = getattr(getattr(result_formatter, "__code__", None), "co_code", b"").hex()
+    return f"{getattr(result_formatter, '__qualname__', type(result_formatter).__name__)}:{hash_key(code)}"
+
+
+def cache_retriever_results(retriever, retrieval_cache, kg_name, settings=None):
+    """
+    Replaces retriever.search on the instance of a VectorRetriever or
+    VectorCypherRetriever with a version that serves repeated searches from
+    retrieval_cache. The query is embedded first (through the shared embedding
+    cache) so the vector is part of the key, then passed to the search so it
+    is not embedded twice. settings holds anything else that changes the
+    result, e.g. return_properties. Cache hits are marked with
+    retrieval_cache_hit in the result metadata.
+    """
+    search = retriever.search
+    retrieval_query = getattr(retriever, "retrieval_query", None)
+
+    def cached_search(query_text=None, query_vector=None, top_k=5, **kwargs):
+        if not retrieval_cache.enabled or query_text is None:
+            return search(query_text=query_text, query_vector=query_vector, top_k=top_k, **kwargs)
+        query_vector = retriever.embedder.embed_query(query_text)
+        key = RetrievalCache.key(
+            kg_name, retriever.neo4j_database, retriever.index_name, query_text, query_vector, top_k,
+            retrieval_query=retrieval_query, settings=dict(settings or {}, **kwargs),
+        )
+        cached = retrieval_cache.get(key)
+        if cached is not None:
+            items, metadata = cached
+            return RetrieverResult(items=items, metadata=dict(metadata, query_vector=query_vector, retrieval_cache_hit=True))
+        result = search(query_vector=query_vector, top_k=top_k, **kwargs)
+        # The vector is already part of the key, so it is not stored again
+        metadata = {name: value for name, value in (result.metadata or {}).items() if name != "query_vector"}
+        retrieval_cache.set(key, result.items, metadata)
+        return result
+
+    retriever.search = cached_search
+    return retriever
@@ -0,0 +1,273 @@
+import asyncio
+import functools
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+RETRYABLE_ERROR_NAMES = {
+    "RateLimitError",
+    "APIConnectionError",
+    "APITimeoutError",
+    "InternalServerError",
+    "ServiceUnavailable",
+    "SessionExpired",
+    "TransientError",
+}
+
+
+def is_retryable_error(error):
+    """
+    Returns True for rate-limit (429), 5xx and transient connection errors.
+    The exception chain is followed because neo4j_graphrag wraps OpenAI errors
+    in LLMGenerationError.
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if getattr(error, "status_code", None) in RETRYABLE_STATUS_CODES:
+            return True
+        if type(error).__name__ in RETRYABLE_ERROR_NAMES:
+            return True
+        message = str(error).lower()
+        if "error code: 429" in message or "rate limit" in message:
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def estimate_tokens(*texts):
+    """
+    Rough token count for throttling purposes (about four characters per token).
+    """
+    return chars_to_tokens(sum(len(text) for text in texts if text))
+
+
+def chars_to_tokens(chars):
+    return chars // 4 + 1
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at per_minute / 60 tokens per second.
+    Waiters are served in arrival order. A request larger than the bucket is
+    capped at the bucket size so it can still run.
+    """
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount=1):
+        amount = min(float(amount), self.capacity)
+        async with self._lock:
+            self._refill()
+            if self.tokens < amount:
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= amount
+
+    def adjust(self, delta):
+        """
+        Debits (positive delta) or refunds (negative delta) tokens once the real
+        cost of a call is known. The balance may go negative, delaying later calls.
+        """
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - delta)
+
+
+class RateLimiter:
+    """
+    Per-model requests/min and tokens/min limits. Either limit may be None.
+    Stages calling the same model share one RateLimiter.
+    """
+
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+
+    async def acquire(self, requests=1, tokens=0):
+        if self.requests is not None:
+            await self.requests.acquire(requests)
+        if self.tokens is not None and tokens:
+            await self.tokens.acquire(tokens)
+
+    def adjust_requests(self, delta):
+        if self.requests is not None and delta:
+            self.requests.adjust(delta)
+
+    def adjust_tokens(self, delta):
+        if self.tokens is not None and delta:
+            self.tokens.adjust(delta)
+
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive retryable failures. While open,
+    callers wait for reset_timeout_sec instead of hitting the provider. The
+    circuit is then half-open: one caller goes through as a probe while the
+    others keep waiting. A successful probe closes the circuit and releases
+    them; a failed probe opens it again.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout_sec=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_sec = reset_timeout_sec
+        self.consecutive_failures = 0
+        self.state = "closed"
+        self.open_until = 0.0
+        self.times_opened = 0
+        self._probe = None
+
+    async def wait_until_closed(self):
+        """
+        Waits until the circuit is closed, or until this caller may probe a
+        half-open circuit. Returns True for the probe, whose caller must pass
+        probe=True to record_success or record_failure and then call end_probe.
+        """
+        while self.state == "open":
+            remaining = self.open_until - time.monotonic()
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+            elif self._probe is None:
+                self._probe = asyncio.Event()
+                return True
+            else:
+                await self._probe.wait()
+        return False
+
+    def end_probe(self):
+        """
+        Wakes the callers waiting on the probe. If the probe neither closed nor
+        reopened the circuit (e.g. it failed with a non-retryable error), the
+        next caller probes again.
+        """
+        if self._probe is not None:
+            self._probe.set()
+            self._probe = None
+
+    def record_success(self, probe=False):
+        self.consecutive_failures = 0
+        if probe:
+            self.state = "closed"
+
+    def record_failure(self, probe=False):
+        self.consecutive_failures += 1
+        if probe or (self.state == "closed" and self.consecutive_failures >= self.failure_threshold):
+            self.state = "open"
+            self.open_until = time.monotonic() + self.reset_timeout_sec
+            self.times_opened += 1
+            print(f"Circuit breaker opened for {self.reset_timeout_sec}s after {self.consecutive_failures} failures")
+
+
+class StageScheduler:
+    """
+    Runs the blocking calls of one stage (retrieval or evaluation) from asyncio.
+
+    At most concurrency calls run at once, each in a worker thread. Throttled
+    calls first wait on the stage's RateLimiter and circuit breaker; retryable
+    errors are retried with exponential backoff and jitter. Time spent waiting
+    on limits and backoff is returned separately from the call itself.
+    """
+
+    def __init__(self, name, concurrency, limiter=None, circuit_breaker=None,
+                 max_retries=5, base_delay_sec=1.0, max_delay_sec=60.0):
+        self.name = name
+        self.concurrency = concurrency
+        self.limiter = limiter or RateLimiter()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.max_retries = max_retries
+        self.base_delay_sec = base_delay_sec
+        self.max_delay_sec = max_delay_sec
+        self.executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=name)
+        self._semaphore = None
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.throttle_wait_sec = 0.0
+        self.busy_sec = 0.0
+
+    def backoff_delay(self, attempt):
+        delay = min(self.max_delay_sec, self.base_delay_sec * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.0)
+
+    async def run(self, func, *args, requests=1, tokens=0, throttled=True):
+        """
+        Calls func(*args) in a worker thread and returns (result, throttle_wait_sec).
+        The last error is raised once max_retries retries are used up or the error is not retryable.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        loop = asyncio.get_running_loop()
+        throttle_wait_sec = 0.0
+        attempt = 0
+        probe = False
+        async with self._semaphore:
+            try:
+                while True:
+                    wait_start = time.monotonic()
+                    if throttled:
+                        probe = await self.circuit_breaker.wait_until_closed()
+                        await self.limiter.acquire(requests=requests, tokens=tokens)
+                    throttle_wait_sec += time.monotonic() - wait_start
+                    self.calls += 1
+                    call_start = time.monotonic()
+                    try:
+                        result = await loop.run_in_executor(self.executor, functools.partial(func, *args))
+                    except Exception as e:
+                        self.busy_sec += time.monotonic() - call_start
+                        if not throttled or not is_retryable_error(e):
+                            raise
+                        self.circuit_breaker.record_failure(probe)
+                        if probe:
+                            # Release the waiters now rather than after the backoff
+                            self.circuit_breaker.end_probe()
+                            probe = False
+                        if attempt >= self.max_retries:
+                            self.failures += 1
+                            raise
+                        delay = self.backoff_delay(attempt)
+                        print(f"{self.name}: retryable error ({e}); retrying in {delay:.1f}s")
+                        attempt += 1
+                        self.retries += 1
+                        await asyncio.sleep(delay)
+                        throttle_wait_sec += delay
+                        continue
+                    self.busy_sec += time.monotonic() - call_start
+                    if throttled:
+                        self.circuit_breaker.record_success(probe)
+                    return result, throttle_wait_sec
+            finally:
+                if probe:
+                    self.circuit_breaker.end_probe()
+                # Also counted when the call ends in an error
+                self.throttle_wait_sec += throttle_wait_sec
+
+    def stats(self, wall_time_sec=None):
+        """
+        Returns the call counters. Given the wall time of the run, utilisation
+        is the share of worker capacity (concurrency x wall time) spent in calls.
+        """
+        stats = {
+            "concurrency": self.concurrency,
+            "calls": self.calls,
+            "retries": self.retries,
+            "failures": self.failures,
+            "circuit_breaker_opened": self.circuit_breaker.times_opened,
+            "throttle_wait_sec": round(self.throttle_wait_sec, 3),
+            "busy_sec": round(self.busy_sec, 3),
+        }
+        if wall_time_sec:
+            stats["utilisation"] = round(self.busy_sec / (wall_time_sec * self.concurrency), 4)
+        return stats
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
@@ -0,0 +1,83 @@
+import time
+import neo4j
+from cache_store import hash_key
+
+# The label, relationship type and property key names of the database. Each
+# subquery returns exactly one row, so an empty database still fingerprints.
+FINGERPRINT_QUERY = (
+    "CALL { CALL db.labels() YIELD label RETURN collect(label) AS labels } "
+    "CALL { CALL db.relationshipTypes() YIELD relationshipType RETURN collect(relationshipType) AS types } "
+    "CALL { CALL db.propertyKeys() YIELD propertyKey RETURN collect(propertyKey) AS property_keys } "
+    "RETURN labels, types, property_keys"
+)
+
+
+def database_fingerprint(driver, database):
+    """
+    Returns a hash of the label, relationship type and property key names of
+    the database. These are read from the token store, so the query stays
+    cheap on large graphs, and a new label, type or property changes it.
+    """
+    records, _, _ = driver.execute_query(FINGERPRINT_QUERY, database_=database, routing_=neo4j.RoutingControl.READ)
+    if not records:
+        return hash_key([], [], [])
+    record = records[0]
+    return hash_key(sorted(record["labels"]), sorted(record["types"]), sorted(record["property_keys"]))
+
+
+class SchemaCache:
+    """
+    Graph schemas for Text2Cypher prompts, fetched once per KG per run and
+    optionally persisted in a DiskCache keyed on the KG name, database,
+    whether the schema is enhanced and the database fingerprint. A database
+    whose labels, relationship types or property keys changed gets a new key;
+    refresh=True ignores stored schemas and replaces them.
+    """
+
+    def __init__(self, disk_cache=None, refresh=False):
+        self.disk_cache = disk_cache
+        self.refresh = refresh
+        self._schemas = {}
+        self._entries = {}
+
+    def get_schema(self, driver, kg_name, database, is_enhanced=False):
+        """
+        Returns the schema string of the database, introspecting it only when
+        neither this run nor the disk cache has it.
+        """
+        run_key = (kg_name, database, is_enhanced)
+        if run_key in self._schemas:
+            return self._schemas[run_key]
+
+        from neo4j_graphrag.schema import get_schema
+
+        fingerprint = database_fingerprint(driver, database)
+        key = hash_key("schema", kg_name, database, is_enhanced, fingerprint)
+        schema = None
+        if self.disk_cache is not None and not self.refresh:
+            schema = self.disk_cache.get(key)
+        entry = {
+            "kg_name": kg_name,
+            "database": database,
+            "enhanced": is_enhanced,
+            "fingerprint": fingerprint,
+            "source": "cache" if schema is not None else "database",
+            "fetch_ms": None,
+        }
+        if schema is None:
+            start = time.perf_counter()
+            schema = get_schema(driver, is_enhanced=is_enhanced, database=database)
+            entry["fetch_ms"] = round((time.perf_counter() - start) * 1000, 3)
+            print(f"Fetched the {'enhanced ' if is_enhanced else ''}schema of {kg_name} in {entry['fetch_ms']} ms")
+            if self.disk_cache is not None:
+                self.disk_cache.set(key, schema)
+        else:
+            print(f"Using the cached schema of {kg_name}")
+        # Lets compared runs confirm their prompts used the same schema
+        entry["schema_hash"] = hash_key(schema)
+        self._schemas[run_key] = schema
+        self._entries[run_key] = entry
+        return schema
+
+    def stats(self):
+        return list(self._entries.values())
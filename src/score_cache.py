@@ -0,0 +1,57 @@
+import json
+from cache_store import hash_key
+
+
+def metric_columns(metric, scores):
+    """
+    Returns the score columns produced by a ragas metric. ragas names the
+    column after metric.name, sometimes with its settings appended, e.g.
+    "rouge_score(mode=fmeasure)".
+    """
+    return {
+        column: value for column, value in scores.items()
+        if column == metric.name or column.startswith(f"{metric.name}(")
+    }
+
+
+class ScoreCache:
+    """
+    Persistent store of metric scores. Each entry holds the score columns of
+    one metric for one row, keyed by a hash of the question, reference,
+    response, contexts, metric and judge model, so unchanged provided answers
+    and identical retriever answers are never sent to ragas twice.
+    """
+
+    def __init__(self, disk_cache, judge_model):
+        self.disk_cache = disk_cache
+        self.judge_model = judge_model
+
+    def _key(self, row, metric):
+        return hash_key(
+            self.judge_model,
+            type(metric).__name__,
+            metric.name,
+            row["user_input"],
+            row["reference"],
+            row["response"],
+            row["contexts"],
+        )
+
+    def lookup(self, row, metric):
+        """
+        Returns the cached score columns of metric for row, or None.
+        """
+        value = self.disk_cache.get(self._key(row, metric))
+        return json.loads(value) if value is not None else None
+
+    def store(self, row, metric, scores):
+        """
+        Stores the columns of scores that belong to metric. Nothing is stored
+        when the metric produced no column (e.g. the judge call failed).
+        """
+        columns = metric_columns(metric, scores)
+        if columns:
+            self.disk_cache.set(self._key(row, metric), json.dumps(columns))
+
+    def stats(self):
+        return self.disk_cache.stats()
@@ -0,0 +1,139 @@
+import collections
+import json
+import os
+from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor
+from config_helper import get_retriever_llm, get_output_config
+from load_test import latency_by_phase
+from questions import iter_questions
+from result_record import ResultRecord
+from report_output import write_report
+
+
+def parse_shard(spec):
+    """
+    Parses a "i/N" shard spec into (i, N). Shards are numbered 0 to N - 1.
+    """
+    try:
+        index, count = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"Shard must look like i/N, e.g. 0/4, got {spec!r}")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Shard index must be between 0 and {count - 1}, got {spec!r}")
+    return index, count
+
+
+def shard_report_path(output_report_path, index, count):
+    """
+    Returns the report path of one shard, next to the merged report.
+    """
+    return f"{os.path.splitext(output_report_path)[0]}_shard{index}of{count}.json"
+
+
+def merge_reports(shard_reports, report_paths, question_order=None):
+    """
+    Combines shard reports into one report with the structure produced by
+    transform_all_results_to_report. Questions keep the order of question_order
+    (question texts) when given, and shard order otherwise. The metadata covers
+    the whole run: it starts at the earliest shard start and lasts until the
+    last shard finished; each shard's own metadata is kept under shards.
+    """
+    question_map = collections.OrderedDict()
+    shards = []
+    for report_path, shard_report in zip(report_paths, shard_reports):
+        metadata = shard_report["metadata"]
+        if metadata["config"] != shard_reports[0]["metadata"]["config"]:
+            print(f"WARNING: {report_path} was run with a different test config than {report_paths[0]}")
+        shard_metadata = {key: value for key, value in metadata.items() if key not in ("config", "kg_config")}
+        shard_metadata["report"] = report_path
+        shards.append(shard_metadata)
+        for question_entry in shard_report["report"]:
+            if question_entry["question"] in question_map:
+                question_map[question_entry["question"]]["retrievers"].extend(question_entry["retrievers"])
+            else:
+                question_map[question_entry["question"]] = question_entry
+
+    entries = list(question_map.values())
+    if question_order:
+        position = {question: i for i, question in enumerate(question_order)}
+        entries.sort(key=lambda entry: position.get(entry["question"], len(position)))
+
+    from evaluator import format_duration
+
+    start_time_epoch = min(shard["start_time_epoch"] for shard in shards)
+    end_time_epoch = max(shard["start_time_epoch"] + shard["total_duration_sec"] for shard in shards)
+    start_dt = datetime.fromtimestamp(start_time_epoch)
+    first_metadata = shard_reports[0]["metadata"]
+    results = [
+        ResultRecord.from_answer(None, entry["question"], retriever_entry["name"], entry["reference"], retriever_entry["answers"][0])
+        for entry in entries for retriever_entry in entry["retrievers"]
+    ]
+    metadata = {
+        "date_run": start_dt.strftime("%Y-%m-%d"),
+        "gmt_time": datetime.fromtimestamp(start_time_epoch, tz=timezone.utc).strftime("%H:%M:%S"),
+        "start_time": start_dt.strftime("%H:%M:%S"),
+        "total_duration": format_duration(end_time_epoch - start_time_epoch),
+        "start_time_epoch": start_time_epoch,
+        "total_duration_sec": round(end_time_epoch - start_time_epoch, 3),
+        "kg_config": first_metadata["kg_config"],
+        "config": first_metadata["config"],
+        "latency_by_phase": latency_by_phase(results),
+        "shards": shards,
+    }
+    return {"metadata": metadata, "report": entries}
+
+
+def write_merged_report(report_paths, output_report_path, questions_json_path=None, summarize=False):
+    """
+    Merges the shard reports at report_paths, writes the merged report with its
+    charts to output_report_path and returns it. With summarize, the retriever
+    LLM from the test config summarises the merged report.
+    """
+    from evaluator import generate_report_charts, summarize_report_with_llm
+
+    shard_reports = []
+    for report_path in report_paths:
+        with open(report_path, "r", encoding="utf-8") as f:
+            shard_reports.append(json.load(f))
+    question_order = None
+    if questions_json_path:
+        question_order = [question.question for question in iter_questions(questions_json_path)]
+    results_json = merge_reports(shard_reports, report_paths, question_order)
+    generate_report_charts(results_json, output_report_path)
+    if summarize:
+        retriever_llm = get_retriever_llm(results_json["metadata"]["config"])
+        results_json["report_summary"] = str(summarize_report_with_llm(results_json, retriever_llm))
+    write_report(results_json, output_report_path, get_output_config(results_json["metadata"]["config"]))
+    print(f"Merged {len(report_paths)} shard reports into {output_report_path}")
+    return results_json
+
+
+def run_shard(config_arg):
+    """
+    Runs one shard in a worker process and returns its report path.
+    """
+    from evaluator import Evaluator
+
+    evaluator = Evaluator.get_evaluator(config_arg)
+    evaluator.run_evaluation()
+    return config_arg["output_report_path"]
+
+
+def run_local_shards(config_arg, processes):
+    """
+    Splits the questions into processes shards, evaluates them in parallel
+    worker processes and merges their reports into config_arg's output report.
+    """
+    output_report_path = config_arg["output_report_path"]
+    shard_configs = [
+        dict(
+            config_arg,
+            shard=(index, processes),
+            summarize=False,
+            output_report_path=shard_report_path(output_report_path, index, processes),
+        )
+        for index in range(processes)
+    ]
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        report_paths = list(pool.map(run_shard, shard_configs))
+    return write_merged_report(report_paths, output_report_path, config_arg["questions_json_path"], summarize=True)
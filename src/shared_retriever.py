@@ -0,0 +1,117 @@
+import threading
+from neo4j_graphrag.retrievers.base import Retriever
+from neo4j_graphrag.types import RetrieverResult
+
+
+class SharedTopKSearch:
+    """
+    Runs one search per question at the largest top_k of a group of retrievers
+    and hands each member the prefix of the result matching its own top_k.
+
+    Searches are keyed on the question id and text, so two questions with the
+    same text are searched separately. Concurrent callers for the same key
+    wait for the first caller's search instead of issuing their own. A result
+    is dropped once every member has taken its slice or the search failed,
+    and a member that searches the same key again (a retry or a repeated
+    question) starts a new search rather than reusing the old result. At most
+    MAX_ENTRIES results are kept for members that never come (skipped by
+    --resume, --incremental or the circuit breaker).
+    With enabled set to False every member runs its own search at its own top_k.
+    """
+
+    MAX_ENTRIES = 1000
+
+    def __init__(self, retriever, max_top_k, member_count):
+        self.retriever = retriever
+        self.max_top_k = max_top_k
+        self.member_count = member_count
+        self.enabled = True
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def _drop(self, key, entry):
+        # Called with the lock held
+        if self._pending.get(key) is entry:
+            del self._pending[key]
+
+    def _trim(self):
+        # Called with the lock held; drops the oldest finished results first
+        for key in [key for key, entry in self._pending.items() if entry["done"].is_set()]:
+            if len(self._pending) <= self.MAX_ENTRIES:
+                break
+            del self._pending[key]
+
+    def search(self, query_text, top_k, question_id=None, member=None, **kwargs):
+        if not self.enabled:
+            return self.retriever.search(query_text=query_text, top_k=top_k, **kwargs)
+        key = (question_id, query_text)
+        member = top_k if member is None else member
+        with self._lock:
+            entry = self._pending.get(key)
+            if entry is not None and member in entry["members"]:
+                # This member already took its slice, so this is a new search
+                entry = None
+            is_owner = entry is None
+            if is_owner:
+                entry = {"done": threading.Event(), "result": None, "error": None, "members": set()}
+                self._pending[key] = entry
+                self._trim()
+            entry["members"].add(member)
+
+        if is_owner:
+            try:
+                entry["result"] = self.retriever.search(query_text=query_text, top_k=self.max_top_k, **kwargs)
+            except Exception as e:
+                entry["error"] = e
+            finally:
+                with self._lock:
+                    if entry["error"] is not None:
+                        # Failed searches are not reused by members that come later
+                        self._drop(key, entry)
+                    entry["done"].set()
+        else:
+            entry["done"].wait()
+
+        with self._lock:
+            if len(entry["members"]) >= self.member_count:
+                self._drop(key, entry)
+
+        if entry["error"] is not None:
+            raise entry["error"]
+        result = entry["result"]
+        metadata = dict(result.metadata or {})
+        metadata["shared_top_k"] = self.max_top_k
+        return RetrieverResult(items=result.items[:top_k], metadata=metadata)
+
+
+class TopKSliceRetriever(Retriever):
+    """
+    Retriever handed to GraphRAG for one member of a SharedTopKSearch group.
+    """
+
+    VERIFY_NEO4J_VERSION = False
+
+    def __init__(self, shared_search):
+        # The shared retriever already validated the driver and index, so the
+        # base class initialisation (which queries Neo4j) is skipped.
+        self.shared_search = shared_search
+        self.driver = shared_search.retriever.driver
+        self.neo4j_database = shared_search.retriever.neo4j_database
+        self.index_name = shared_search.retriever.index_name
+
+    def search(self, query_text=None, top_k=5, question_id=None, **kwargs):
+        return self.shared_search.search(query_text, top_k, question_id=question_id, member=self, **kwargs)
+
+    def get_search_results(self, *args, **kwargs):
+        return self.shared_search.retriever.get_search_results(*args, **kwargs)
+
+
+def is_top_k_slice(retriever):
+    """
+    Returns whether retriever is a TopKSliceRetriever. neo4j_graphrag's
+    RetrieverMetaclass does not give subclasses their own ABC cache, so
+    isinstance(x, TopKSliceRetriever) on another retriever records x's class
+    as "not a Retriever" in the cache shared with Retriever, and GraphRAG
+    then rejects it.
+    """
+    return type(retriever) is TopKSliceRetriever
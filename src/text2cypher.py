@@ -0,0 +1,187 @@
+import itertools
+import time
+import neo4j
+from neo4j.exceptions import ClientError, Neo4jError
+from pydantic import ValidationError
+from neo4j_graphrag.exceptions import SearchValidationError, Text2CypherRetrievalError
+from neo4j_graphrag.generation.prompts import Text2CypherTemplate
+from neo4j_graphrag.retrievers import Text2CypherRetriever
+from neo4j_graphrag.retrievers.text2cypher import extract_cypher
+from neo4j_graphrag.types import RawSearchResult, Text2CypherSearchModel
+from cache_store import hash_key
+
+# Plan operators that change the graph; generated queries must only read
+WRITE_OPERATORS = ("Create", "Merge", "Delete", "DetachDelete", "Set", "Remove", "LoadCSV", "Foreach")
+
+
+class CypherQueryError(Text2CypherRetrievalError):
+    """
+    A generated query that was rejected by the plan check or failed to run.
+    cypher_check holds the query, cache hit, plan check time and reason.
+    """
+
+    def __init__(self, message, cypher_check):
+        super().__init__(message)
+        self.cypher_check = cypher_check
+
+
+class CypherQueryCache:
+    """
+    Generated Cypher memoised in a DiskCache, keyed on the question, a hash of
+    the graph schema, the examples, the prompt, the LLM model and the plan
+    check limit. Only queries that passed the plan check are stored, so a bad
+    generation is retried on the next run and tightening the limit checks
+    queries again. Setting enabled to False bypasses the cache.
+    """
+
+    def __init__(self, disk_cache):
+        self.disk_cache = disk_cache
+        self.enabled = True
+
+    @staticmethod
+    def key(query_text, schema, examples, custom_prompt, model_name, max_estimated_rows):
+        return hash_key(
+            "text2cypher", query_text, hash_key(schema), examples, custom_prompt, model_name, max_estimated_rows
+        )
+
+    def get(self, key):
+        return self.disk_cache.get(key) if self.enabled else None
+
+    def set(self, key, cypher):
+        if self.enabled:
+            self.disk_cache.set(key, cypher)
+
+    def stats(self):
+        lookups = self.disk_cache.hits + self.disk_cache.misses
+        return {
+            "hits": self.disk_cache.hits,
+            "misses": self.disk_cache.misses,
+            "hit_ratio": round(self.disk_cache.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def plan_operators(plan):
+    """
+    Yields (operator name, estimated rows) for every operator of an EXPLAIN
+    plan, as returned in ResultSummary.plan.
+    """
+    operator = plan.get("operatorType", "").split("@")[0]
+    yield operator, plan.get("args", {}).get("EstimatedRows", 0)
+    for child in plan.get("children", []):
+        yield from plan_operators(child)
+
+
+def plan_rejection(plan, max_estimated_rows):
+    """
+    Returns why a query plan should not be run, or None: the plan writes to
+    the graph, or an operator (typically a CartesianProduct) is estimated to
+    produce more than max_estimated_rows rows.
+    """
+    largest_operator, largest_rows = None, 0
+    for operator, estimated_rows in plan_operators(plan):
+        if operator.startswith(WRITE_OPERATORS):
+            return f"plan writes to the graph ({operator})"
+        if estimated_rows > largest_rows:
+            largest_operator, largest_rows = operator, estimated_rows
+    if max_estimated_rows is not None and largest_rows > max_estimated_rows:
+        return f"{largest_operator} is estimated at {int(largest_rows)} rows, over the limit of {max_estimated_rows}"
+    return None
+
+
+def limit_rows(max_rows, check):
+    """
+    Returns a result_transformer_ for execute_query that keeps at most max_rows
+    records and discards the rest, recording in check whether any were dropped.
+    """
+    def transform(result):
+        records = list(itertools.islice(result, max_rows))
+        check["truncated"] = result.peek() is not None
+        keys = result.keys()
+        summary = result.consume()
+        return neo4j.EagerResult(records, summary, keys)
+
+    return transform
+
+
+class GuardedText2CypherRetriever(Text2CypherRetriever):
+    """
+    Text2CypherRetriever that reuses generated Cypher from a CypherQueryCache,
+    checks each new query with EXPLAIN before running it, and runs it with a
+    transaction timeout and a row limit. The query, cache hit, plan check time
+    and row count are returned in the result metadata as cypher_check; a
+    rejected or failed query raises CypherQueryError with the same details.
+    """
+
+    def __init__(self, driver, llm, neo4j_schema=None, examples=None, neo4j_database=None, cypher_cache=None,
+                 explain=True, max_estimated_rows=None, query_timeout_sec=None, max_rows=None):
+        super().__init__(driver=driver, llm=llm, neo4j_schema=neo4j_schema, examples=examples, neo4j_database=neo4j_database)
+        self.cypher_cache = cypher_cache
+        self.explain = explain
+        self.max_estimated_rows = max_estimated_rows
+        self.query_timeout_sec = query_timeout_sec
+        self.max_rows = max_rows
+
+    def check_plan(self, cypher, check):
+        """
+        Runs EXPLAIN for cypher and returns the reason to reject it, or None.
+        """
+        start = time.perf_counter()
+        try:
+            _, summary, _ = self.driver.execute_query(
+                f"EXPLAIN {cypher}",
+                database_=self.neo4j_database,
+                routing_=neo4j.RoutingControl.READ,
+            )
+        except ClientError as e:
+            return f"invalid Cypher: {e.message}"
+        finally:
+            check["plan_check_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        plan = getattr(summary, "plan", None)
+        return plan_rejection(plan, self.max_estimated_rows) if plan else None
+
+    def get_search_results(self, query_text, prompt_params=None):
+        try:
+            Text2CypherSearchModel(query_text=query_text)
+        except ValidationError as e:
+            raise SearchValidationError(e.errors()) from e
+        prompt_params = dict(prompt_params or {})
+        examples = prompt_params.pop("examples", None) or ("\n".join(self.examples) if self.examples else "")
+        schema = prompt_params.pop("schema", None) or self.neo4j_schema
+        check = {"query": None, "cache_hit": False, "plan_check_ms": None, "rejected": None}
+
+        cache_key = None
+        cypher = None
+        # Queries are only cached after a plan check, so without one the cache is not used
+        if self.cypher_cache is not None and self.explain:
+            cache_key = CypherQueryCache.key(
+                query_text, schema, examples, self.custom_prompt, self.llm.model_name, self.max_estimated_rows
+            )
+            cypher = self.cypher_cache.get(cache_key)
+            check["cache_hit"] = cypher is not None
+        if cypher is None:
+            prompt = Text2CypherTemplate(template=self.custom_prompt).format(
+                schema=schema, examples=examples, query_text=query_text, **prompt_params
+            )
+            cypher = extract_cypher(self.llm.invoke(prompt).content)
+        check["query"] = cypher
+
+        # A cached query already passed the plan check with these limits when it was stored
+        if self.explain and not check["cache_hit"]:
+            check["rejected"] = self.check_plan(cypher, check)
+            if check["rejected"]:
+                raise CypherQueryError(f"Generated Cypher rejected: {check['rejected']}", check)
+        options = {"result_transformer_": limit_rows(self.max_rows, check)} if self.max_rows else {}
+        try:
+            records, _, _ = self.driver.execute_query(
+                neo4j.Query(cypher, timeout=self.query_timeout_sec),
+                database_=self.neo4j_database,
+                routing_=neo4j.RoutingControl.READ,
+                **options
+            )
+        except Neo4jError as e:
+            check["rejected"] = f"query failed: {e.message}"
+            raise CypherQueryError(f"Generated Cypher failed: {e.message}", check) from e
+        if cache_key is not None and not check["cache_hit"]:
+            self.cypher_cache.set(cache_key, cypher)
+        check["rows"] = len(records)
+        return RawSearchResult(records=records, metadata={"cypher": cypher, "cypher_check": check})
@@ -0,0 +1,274 @@
+import contextvars
+import itertools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from langchain_core.callbacks import BaseCallbackHandler
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+_judge_errors = contextvars.ContextVar("judge_errors", default=None)
+_span_ids = itertools.count(1)
+
+
+class Span:
+    """
+    One timed stage. Child spans are attached to their parent as they finish.
+    Times are perf_counter seconds; exported durations are in milliseconds.
+    """
+
+    def __init__(self, name, parent=None, attrs=None):
+        self.id = next(_span_ids)
+        self.name = name
+        self.parent = parent
+        self.attrs = attrs or {}
+        self.children = []
+        self.accumulated = {}
+        self.thread_id = threading.get_ident()
+        self.start = time.perf_counter()
+        self.end = None
+
+    @property
+    def duration_ms(self):
+        end = self.end if self.end is not None else time.perf_counter()
+        return round((end - self.start) * 1000, 3)
+
+    def accumulate(self, name, seconds):
+        """
+        Adds time spent in many small calls (e.g. per-record formatting); it is
+        turned into one child span when this span ends.
+        """
+        self.accumulated[name] = self.accumulated.get(name, 0.0) + seconds
+
+    def to_dict(self):
+        entry = {"name": self.name, "duration_ms": self.duration_ms}
+        if self.attrs:
+            entry["attrs"] = self.attrs
+        if self.children:
+            entry["children"] = [child.to_dict() for child in self.children]
+        return entry
+
+
+class Tracer:
+    """
+    Records nested spans. The current span is tracked per thread and asyncio
+    task, so spans opened by retrievers, the embedder and the LLM nest under
+    the evaluator's span for the same question/retriever pair. With
+    keep_spans=True every finished span is also kept for a Chrome trace export.
+    """
+
+    def __init__(self, keep_spans=False):
+        self.keep_spans = keep_spans
+        self.origin = time.perf_counter()
+        self.spans = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def current_span():
+        return _current_span.get()
+
+    @contextmanager
+    def span(self, name, **attrs):
+        parent = _current_span.get()
+        span = Span(name, parent=parent, attrs=attrs)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except Exception as e:
+            span.attrs["error"] = type(e).__name__
+            raise
+        finally:
+            _current_span.reset(token)
+            self._finish(span)
+
+    def _finish(self, span):
+        span.end = time.perf_counter()
+        for name, seconds in span.accumulated.items():
+            child = Span(name, parent=span)
+            child.start = span.end - seconds
+            child.end = span.end
+            span.children.append(child)
+            self._keep(child)
+        with self._lock:
+            if span.parent is not None:
+                span.parent.children.append(span)
+        self._keep(span)
+
+    def _keep(self, span):
+        if self.keep_spans:
+            with self._lock:
+                self.spans.append(span)
+
+    def to_chrome_trace(self):
+        """
+        Returns the kept spans in Chrome trace event format (chrome://tracing, Perfetto).
+        """
+        with self._lock:
+            spans = list(self.spans)
+        events = []
+        for span in spans:
+            args = dict(span.attrs)
+            if span.parent is not None:
+                args["parent_id"] = span.parent.id
+            events.append({
+                "name": span.name,
+                "ph": "X",
+                "ts": round((span.start - self.origin) * 1_000_000, 1),
+                "dur": round((span.end - span.start) * 1_000_000, 1),
+                "pid": os.getpid(),
+                "tid": span.thread_id,
+                "args": args,
+            })
+        events.sort(key=lambda event: event["ts"])
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f, default=str)
+
+
+def instrument_method(tracer, obj, method_name, span_name, **attrs):
+    """
+    Replaces obj.method_name on the instance with a version that runs inside a span.
+    """
+    method = getattr(obj, method_name)
+
+    def traced(*args, **kwargs):
+        with tracer.span(span_name, **attrs):
+            return method(*args, **kwargs)
+
+    setattr(obj, method_name, traced)
+    return obj
+
+
+class TracedDriver:
+    """
+    Proxy for a neo4j Driver that records each execute_query call as a span,
+    including the server-side result_available_after/result_consumed_after times.
+    """
+
+    def __init__(self, driver, tracer):
+        self._driver = driver
+        self._tracer = tracer
+
+    def execute_query(self, query_, *args, **kwargs):
+        # Same parameter name as neo4j's Driver.execute_query; Text2CypherRetriever passes query_=
+        with self._tracer.span("neo4j.query") as span:
+            result = self._driver.execute_query(query_, *args, **kwargs)
+            records, summary, _ = result
+            span.attrs["records"] = len(records)
+            if summary is not None:
+                span.attrs["server_available_after_ms"] = summary.result_available_after
+                span.attrs["server_consumed_after_ms"] = summary.result_consumed_after
+            return result
+
+    def __getattr__(self, name):
+        return getattr(self._driver, name)
+
+
+def instrument_retriever(retriever, tracer):
+    """
+    Instruments a neo4j_graphrag retriever: the whole search, every Neo4j query it
+    runs (vector lookup and retrieval_query are sent as one statement) and the
+    time spent formatting records into RetrieverResultItems.
+    """
+    retriever.driver = TracedDriver(retriever.driver, tracer)
+    get_result_formatter = retriever.get_result_formatter
+
+    def traced_get_result_formatter():
+        formatter = get_result_formatter()
+
+        def timed_formatter(record):
+            start = time.perf_counter()
+            try:
+                return formatter(record)
+            finally:
+                span = tracer.current_span()
+                if span is not None:
+                    span.accumulate("result_formatter", time.perf_counter() - start)
+
+        return timed_formatter
+
+    retriever.get_result_formatter = traced_get_result_formatter
+    return instrument_method(tracer, retriever, "search", "retriever.search", retriever=type(retriever).__name__)
+
+
+class MetricTimingHandler(BaseCallbackHandler):
+    """
+    langchain callback handler passed to ragas evaluate that times each metric
+    for each dataset row. ragas opens a "row i" chain per row and a chain per
+    metric below it.
+    """
+
+    def __init__(self):
+        self._runs = {}
+        self._lock = threading.Lock()
+        self.row_metrics = {}
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        metadata = metadata or {}
+        name = (serialized or {}).get("name", "")
+        with self._lock:
+            self._runs[run_id] = {
+                "name": name,
+                "parent": parent_run_id,
+                "row_index": metadata.get("row_index"),
+                "start": time.perf_counter(),
+            }
+
+    def _end(self, run_id):
+        with self._lock:
+            run = self._runs.get(run_id)
+            if run is None:
+                return
+            parent = self._runs.get(run["parent"])
+            if parent is None or parent["row_index"] is None:
+                return
+            duration_ms = round((time.perf_counter() - run["start"]) * 1000, 3)
+            self.row_metrics.setdefault(parent["row_index"], {})[run["name"]] = duration_ms
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._end(run_id)
+
+
+class JudgeErrorHandler(BaseCallbackHandler):
+    """
+    langchain callback handler attached to the judge chat model. Some ragas
+    metrics (e.g. AnswerAccuracy) catch judge errors and score the row NaN,
+    so every failed judge call is also recorded for the collect_judge_errors
+    block it ran in.
+    """
+
+    # Called in the judge call's own context, where the error list is set
+    run_inline = True
+
+    def on_llm_error(self, error, **kwargs):
+        errors = _judge_errors.get()
+        if errors is not None:
+            errors.append(error)
+
+
+@contextmanager
+def collect_judge_errors():
+    """
+    Yields the list of errors raised by judge calls made inside the block.
+    """
+    errors = []
+    token = _judge_errors.set(errors)
+    try:
+        yield errors
+    finally:
+        _judge_errors.reset(token)
+
+
+def attach_judge_error_handler(evaluator_llm):
+    """
+    Adds a JudgeErrorHandler to the callbacks of a ragas LangchainLLMWrapper's chat model.
+    """
+    chat_model = evaluator_llm.langchain_llm
+    chat_model.callbacks = list(chat_model.callbacks or []) + [JudgeErrorHandler()]
+    return evaluator_llm
@@ -0,0 +1,54 @@
+import os
+import tempfile
+from src import cache_store
+from src.cache_store import DiskCache, hash_key
+
+def test_hash_key_is_stable():
+    assert hash_key("gpt-4o", {"a": 1, "b": 2}, "prompt") == hash_key("gpt-4o", {"b": 2, "a": 1}, "prompt")
+    assert hash_key("gpt-4o", "prompt") != hash_key("gpt-4o-mini", "prompt")
+
+def test_get_set_and_stats():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache = DiskCache(os.path.join(tmpdir, "cache.sqlite"), "llm")
+        assert cache.get("k1") is None
+        cache.set("k1", "v1")
+        assert cache.get("k1") == "v1"
+        assert cache.stats() == {"hits": 1, "misses": 1, "hit_ratio": 0.5, "entries": 1}
+        cache.close()
+
+def test_namespaces_are_separate_and_persisted():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "cache.sqlite")
+        first = DiskCache(path, "retriever_llm")
+        first.set("k1", "retriever")
+        first.close()
+        reopened = DiskCache(path, "retriever_llm")
+        other = DiskCache(path, "evaluator_llm")
+        assert reopened.get("k1") == "retriever"
+        assert other.get("k1") is None
+        reopened.close()
+        other.close()
+
+def test_max_entries_evicts_least_recently_used():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache = DiskCache(os.path.join(tmpdir, "cache.sqlite"), "llm", max_entries=2)
+        cache.set("k1", "v1")
+        cache.set("k2", "v2")
+        cache.get("k1")
+        cache.set("k3", "v3")
+        cache.evict()
+        assert cache.get("k2") is None
+        assert cache.get("k1") == "v1"
+        assert cache.get("k3") == "v3"
+        cache.close()
+
+def test_max_age_expires_entries(monkeypatch):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        now = [1000.0]
+        monkeypatch.setattr(cache_store.time, "time", lambda: now[0])
+        cache = DiskCache(os.path.join(tmpdir, "cache.sqlite"), "llm", max_age_days=1)
+        cache.set("k1", "v1")
+        now[0] += 86400 + 1
+        assert cache.get("k1") is None
+        assert len(cache) == 0
+        cache.close()
@@ -0,0 +1,59 @@
+import os
+import tempfile
+from src.checkpoint import CheckpointWriter, load_checkpoint, order_results, result_key, completed_keys
+
+def make_result(question_id, retriever_name, response="answer"):
+    return {
+        "question_id": question_id,
+        "question_text": f"question {question_id}",
+        "retriever_name": retriever_name,
+        "test_data": {"reference": "ref", "response": response},
+        "scores": {"faithfulness": 1.0}
+    }
+
+def test_write_and_load_roundtrip():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "run.checkpoint.jsonl")
+        with CheckpointWriter(path, append=False) as checkpoint:
+            checkpoint.write(make_result("q1", "vectorRetriever"))
+            checkpoint.write(make_result("q1", "WebSearch"))
+        results = load_checkpoint(path)
+        assert [r["retriever_name"] for r in results] == ["vectorRetriever", "WebSearch"]
+        assert results[0]["test_data"]["reference"] == "ref"
+
+def test_resume_after_truncated_line():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "run.checkpoint.jsonl")
+        with CheckpointWriter(path, append=False) as checkpoint:
+            checkpoint.write(make_result("q1", "vectorRetriever"))
+        with open(path, "a", encoding="utf-8") as f:
+            f.write('{"question_id": "q2", "retr')
+        with CheckpointWriter(path) as checkpoint:
+            checkpoint.write(make_result("q2", "vectorRetriever"))
+        results = load_checkpoint(path)
+        assert [r["question_id"] for r in results] == ["q1", "q2"]
+
+def test_load_missing_checkpoint():
+    assert load_checkpoint("/nonexistent/run.checkpoint.jsonl") == []
+
+def test_order_results_follows_keys_and_last_write_wins():
+    results = [
+        make_result("q2", "r1"),
+        make_result("q1", "r1", response="first"),
+        make_result("q1", "r1", response="second"),
+        make_result("q9", "r1"),
+    ]
+    keys = [result_key("q1", "r1"), result_key("q2", "r1"), result_key("q3", "r1")]
+    ordered = order_results(results, keys)
+    assert [(r["question_id"], r["test_data"]["response"]) for r in ordered] == [("q1", "second"), ("q2", "answer")]
+
+def test_errored_pairs_are_not_completed():
+    results = [
+        make_result("q1", "r1"),
+        dict(make_result("q2", "r1"), error="Error code: 429"),
+        dict(make_result("q3", "r1"), error="Circuit breaker open"),
+        make_result("q3", "r1"),
+        make_result("q4", "r1"),
+        dict(make_result("q4", "r1"), error="Scoring failed: timeout"),
+    ]
+    assert completed_keys(results) == {result_key("q1", "r1"), result_key("q3", "r1")}
@@ -1,4 +1,5 @@
-from src.config_helper import get_metrics_from_config, get_retriever_config
+import pytest
+from src.config_helper import get_metrics_from_config, get_retriever_config, get_concurrency_config, get_scoring_config, get_top_k_groups, get_load_test_config, get_warmup_config, get_output_config, get_summary_config, get_metric_class, get_ragas_metric_names, get_text2cypher_config, get_cypher_cache_config, get_schema_cache_config, get_retrieval_cache_config
 from ragas.metrics import Faithfulness, AnswerAccuracy, RougeScore, SemanticSimilarity
 
 def test_get_metrics_from_config():
@@ -18,6 +19,15 @@ def test_get_metrics_from_config():
     assert any(isinstance(m, SemanticSimilarity) for m in metrics)
     # Check that the number of metrics matches
     assert len(metrics) == 4
+    with pytest.raises(ValueError):
+        get_metrics_from_config({"metrics": ["Faithfulnes"]})
+
+def test_get_metric_class():
+    assert {"Faithfulness", "RougeScore"} <= get_ragas_metric_names()
+    assert get_metric_class("RougeScore") is RougeScore
+    # Only names exported by ragas.metrics are resolved, not module attributes
+    with pytest.raises(ValueError):
+        get_metric_class("base")
 
 def test_get_retriever_config():
     config = {
@@ -68,3 +78,88 @@ def test_get_retriever_config():
     assert retriever_config == {"top_k": 5}
     
 
+
+def test_get_concurrency_config():
+    assert get_concurrency_config({}) == {"retrieval": 1, "evaluation": 1}
+    config = {"concurrency": {"retrieval": 16, "evaluation": 8}}
+    assert get_concurrency_config(config) == {"retrieval": 16, "evaluation": 8}
+    assert get_concurrency_config({"concurrency": {"retrieval": 4}}) == {"retrieval": 4, "evaluation": 1}
+    with pytest.raises(ValueError):
+        get_concurrency_config({"concurrency": {"retrieval": 0}})
+
+def test_get_scoring_config():
+    assert get_scoring_config({}) == {"batch_size": 100}
+    assert get_scoring_config({"scoring": {"batch_size": 25}}) == {"batch_size": 25}
+    with pytest.raises(ValueError):
+        get_scoring_config({"scoring": {"batch_size": -1}})
+
+def test_get_top_k_groups():
+    config = {
+        "retrievers": [
+            {"name": "k=1", "type": "vectorRetriever", "params": {"index_name": "vector_index"}, "retriever_config": {"top_k": 1}},
+            {"name": "k=5", "type": "vectorRetriever", "params": {"index_name": "vector_index"}, "retriever_config": {"top_k": 5}},
+            {"name": "k=3 other index", "type": "vectorRetriever", "params": {"index_name": "other_index"}, "retriever_config": {"top_k": 3}},
+            {"name": "cypher k=1", "type": "vectorCypherRetriever", "params": {"index_name": "vector_index"}, "retriever_config": {"top_k": 1}},
+            {"name": "cypher k=5", "type": "vectorCypherRetriever", "params": {"index_name": "vector_index"}, "retriever_config": {"top_k": 5}}
+        ]
+    }
+    groups = get_top_k_groups(config)
+    assert set(groups) == {"k=1", "k=5"}
+    assert groups["k=1"] == groups["k=5"]
+    assert groups["k=1"][1:] == (5, 2)
+    assert get_top_k_groups(dict(config, share_top_k=False)) == {}
+
+def test_get_load_test_config():
+    assert get_load_test_config({}) == {"concurrency_levels": [1], "repetitions": 1, "score": False}
+    config = {"load_test": {"concurrency_levels": [1, 5, 20], "repetitions": 3, "score": True}}
+    assert get_load_test_config(config) == {"concurrency_levels": [1, 5, 20], "repetitions": 3, "score": True}
+    with pytest.raises(ValueError):
+        get_load_test_config({"load_test": {"concurrency_levels": [0]}})
+
+def test_get_warmup_config():
+    assert get_warmup_config({}) == {"queries_per_retriever": 0}
+    assert get_warmup_config({"warmup": {"queries_per_retriever": 3}}) == {"queries_per_retriever": 3}
+    with pytest.raises(ValueError):
+        get_warmup_config({"warmup": {"queries_per_retriever": -1}})
+
+def test_get_output_config():
+    assert get_output_config({}) == {"columnar": None, "compact_json": False, "page_size": 50}
+    config = {"output": {"columnar": "parquet", "compact_json": True, "page_size": 20}}
+    assert get_output_config(config) == {"columnar": "parquet", "compact_json": True, "page_size": 20}
+    with pytest.raises(ValueError):
+        get_output_config({"output": {"columnar": "csv"}})
+    with pytest.raises(ValueError):
+        get_output_config({"output": {"page_size": 0}})
+
+def test_get_summary_config():
+    assert get_summary_config({}) == {"max_tokens": 4000, "worst_n": 5, "hierarchical": False, "concurrency": 4}
+    config = {"summary": {"max_tokens": 1000, "worst_n": 0, "hierarchical": True}}
+    assert get_summary_config(config)["worst_n"] == 0
+    assert get_summary_config(config)["hierarchical"] is True
+    with pytest.raises(ValueError):
+        get_summary_config({"summary": {"max_tokens": 0}})
+
+def test_get_text2cypher_config():
+    assert get_text2cypher_config({}) == {"explain": True, "max_estimated_rows": 1000000, "query_timeout_sec": 60, "max_rows": 1000}
+    guards = get_text2cypher_config({"explain": False, "query_timeout_sec": 5.5, "max_rows": None})
+    assert guards["explain"] is False
+    assert guards["query_timeout_sec"] == 5.5
+    assert guards["max_rows"] is None
+    with pytest.raises(ValueError):
+        get_text2cypher_config({"query_timeout_sec": 0})
+    with pytest.raises(ValueError):
+        get_text2cypher_config({"max_rows": 2.5})
+
+def test_get_cypher_cache_config():
+    assert get_cypher_cache_config({}) is None
+    assert get_cypher_cache_config({"cypher_cache": {"enabled": True}}) == {"path": "cypher_cache.sqlite", "max_age_days": None}
+
+def test_get_schema_cache_config():
+    assert get_schema_cache_config({}) is None
+    assert get_schema_cache_config({"schema_cache": {"enabled": True, "max_age_days": 7}}) == {"path": "schema_cache.sqlite", "max_age_days": 7}
+
+def test_get_retrieval_cache_config():
+    assert get_retrieval_cache_config({}) is None
+    assert get_retrieval_cache_config({"retrieval_cache": {"enabled": True}}) == {"path": "retrieval_cache.sqlite", "max_age_days": 7}
+    with pytest.raises(ValueError):
+        get_retrieval_cache_config({"retrieval_cache": {"enabled": True, "max_age_days": 0}})
@@ -0,0 +1,86 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from src.dry_run import check_test_config, plan_run
+
+def make_config(**overrides):
+    config = {
+        "retrieverLLM": {"model": "gpt-4o"},
+        "evaluatorLLM": {"model": "gpt-4o"},
+        "metrics": ["Faithfulness", "RougeScore"],
+        "retrievers": [
+            {"name": "k=1", "type": "vectorRetriever", "params": {"index_name": "chunks"}, "retriever_config": {"top_k": 1}},
+            {"name": "k=5", "type": "vectorRetriever", "params": {"index_name": "chunks"}, "retriever_config": {"top_k": 5}},
+        ],
+    }
+    config.update(overrides)
+    return config
+
+def write_files(tmpdir, config, questions):
+    paths = {}
+    for name, data in (("test_config", config), ("questions", {"questions": questions}),
+                       ("kg_config", {"neo4j_uri": "neo4j://localhost", "neo4j_user": "neo4j", "neo4j_password": "pw"})):
+        paths[name] = os.path.join(tmpdir, f"{name}.json")
+        with open(paths[name], "w") as f:
+            json.dump(data, f)
+    return {
+        "questions_json_path": paths["questions"],
+        "kg_config_json_path": paths["kg_config"],
+        "test_config_json_path": paths["test_config"],
+    }
+
+def test_check_test_config_accepts_valid_config():
+    assert check_test_config(make_config()) == []
+
+def test_check_test_config_reports_every_problem():
+    config = make_config(
+        metrics=["Faithfulness", "Faithfulnes"],
+        retrievers=[
+            {"name": "a", "type": "vectorRetriever", "params": {}},
+            {"name": "a", "type": "graphRetriever", "params": {}},
+            {"name": "t2c", "type": "text2CypherRetriever", "params": {"max_rows": 0}},
+        ],
+        concurrency={"retrieval": 0},
+    )
+    problems = check_test_config(config)
+    assert len(problems) == 6
+    assert "a needs params.index_name" in problems
+    assert any("Faithfulnes'" in problem for problem in problems)
+    assert any("concurrency.retrieval" in problem for problem in problems)
+    assert any("used more than once" in problem for problem in problems)
+    assert any("unknown type 'graphRetriever'" in problem for problem in problems)
+    assert any(problem.startswith("t2c: ") and "max_rows" in problem for problem in problems)
+
+def test_plan_run_counts_work_items():
+    questions = [
+        {"id": "q1", "question": "Q1", "ground_truth": "A1", "answers": [{"source": "Web", "answer": "a"}]},
+        {"id": "q2", "question": "Q2", "ground_truth": "A2"},
+    ]
+    with tempfile.TemporaryDirectory() as tmpdir:
+        config_arg = write_files(tmpdir, make_config(scoring={"batch_size": 2}), questions)
+        plan = plan_run(config_arg)
+        assert plan["problems"] == []
+        assert plan["work_matrix"] == {"k=1": 2, "k=5": 2, "Web": 1}
+        assert plan["work_items"] == 5
+        assert plan["scoring_batches"] == 3
+        assert plan["shared_top_k_searches"] == 1
+
+        plan = plan_run(dict(config_arg, question_filters={"ids": ["q2"]}))
+        assert plan["questions"] == 1
+
+def test_plan_run_reports_bad_questions_file():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        config_arg = write_files(tmpdir, make_config(), [{"id": "q1", "question": "Q1", "ground_truth": "A"}, {"id": "q1", "question": "Q2", "ground_truth": "B"}])
+        plan = plan_run(config_arg)
+        assert len(plan["problems"]) == 1
+        assert "already exists" in plan["problems"][0]
+
+def test_dry_run_does_not_import_heavy_packages():
+    code = (
+        "import sys; sys.path.insert(0, 'src'); import main, dry_run; "
+        "print(','.join(name for name in ('ragas', 'langchain_core', 'neo4j_graphrag', 'datasets', 'matplotlib', 'pandas') if name in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == ""
@@ -0,0 +1,52 @@
+import os
+import tempfile
+from src.cache_store import DiskCache
+from src.embedding_cache import CachedEmbeddings
+
+class CountingEmbeddings:
+    model = "text-embedding-test"
+
+    def __init__(self):
+        self.query_calls = 0
+        self.documents_calls = []
+
+    def embed_query(self, text):
+        self.query_calls += 1
+        return [float(len(text)), 1.0]
+
+    def embed_documents(self, texts):
+        self.documents_calls.append(list(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+def test_embed_query_is_memoised():
+    inner = CountingEmbeddings()
+    embedder = CachedEmbeddings(inner)
+    assert embedder.embed_query("What is Python?") == [15.0, 1.0]
+    assert embedder.embed_query("What is Python?") == [15.0, 1.0]
+    assert inner.query_calls == 1
+    assert embedder.stats()["hits"] == 1
+
+def test_prefetch_batches_distinct_texts():
+    inner = CountingEmbeddings()
+    embedder = CachedEmbeddings(inner)
+    embedder.prefetch(["a", "bb", "a", "ccc"], batch_size=2)
+    assert inner.documents_calls == [["a", "bb"], ["ccc"]]
+    embedder.embed_query("bb")
+    assert inner.query_calls == 0
+
+def test_embed_documents_keeps_input_order():
+    embedder = CachedEmbeddings(CountingEmbeddings())
+    embedder.embed_query("bb")
+    assert embedder.embed_documents(["ccc", "bb", "ccc"]) == [[3.0, 1.0], [2.0, 1.0], [3.0, 1.0]]
+
+def test_vectors_are_persisted():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "embeddings.sqlite")
+        first = DiskCache(path, "embeddings")
+        CachedEmbeddings(CountingEmbeddings(), disk_cache=first).embed_query("question")
+        first.close()
+        second = DiskCache(path, "embeddings")
+        inner = CountingEmbeddings()
+        assert CachedEmbeddings(inner, disk_cache=second).embed_query("question") == [8.0, 1.0]
+        assert inner.query_calls == 0
+        second.close()
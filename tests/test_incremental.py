@@ -0,0 +1,65 @@
+import json
+import os
+import tempfile
+from src.incremental import fingerprint, load_previous_answers, result_from_previous_answer
+from src.questions import Question
+
+class KG:
+    neo4j_uri = "neo4j://localhost:7687"
+    neo4j_database = "neo4j"
+    neo4j_password = "secret"
+
+CONFIG = {
+    "retrieverLLM": {"model": "gpt-4o"},
+    "evaluatorLLM": {"model": "gpt-4o"},
+    "retrievers": [
+        {"name": "vector", "type": "vectorRetriever", "params": {"index_name": "vector_index"}, "retriever_config": {"top_k": 5}},
+        {"name": "cypher", "type": "vectorCypherRetriever", "params": {"index_name": "vector_index", "retrieval_query": "RETURN node"}}
+    ],
+    "metrics": ["Faithfulness", "RougeScore"]
+}
+
+def test_fingerprint_changes_only_with_inputs():
+    question = Question("q1", "What is Neo4j?", "A graph database")
+    base = fingerprint(CONFIG, KG(), question, "retriever", "cypher")
+    assert base == fingerprint(dict(CONFIG), KG(), question, "retriever", "cypher")
+
+    edited = json.loads(json.dumps(CONFIG))
+    edited["retrievers"][1]["params"]["retrieval_query"] = "RETURN node LIMIT 1"
+    assert fingerprint(edited, KG(), question, "retriever", "cypher") != base
+    # Other retrievers are unaffected by the edit
+    assert fingerprint(edited, KG(), question, "retriever", "vector") == fingerprint(CONFIG, KG(), question, "retriever", "vector")
+
+    assert fingerprint(dict(CONFIG, metrics=["Faithfulness"]), KG(), question, "retriever", "cypher") != base
+    assert fingerprint(dict(CONFIG, evaluatorLLM={"model": "gpt-4o-mini"}), KG(), question, "retriever", "cypher") != base
+    changed_question = Question("q1", "What is Neo4j?", "A graph database management system")
+    assert fingerprint(CONFIG, KG(), changed_question, "retriever", "cypher") != base
+
+def test_load_previous_answers_and_copy_forward():
+    report = {
+        "metadata": {},
+        "report": [{
+            "question": "What is Neo4j?",
+            "reference": "A graph database",
+            "retrievers": [
+                {"name": "vector", "answers": [{"response": "A graph DB", "scores": {"faithfulness": 1.0}, "fingerprint": "abc", "rag_duration_sec": 1.5}]},
+                {"name": "cypher", "answers": [{"response": "Error", "scores": {}, "fingerprint": "def", "error": "boom"}]},
+                {"name": "old", "answers": [{"response": "No fingerprint", "scores": {}}]}
+            ]
+        }]
+    }
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "report.json")
+        with open(path, "w") as f:
+            json.dump(report, f)
+        answers = load_previous_answers(path)
+    assert list(answers) == [("What is Neo4j?", "vector")]
+
+    reference, answer = answers[("What is Neo4j?", "vector")]
+    result = result_from_previous_answer(Question("q7", "What is Neo4j?", reference), "vector", reference, answer)
+    assert result.question_id == "q7"
+    assert result.reference == "A graph database"
+    assert result.response == "A graph DB"
+    assert result.scores == {"faithfulness": 1.0}
+    assert result.rag_duration_sec == 1.5
+    assert result.reused is True
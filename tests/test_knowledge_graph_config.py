@@ -45,4 +45,15 @@ def test_init_with_minimal_dict():
 def test_init_missing_required_fields():
     config = {
         "neo4j_uri": "bolt://localhost:7687"
-    }
\ No newline at end of file
+    }
+
+def test_driver_settings():
+    config = {"neo4j_uri": "bolt://localhost:7687", "neo4j_user": "neo4j", "neo4j_password": "password"}
+    kgc = KnowledgeGraphConfig(dict(config, driver={"max_connection_pool_size": 20, "verify_connectivity": False}))
+    assert kgc.driver_config["max_connection_pool_size"] == 20
+    assert kgc.driver_config["fetch_size"] == 1000
+    assert kgc.driver_config["verify_connectivity"] is False
+    with pytest.raises(ValueError):
+        KnowledgeGraphConfig(dict(config, driver={"max_connection_pool_size": 0}))
+    with pytest.raises(ValueError):
+        KnowledgeGraphConfig(dict(config, driver={"pool_size": 20}))
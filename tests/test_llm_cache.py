@@ -0,0 +1,37 @@
+import os
+import tempfile
+from neo4j_graphrag.llm.types import LLMResponse
+from src.cache_store import DiskCache
+from src.llm_cache import CachedLLM
+
+class CountingLLM:
+    def __init__(self, model_name="gpt-4o"):
+        self.model_name = model_name
+        self.model_params = {"temperature": 0}
+        self.calls = 0
+
+    def invoke(self, input, message_history=None, system_instruction=None):
+        self.calls += 1
+        return LLMResponse(content=f"answer to {input}")
+
+def test_cached_llm_reuses_identical_calls():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache = DiskCache(os.path.join(tmpdir, "cache.sqlite"), "retriever_llm")
+        inner = CountingLLM()
+        llm = CachedLLM(inner, cache)
+        assert llm.invoke("question").content == "answer to question"
+        assert llm.invoke("question").content == "answer to question"
+        assert inner.calls == 1
+        llm.invoke("question", system_instruction="be brief")
+        assert inner.calls == 2
+        assert cache.stats()["hits"] == 1
+        cache.close()
+
+def test_cached_llm_key_includes_model():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache = DiskCache(os.path.join(tmpdir, "cache.sqlite"), "retriever_llm")
+        CachedLLM(CountingLLM("gpt-4o"), cache).invoke("question")
+        other = CountingLLM("gpt-4o-mini")
+        CachedLLM(other, cache).invoke("question")
+        assert other.calls == 1
+        cache.close()
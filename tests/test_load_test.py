@@ -0,0 +1,56 @@
+import os
+import tempfile
+import pytest
+from src.load_test import percentile, latency_stats, run_load_level, generate_load_test_charts, latency_by_phase
+from src.result_record import ResultRecord
+
+def test_percentile_interpolates():
+    values = [4, 1, 3, 2]
+    assert percentile(values, 0) == 1
+    assert percentile(values, 50) == pytest.approx(2.5)
+    assert percentile(values, 100) == 4
+    assert percentile([7], 99) == 7
+    assert percentile([], 50) is None
+
+def test_latency_stats():
+    stats = latency_stats([i / 100 for i in range(1, 101)])
+    assert stats["count"] == 100
+    assert stats["min"] == 0.01 and stats["max"] == 1.0
+    assert stats["p50"] == pytest.approx(0.505)
+    assert stats["p99"] == pytest.approx(0.9901)
+    assert latency_stats([])["p95"] is None
+
+def test_run_load_level_counts_errors():
+    def search(question):
+        if question == "bad":
+            return ResultRecord("q1", question, "vector", "", "", error="boom")
+        if question == "raise":
+            raise RuntimeError("429 rate limit")
+        return ResultRecord("q1", question, "vector", "", question)
+
+    level = run_load_level(search, ["a", "b", "bad", "raise"], concurrency=2, repetitions=3)
+    assert level["concurrency"] == 2
+    assert level["requests"] == 12
+    assert level["errors"] == 6
+    assert level["error_rate"] == 0.5
+    assert level["latency_sec"]["count"] == 6
+    assert level["throughput_qps"] > 0
+
+def test_generate_load_test_charts():
+    level = run_load_level(lambda question: ResultRecord("q1", question, "vector", "", ""), ["a"], concurrency=1, repetitions=2)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        chart_path = generate_load_test_charts({"retrievers": {"vector": [level]}}, os.path.join(tmpdir, "run.json"))
+        assert chart_path.endswith("run_load_test_chart.png")
+        assert os.path.exists(chart_path)
+
+def test_latency_by_phase():
+    results = [
+        ResultRecord("q1", "Q1", "vector", "", "", rag_duration_sec=2.0, latency_phase="cold"),
+        ResultRecord("q2", "Q2", "vector", "", "", rag_duration_sec=0.5, latency_phase="warm"),
+        ResultRecord("q3", "Q3", "vector", "", "", rag_duration_sec=0.7, latency_phase="warm"),
+        ResultRecord("q1", "Q1", "Web", "", "", rag_duration_sec=0)
+    ]
+    phases = latency_by_phase(results)
+    assert set(phases) == {"vector"}
+    assert phases["vector"]["cold"]["count"] == 1
+    assert phases["vector"]["warm"]["p50"] == pytest.approx(0.6)
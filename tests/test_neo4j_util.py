@@ -0,0 +1,96 @@
+import threading
+import time
+import neo4j
+import pytest
+from src.knowledge_graph_config import KnowledgeGraphConfig
+from src.neo4j_util import track_pool_usage, get_driver_kwargs
+
+class FakeDriver:
+    def __init__(self, query_sec=0.0):
+        self.query_sec = query_sec
+        self.calls = []
+
+    def execute_query(self, query_, parameters_=None, **kwargs):
+        self.calls.append((query_, kwargs))
+        time.sleep(self.query_sec)
+        return [], None, []
+
+def test_queries_are_passed_through_unchanged():
+    driver = track_pool_usage(FakeDriver(), 2)
+    driver.execute_query("MATCH (n) RETURN n")
+    driver.execute_query(query_="MATCH (n) RETURN n", routing_=neo4j.RoutingControl.READ)
+    assert driver.calls == [
+        ("MATCH (n) RETURN n", {}),
+        ("MATCH (n) RETURN n", {"routing_": neo4j.RoutingControl.READ}),
+    ]
+
+def test_concurrent_queries_are_counted_but_not_limited():
+    driver = track_pool_usage(FakeDriver(query_sec=0.1), 2)
+    threads = [threading.Thread(target=driver.execute_query, args=("RETURN 1",)) for _ in range(4)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # All four ran at once; the real driver's pool is the only limit
+    assert time.perf_counter() - start < 0.2
+    stats = driver.pool_stats.stats()
+    assert (stats["queries"], stats["peak_in_use"]) == (4, 4)
+
+def test_connection_acquisition_wait_is_measured():
+    class FakePool:
+        def __init__(self):
+            self.free = threading.Semaphore(1)
+
+        def acquire(self, **kwargs):
+            self.free.acquire()
+            return self
+
+        def release(self):
+            self.free.release()
+
+    class PooledDriver(FakeDriver):
+        def __init__(self):
+            super().__init__()
+            self._pool = FakePool()
+
+        def execute_query(self, query_, parameters_=None, **kwargs):
+            connection = self._pool.acquire(access_mode="r")
+            try:
+                time.sleep(0.05)
+                return [], None, []
+            finally:
+                connection.release()
+
+    driver = track_pool_usage(PooledDriver(), 1)
+    threads = [threading.Thread(target=driver.execute_query, args=("RETURN 1",)) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = driver.pool_stats.stats()
+    assert stats["connection_acquisitions"] == 2
+    # The second query waited for the first to release the only connection
+    assert stats["max_acquire_wait_ms"] >= 40
+
+def test_real_driver_sessions_use_the_timed_pool():
+    driver = neo4j.GraphDatabase.driver("bolt://127.0.0.1:1", auth=("neo4j", "password"), max_transaction_retry_time=0)
+    try:
+        track_pool_usage(driver, 1)
+        with pytest.raises(neo4j.exceptions.ServiceUnavailable):
+            driver.execute_query("RETURN 1")
+        # The refused connection attempt was still timed
+        assert driver.pool_stats.stats()["connection_acquisitions"] == 1
+    finally:
+        driver.close()
+
+def test_driver_kwargs_use_kg_pool_settings():
+    kg_config = KnowledgeGraphConfig({
+        "neo4j_uri": "neo4j://localhost:7687", "neo4j_user": "neo4j", "neo4j_password": "password",
+        "driver": {"max_connection_pool_size": 16, "fetch_size": 500},
+    })
+    kwargs = get_driver_kwargs(kg_config)
+    assert kwargs["auth"] == ("neo4j", "password")
+    assert kwargs["max_connection_pool_size"] == 16
+    assert kwargs["fetch_size"] == 500
+    assert kwargs["connection_acquisition_timeout"] == 60
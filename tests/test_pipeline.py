@@ -0,0 +1,64 @@
+import asyncio
+import random
+import pytest
+from src.pipeline import run_pipeline, _get_within
+
+def run(items, producers=3, consumers=2, queue_size=4, batch_size=3, batch_wait_sec=0.05):
+    consumed = []
+    in_flight = {"outputs": 0, "max": 0}
+
+    async def produce(item):
+        await asyncio.sleep(random.random() * 0.005)
+        in_flight["outputs"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["outputs"])
+        return item * 10
+
+    async def consume(batch):
+        assert 1 <= len(batch) <= batch_size
+        await asyncio.sleep(0.01)
+        in_flight["outputs"] -= len(batch)
+        consumed.append(batch)
+
+    stats = asyncio.run(run_pipeline(items, produce, consume, producers, consumers, queue_size, batch_size, batch_wait_sec))
+    return consumed, stats, in_flight["max"]
+
+def test_every_item_is_consumed_once():
+    consumed, stats, _ = run(range(25))
+    assert sorted(output for batch in consumed for output in batch) == [i * 10 for i in range(25)]
+    assert stats["batches"] == len(consumed)
+    assert stats["queue_wait_sec"]["count"] == 25
+
+def test_queue_is_bounded():
+    _, stats, max_held = run(range(50), producers=8, consumers=1, queue_size=2, batch_size=2)
+    assert stats["max_queue_depth"] <= 2
+    # queue + one partial batch per consumer + one output per blocked producer
+    assert max_held <= 2 + 2 + 8
+    assert stats["producer_blocked_sec"] > 0
+
+def test_empty_input():
+    consumed, stats, _ = run([])
+    assert consumed == []
+    assert stats["batches"] == 0
+
+def test_get_within_times_out_and_returns_entries():
+    async def scenario():
+        queue = asyncio.Queue()
+        assert await _get_within(queue, 0.01) == (False, None)
+        queue.put_nowait("entry")
+        return await _get_within(queue, 0.01)
+
+    assert asyncio.run(scenario()) == (True, "entry")
+
+def test_get_within_can_be_cancelled():
+    async def scenario():
+        queue = asyncio.Queue()
+        waiter = asyncio.ensure_future(_get_within(queue, 10))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        # The cancelled wait does not take the next entry
+        queue.put_nowait("entry")
+        return await _get_within(queue, 0.01)
+
+    assert asyncio.run(scenario()) == (True, "entry")
@@ -1,8 +1,9 @@
+import io
 import os
 import json
 import tempfile
 import pytest
-from src.questions import Questions, Question
+from src.questions import Questions, Question, iter_questions, _iter_json_questions, shard_index
 
 SAMPLE_JSON = {
     "questions": [
@@ -52,4 +53,78 @@ def test_iterate_questions():
         texts.append(question.question)
     assert "What is Python?" in texts
     assert "What is 2+2?" in texts
-    assert len(texts) == 2
\ No newline at end of file
+    assert len(texts) == 2
+
+
+def write_file(tmpdir, name, content):
+    path = os.path.join(tmpdir, name)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+    return path
+
+def make_entries(count):
+    return [
+        {"id": f"q{i}", "question": f"Question {i}?", "ground_truth": f"Answer {i} " * 50, "tags": ["even" if i % 2 == 0 else "odd"]}
+        for i in range(count)
+    ]
+
+class TrickleReader(io.StringIO):
+    # Returns a few characters per read so values span many chunk boundaries
+    def __init__(self, text, read_size):
+        super().__init__(text)
+        self.read_size = read_size
+
+    def read(self, size=-1):
+        return super().read(self.read_size)
+
+@pytest.mark.parametrize("read_size", [1, 3, 7, 64])
+def test_json_questions_are_streamed_across_chunks(read_size):
+    entries = make_entries(10)
+    document = json.dumps({"version": 2, "metadata": {"source": "x", "list": [1.25e3, 22.5]}, "questions": entries, "count": 10.75}, indent=2)
+    parsed = list(_iter_json_questions(TrickleReader(document, read_size)))
+    assert parsed == entries
+
+def test_iter_questions_reads_json():
+    entries = make_entries(5)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = write_file(tmpdir, "questions.json", json.dumps({"questions": entries}))
+        questions = list(iter_questions(path))
+    assert [q.id for q in questions] == [e["id"] for e in entries]
+    assert questions[3].ground_truth == entries[3]["ground_truth"]
+    assert questions[3].tags == ("odd",)
+
+def test_iter_questions_jsonl_and_filters():
+    entries = make_entries(20)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = write_file(tmpdir, "questions.jsonl", "\n".join(json.dumps(e) for e in entries) + "\n")
+        assert len(list(iter_questions(path))) == 20
+        assert [q.id for q in iter_questions(path, ids=["q3", "q11"])] == ["q3", "q11"]
+        assert all(int(q.id[1:]) % 2 == 0 for q in iter_questions(path, tags=["even"]))
+        sample = [q.id for q in iter_questions(path, sample=5, seed=1)]
+        assert len(sample) == 5
+        # Sampled questions come back in file order and the sample is repeatable
+        assert sample == sorted(sample, key=lambda question_id: int(question_id[1:]))
+        assert sample == [q.id for q in iter_questions(path, sample=5, seed=1)]
+        questions = Questions.load_from_json(path, tags=["odd"], sample=3)
+        assert len(questions) == 3
+
+def test_sample_is_drawn_before_the_shard_split():
+    entries = make_entries(40)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = write_file(tmpdir, "questions.jsonl", "\n".join(json.dumps(e) for e in entries) + "\n")
+        sample = [q.id for q in iter_questions(path, sample=10, seed=3)]
+        shards = [[q.id for q in iter_questions(path, sample=10, seed=3, shard=(index, 4))] for index in range(4)]
+    assert sorted(sum(shards, [])) == sorted(sample)
+    assert all(shard_index(question_id, 4) == index for index, ids in enumerate(shards) for question_id in ids)
+
+def test_iter_questions_detects_duplicate_ids():
+    entries = make_entries(3) + [make_entries(1)[0]]
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = write_file(tmpdir, "questions.json", json.dumps({"questions": entries}))
+        with pytest.raises(ValueError):
+            list(iter_questions(path, ids=["q1"]))
+
+def test_question_uses_slots():
+    question = Question("q1", "What?", "That", tags=["a"])
+    assert not hasattr(question, "__dict__")
+    assert question.tags == ("a",)
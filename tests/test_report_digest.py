@@ -0,0 +1,89 @@
+import threading
+from src.report_digest import worst_answers, build_digest, fit_digest, summarize_digest, SYSTEM_PROMPT
+from src.report_output import aggregate_report
+from src.scheduler import estimate_tokens
+
+class FakeLLM:
+    def __init__(self):
+        self.prompts = []
+        self.lock = threading.Lock()
+
+    def invoke(self, prompt):
+        with self.lock:
+            self.prompts.append(prompt)
+
+        class Response:
+            content = f"summary {len(self.prompts)}"
+        return Response()
+
+def make_report(questions=20):
+    report = []
+    for i in range(questions):
+        report.append({
+            "question": f"question {i} " + "x" * 500,
+            "reference": "reference",
+            "retrievers": [
+                {"name": "vector", "answers": [{"response": f"answer {i}", "scores": {"faithfulness": i / questions}, "rag_duration_sec": 1.0}]},
+                {"name": "cypher", "answers": [{"response": "Error", "scores": {}, "rag_duration_sec": 0.5, "error": "boom"}
+                                               if i == 3 else {"response": f"answer {i}", "scores": {"faithfulness": 1 - i / questions}, "rag_duration_sec": 0.5}]},
+            ]
+        })
+    config = {
+        "retrieverLLM": {"model": "gpt-4o"},
+        "retrievers": [{"name": "vector", "type": "vectorRetriever", "retriever_config": {"top_k": 5}},
+                       {"name": "cypher", "type": "vectorCypherRetriever", "params": {"retrieval_query": "MATCH " * 500}}],
+    }
+    return {"metadata": {"date_run": "2025-11-05", "config": config}, "report": report}
+
+def test_worst_answers_keeps_lowest_scores():
+    worst = worst_answers(make_report(), 3)
+    assert [answer["response"] for answer in worst["vector"]] == ["answer 0", "answer 1", "answer 2"]
+    # Failed answers rank below every scored answer
+    assert worst["cypher"][0]["error"] == "boom"
+    assert [answer["response"] for answer in worst["cypher"][1:]] == ["answer 19", "answer 18"]
+    assert worst["vector"][0]["question"].endswith("...")
+
+def test_digest_leaves_out_queries():
+    results_json = make_report()
+    digest = build_digest(results_json, aggregate_report(results_json), 2)
+    assert digest["retrievers"][1] == {"name": "cypher", "type": "vectorCypherRetriever", "top_k": None}
+    assert digest["answers"]["cypher"]["errors"] == 1
+    assert len(digest["worst_answers"]["vector"]) == 2
+
+def test_fit_digest_shrinks_worst_answers_to_budget():
+    results_json = make_report()
+    aggregate = aggregate_report(results_json)
+    _, full_tokens = fit_digest(results_json, aggregate, SYSTEM_PROMPT, 100000, 8)
+    _, small_tokens = fit_digest(results_json, aggregate, SYSTEM_PROMPT, 800, 8)
+    assert small_tokens <= 800 < full_tokens
+
+def test_summary_prompt_does_not_grow_with_questions():
+    config = {"max_tokens": 2000, "worst_n": 3, "hierarchical": False, "concurrency": 2}
+    small_llm, large_llm = FakeLLM(), FakeLLM()
+    summarize_digest(make_report(10), small_llm, config)
+    summary, stats = summarize_digest(make_report(2000), large_llm, config)
+    assert summary == "summary 1"
+    assert stats["llm_calls"] == 1
+    assert abs(len(large_llm.prompts[0]) - len(small_llm.prompts[0])) < 100
+
+def test_hierarchical_summary_runs_one_call_per_retriever():
+    llm = FakeLLM()
+    config = {"max_tokens": 2000, "worst_n": 3, "hierarchical": True, "concurrency": 2}
+    summary, stats = summarize_digest(make_report(), llm, config)
+    assert stats["llm_calls"] == 3
+    assert summary == "summary 3"
+    assert "Per-retriever summaries" in llm.prompts[-1]
+
+def test_hierarchical_final_prompt_stays_within_budget():
+    class VerboseLLM(FakeLLM):
+        def invoke(self, prompt):
+            response = super().invoke(prompt)
+            response.content = "The retriever did fine. " * 500
+            return response
+
+    llm = VerboseLLM()
+    config = {"max_tokens": 1500, "worst_n": 3, "hierarchical": True, "concurrency": 2}
+    _, stats = summarize_digest(make_report(), llm, config)
+    assert stats["max_prompt_tokens"] <= 1500
+    assert estimate_tokens(llm.prompts[-1]) <= 1500
+    assert "Retriever cypher:" in llm.prompts[-1]
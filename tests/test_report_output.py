@@ -0,0 +1,148 @@
+import json
+import os
+import tempfile
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from src.report_output import report_rows, rows_to_table, write_report, write_json_report, aggregate_report, score_stats
+
+def make_report():
+    return {
+        "metadata": {"config": {}},
+        "report": [{
+            "question": "What is Neo4j?",
+            "question_id": 7,
+            "reference": "A graph database",
+            "retrievers": [
+                {"name": "vector", "answers": [{
+                    "response": "A graph DB",
+                    "scores": {"faithfulness": 0.5, "rouge_score(mode=fmeasure)": 1.0},
+                    "rag_duration_sec": 1.5,
+                    "context_length": 120,
+                    "latency_phase": "warm",
+                    "stages": {"rag": {"duration_ms": 1500}},
+                }]},
+                {"name": "cypher", "answers": [{
+                    "response": "Error occurred during RAG search: boom",
+                    "scores": {},
+                    "rag_duration_sec": 0.2,
+                    "context_length": 0,
+                    "error": "boom",
+                }]}
+            ]
+        }]
+    }
+
+def test_report_rows_flattens_answers():
+    rows = report_rows(make_report())
+    assert [row["retriever_name"] for row in rows] == ["vector", "cypher"]
+    assert rows[0]["question_id"] == "7"
+    assert rows[0]["score_faithfulness"] == 0.5
+    assert rows[0]["score_rouge_score(mode=fmeasure)"] == 1.0
+    assert "stages" not in rows[0]
+    assert rows[1]["error"] == "boom"
+    assert "score_faithfulness" not in rows[1]
+
+def test_rows_to_table_fills_missing_columns():
+    table = rows_to_table(report_rows(make_report()))
+    assert table.num_rows == 2
+    assert table.column("score_faithfulness").to_pylist() == [0.5, None]
+    assert rows_to_table([]).num_rows == 0
+
+@pytest.mark.parametrize("columnar", ["parquet", "arrow"])
+def test_write_report_columnar(columnar):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "run.json")
+        results_json = make_report()
+        write_report(results_json, path, {"columnar": columnar, "compact_json": True, "page_size": 50})
+        columnar_path = results_json["metadata"]["columnar_report_path"]
+        assert columnar_path == os.path.join(tmpdir, f"run.{columnar}")
+        if columnar == "parquet":
+            table = pq.read_table(columnar_path)
+        else:
+            with pa.memory_map(columnar_path) as source:
+                table = pa.ipc.open_file(source).read_all()
+        assert table.column("rag_duration_sec").to_pylist() == [1.5, 0.2]
+        with open(path) as f:
+            text = f.read()
+        assert "\n" not in text
+        assert json.loads(text)["metadata"]["columnar_report_path"] == columnar_path
+
+def test_write_report_json_only():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "run.json")
+        results_json = make_report()
+        write_report(results_json, path, {"columnar": None, "compact_json": False, "page_size": 50})
+        assert sorted(os.listdir(tmpdir)) == ["run.json", "run_summary.json"]
+        with open(path) as f:
+            assert f.read().startswith("{\n    ")
+
+def test_score_stats():
+    stats = score_stats([0.0, 0.5, 1.0, 1.0])
+    assert stats["count"] == 4
+    assert stats["mean"] == 0.625
+    assert stats["median"] == 0.75
+    assert stats["p25"] == 0.375
+    assert score_stats([]) == {"count": 0}
+
+def test_aggregate_report():
+    summary = aggregate_report(make_report())
+    assert summary["questions"] == 1
+    assert summary["retrievers"] == ["vector", "cypher"]
+    assert summary["metrics"] == ["faithfulness", "rouge_score(mode=fmeasure)"]
+    assert summary["scores"]["vector"]["faithfulness"]["mean"] == 0.5
+    # The failed answer has no scores and is counted as an error
+    assert summary["scores"]["cypher"]["faithfulness"] == {"count": 0}
+    assert summary["answers"]["cypher"] == {"answers": 1, "errors": 1}
+    assert summary["latency_sec"]["vector"]["rag_duration_sec"]["p50"] == 1.5
+
+@pytest.mark.parametrize("indent", [None, 4])
+def test_write_json_report_matches_json_dumps(indent):
+    results_json = make_report()
+    results_json["report"].append(dict(results_json["report"][0], question="Wie heißt Neo4j?\n"))
+    results_json["report_summary"] = "Vector is best"
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "run.json")
+        offsets = write_json_report(results_json, path, indent)
+        with open(path, "rb") as f:
+            data = f.read()
+    assert data.decode("utf-8") == json.dumps(results_json, indent=indent)
+    assert [json.loads(data[start:end]) for start, end in offsets] == results_json["report"]
+
+def test_summary_pages_cover_question_entries():
+    results_json = make_report()
+    results_json["report"] = [dict(results_json["report"][0], question=f"q{i}") for i in range(5)]
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "run.json")
+        write_report(results_json, path, {"columnar": None, "compact_json": False, "page_size": 2})
+        with open(results_json["metadata"]["summary_path"]) as f:
+            summary = json.load(f)
+        with open(path, "rb") as f:
+            data = f.read()
+    assert summary["report_file"] == "run.json"
+    assert summary["answers"]["vector"]["answers"] == 5
+    pages = [json.loads(b"[" + data[start:end] + b"]") for start, end in summary["pages"]]
+    assert [[entry["question"] for entry in page] for page in pages] == [["q0", "q1"], ["q2", "q3"], ["q4"]]
+
+def test_summary_pages_survive_windows_newlines(monkeypatch):
+    real_open = open
+
+    def windows_open(file, mode="r", *args, newline=None, **kwargs):
+        # Text mode on Windows writes "\n" as "\r\n" unless newline is given
+        if "b" not in mode and newline is None:
+            newline = "\r\n"
+        return real_open(file, mode, *args, newline=newline, **kwargs)
+
+    monkeypatch.setattr("builtins.open", windows_open)
+    results_json = make_report()
+    results_json["report"] = [dict(results_json["report"][0], question=f"q{i}") for i in range(3)]
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "run.json")
+        write_report(results_json, path, {"columnar": None, "compact_json": False, "page_size": 2})
+        with real_open(results_json["metadata"]["summary_path"]) as f:
+            summary = json.load(f)
+        with real_open(path, "rb") as f:
+            data = f.read()
+    assert results_json["metadata"]["page_size"] == 2
+    pages = [json.loads(b"[" + data[start:end] + b"]") for start, end in summary["pages"]]
+    assert [[entry["question"] for entry in page] for page in pages] == [["q0", "q1"], ["q2"]]
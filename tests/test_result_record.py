@@ -0,0 +1,56 @@
+import pytest
+from src.result_record import ResultRecord
+
+def make_record(**fields):
+    return ResultRecord(
+        question_id="q1",
+        question_text="What is Neo4j?",
+        retriever_name="vector",
+        reference="A graph database",
+        response="A graph DB",
+        **fields
+    )
+
+def test_to_row_is_the_ragas_row():
+    record = make_record()
+    assert record.to_row() == {
+        "user_input": "What is Neo4j?",
+        "reference": "A graph database",
+        "response": "A graph DB",
+        "contexts": ["A graph database"],
+    }
+
+def test_records_have_no_instance_dict():
+    with pytest.raises(AttributeError):
+        make_record().extra = 1
+
+def test_to_dict_round_trip():
+    record = make_record(
+        scores={"faithfulness": 0.5},
+        rag_duration_sec=1.5,
+        latency_phase="warm",
+        fingerprint="abc",
+        stages={"rag": {"duration_ms": 1500}},
+        rag_stages={"duration_ms": 1500},
+        llm_chars=42,
+    )
+    result = record.to_dict()
+    assert result["test_data"] == record.to_row()
+    assert result["latency_phase"] == "warm"
+    # Transient fields and unset optional fields are not written
+    assert "rag_stages" not in result
+    assert "llm_chars" not in result
+    assert "error" not in result
+    assert "reused" not in result
+
+    restored = ResultRecord.from_dict(result)
+    assert restored.to_dict() == result
+    assert restored.rag_stages is None
+
+def test_from_answer_uses_report_defaults():
+    answer = {"response": "A graph DB", "scores": {"faithfulness": 1.0}, "rag_duration_sec": 2.0, "error": "boom"}
+    record = ResultRecord.from_answer("q1", "What is Neo4j?", "vector", "A graph database", answer)
+    assert record.to_row()["contexts"] == ["A graph database"]
+    assert record.error == "boom"
+    assert record.rag_throttle_wait_sec == 0
+    assert record.answer_fields()["scores"] == {"faithfulness": 1.0}
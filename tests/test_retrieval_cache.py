@@ -0,0 +1,104 @@
+import os
+import tempfile
+from types import SimpleNamespace
+from neo4j_graphrag.types import RetrieverResult, RetrieverResultItem
+from src.cache_store import DiskCache
+from src.evaluator import get_retrieval_disk_cache
+from src.retrieval_cache import RetrievalCache, cache_retriever_results, formatter_version
+
+class FakeEmbedder:
+    def embed_query(self, text):
+        return [float(len(text)), 1.0]
+
+def make_retriever(retrieval_query=None):
+    searches = []
+
+    def search(query_text=None, query_vector=None, top_k=5, **kwargs):
+        searches.append({"query_text": query_text, "query_vector": query_vector, "top_k": top_k})
+        items = [RetrieverResultItem(content=f"chunk {i}", metadata={"score": 0.9 - i / 10}) for i in range(top_k)]
+        return RetrieverResult(items=items, metadata={"query_vector": query_vector, "__retriever": "VectorRetriever"})
+
+    retriever = SimpleNamespace(search=search, embedder=FakeEmbedder(), neo4j_database="neo4j",
+                                index_name="chunks", retrieval_query=retrieval_query)
+    return retriever, searches
+
+def open_cache(tmpdir):
+    return RetrievalCache(DiskCache(os.path.join(tmpdir, "cache.sqlite"), namespace="retrieval"))
+
+def test_repeated_search_is_served_from_the_cache():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache = open_cache(tmpdir)
+        retriever, searches = make_retriever()
+        cache_retriever_results(retriever, cache, "movies")
+        first = retriever.search(query_text="Who?", top_k=2)
+        second = retriever.search(query_text="Who?", top_k=2)
+        assert len(searches) == 1
+        # The query is embedded once and passed as a vector
+        assert searches[0]["query_text"] is None
+        assert searches[0]["query_vector"] == [4.0, 1.0]
+        assert [item.content for item in second.items] == [item.content for item in first.items]
+        assert second.items[1].metadata == {"score": 0.8}
+        assert second.metadata["retrieval_cache_hit"] is True
+        assert second.metadata["query_vector"] == [4.0, 1.0]
+        assert cache.stats()["hits"] == 1
+        cache.disk_cache.close()
+
+def test_key_covers_top_k_kg_and_retrieval_query():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache = open_cache(tmpdir)
+        retriever, searches = make_retriever()
+        cache_retriever_results(retriever, cache, "movies")
+        retriever.search(query_text="Who?", top_k=2)
+        retriever.search(query_text="Who?", top_k=3)
+        other_kg, other_kg_searches = make_retriever()
+        cache_retriever_results(other_kg, cache, "people")
+        other_kg.search(query_text="Who?", top_k=2)
+        multi_hop, multi_hop_searches = make_retriever(retrieval_query="RETURN node.text AS text")
+        cache_retriever_results(multi_hop, cache, "movies")
+        multi_hop.search(query_text="Who?", top_k=2)
+        assert (len(searches), len(other_kg_searches), len(multi_hop_searches)) == (2, 1, 1)
+        cache.disk_cache.close()
+
+def test_disabled_or_cleared_cache_runs_the_search():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache = open_cache(tmpdir)
+        retriever, searches = make_retriever()
+        cache_retriever_results(retriever, cache, "movies")
+        retriever.search(query_text="Who?", top_k=2)
+        cache.enabled = False
+        retriever.search(query_text="Who?", top_k=2)
+        assert searches[-1]["query_text"] == "Who?"
+        cache.enabled = True
+        cache.clear()
+        retriever.search(query_text="Who?", top_k=2)
+        assert len(searches) == 3
+        cache.disk_cache.close()
+
+def test_graph_change_clears_only_that_kg():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        config = {"retrieval_cache": {"enabled": True}}
+        movies = RetrievalCache(get_retrieval_disk_cache(config, tmpdir, "movies"))
+        people = RetrievalCache(get_retrieval_disk_cache(config, tmpdir, "people"))
+        movies_retriever, movies_searches = make_retriever()
+        people_retriever, people_searches = make_retriever()
+        cache_retriever_results(movies_retriever, movies, "movies")
+        cache_retriever_results(people_retriever, people, "people")
+        movies_retriever.search(query_text="Who?", top_k=2)
+        people_retriever.search(query_text="Who?", top_k=2)
+        movies.clear()
+        movies_retriever.search(query_text="Who?", top_k=2)
+        people_retriever.search(query_text="Who?", top_k=2)
+        assert (len(movies_searches), len(people_searches)) == (2, 1)
+        movies.disk_cache.close()
+        people.disk_cache.close()
+
+def test_formatter_version_changes_with_its_code():
+    def format_record(record):
+        return record["text"]
+    first = formatter_version(format_record)
+
+    def format_record(record):
+        return record["text"].upper()
+    assert formatter_version(format_record) != first
+    assert first.startswith("test_formatter_version_changes_with_its_code.<locals>.format_record:")
+    assert formatter_version(None) is None
@@ -0,0 +1,128 @@
+import asyncio
+import time
+import pytest
+from src.evaluator import create_rate_limiters
+from src.scheduler import CircuitBreaker, RateLimiter, StageScheduler, TokenBucket, is_retryable_error
+
+class RateLimitError(Exception):
+    status_code = 429
+
+class LLMGenerationError(Exception):
+    pass
+
+def wrapped_rate_limit_error():
+    try:
+        raise RateLimitError("Error code: 429 - rate limited")
+    except RateLimitError as e:
+        return LLMGenerationError(e)
+
+def test_is_retryable_error():
+    assert is_retryable_error(RateLimitError("slow down"))
+    try:
+        raise wrapped_rate_limit_error()
+    except LLMGenerationError as e:
+        assert is_retryable_error(e)
+    assert not is_retryable_error(ValueError("Invalid Cypher"))
+
+def test_token_bucket_waits_when_empty():
+    async def run():
+        bucket = TokenBucket(per_minute=6000)
+        await bucket.acquire(6000)
+        start = time.monotonic()
+        await bucket.acquire(10)
+        return time.monotonic() - start
+    assert asyncio.run(run()) >= 0.09
+
+def test_scheduler_retries_retryable_errors():
+    calls = []
+
+    def flaky(value):
+        calls.append(value)
+        if len(calls) < 3:
+            raise RateLimitError("Error code: 429")
+        return value * 2
+
+    scheduler = StageScheduler("retrieval", 2, max_retries=3, base_delay_sec=0.001)
+    result, throttle_wait_sec = asyncio.run(scheduler.run(flaky, 21))
+    scheduler.shutdown()
+    assert result == 42
+    assert len(calls) == 3
+    assert throttle_wait_sec > 0
+    assert scheduler.stats()["retries"] == 2
+
+def test_scheduler_does_not_retry_other_errors():
+    def broken():
+        raise ValueError("Invalid Cypher")
+
+    scheduler = StageScheduler("retrieval", 1, base_delay_sec=0.001)
+    with pytest.raises(ValueError):
+        asyncio.run(scheduler.run(broken))
+    scheduler.shutdown()
+    assert scheduler.stats()["retries"] == 0
+
+def test_circuit_breaker_opens_after_threshold():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout_sec=0.05)
+    breaker.record_failure()
+    assert breaker.times_opened == 0
+    breaker.record_failure()
+    assert breaker.times_opened == 1
+    start = time.monotonic()
+    asyncio.run(breaker.wait_until_closed())
+    assert time.monotonic() - start >= 0.04
+    breaker.record_success()
+    assert breaker.consecutive_failures == 0
+
+def test_half_open_circuit_lets_one_probe_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout_sec=0.02)
+    breaker.record_failure()
+    started = []
+    in_flight = []
+
+    async def call():
+        probe = await breaker.wait_until_closed()
+        started.append((probe, len(in_flight)))
+        in_flight.append(probe)
+        await asyncio.sleep(0.01)
+        in_flight.remove(probe)
+        # The first probe fails and opens the circuit again; the second closes it
+        if probe and breaker.times_opened == 1:
+            breaker.record_failure(probe)
+        else:
+            breaker.record_success(probe)
+        if probe:
+            breaker.end_probe()
+
+    async def run():
+        await asyncio.gather(*(call() for _ in range(4)))
+
+    asyncio.run(run())
+    # Each probe ran alone; the other callers were released once the circuit closed
+    assert started == [(True, 0), (True, 0), (False, 0), (False, 1)]
+    assert breaker.times_opened == 2
+    assert breaker.state == "closed"
+
+def test_throttle_wait_is_recorded_when_the_call_fails():
+    def broken():
+        raise ValueError("Invalid Cypher")
+
+    scheduler = StageScheduler("retrieval", 1, limiter=RateLimiter(requests_per_minute=6000))
+    scheduler.limiter.requests.tokens = 0
+
+    with pytest.raises(ValueError):
+        asyncio.run(scheduler.run(broken))
+    scheduler.shutdown()
+    assert scheduler.stats()["throttle_wait_sec"] > 0
+
+def test_llm_blocks_with_the_same_model_share_a_limiter():
+    config = {
+        "retrieverLLM": {"model": "gpt-4o", "requests_per_minute": 500},
+        "evaluatorLLM": {"model": "gpt-4o", "requests_per_minute": 300, "tokens_per_minute": 30000},
+    }
+    limiters = create_rate_limiters(config)
+    assert limiters["retrieverLLM"] is limiters["evaluatorLLM"]
+    assert limiters["retrieverLLM"].requests.capacity == 300
+    assert limiters["retrieverLLM"].tokens.capacity == 30000
+    config["evaluatorLLM"]["model"] = "gpt-4o-mini"
+    limiters = create_rate_limiters(config)
+    assert limiters["retrieverLLM"] is not limiters["evaluatorLLM"]
+    assert limiters["retrieverLLM"].requests.capacity == 500
@@ -0,0 +1,68 @@
+import os
+import tempfile
+from types import SimpleNamespace
+import neo4j
+from src.cache_store import DiskCache
+from src.schema_cache import SchemaCache, database_fingerprint
+
+class FakeDriver(neo4j.Driver):
+    def __init__(self, labels=("Person", "Movie")):
+        self._pool = SimpleNamespace(pool_config=SimpleNamespace(user_agent=None), close=lambda: None)
+        self._closed = False
+        self.labels = list(labels)
+        self.fingerprints = 0
+        self.introspections = 0
+
+    def execute_query(self, query_, parameters_=None, routing_=None, database_=None, result_transformer_=None, **kwargs):
+        query_ = getattr(query_, "text", query_)
+        if "db.labels()" in query_:
+            self.fingerprints += 1
+            return [neo4j.Record({"labels": self.labels, "types": ["ACTED_IN"], "property_keys": ["name", "title"]})], None, []
+        if "dbms.components" in query_:
+            return [neo4j.Record({"versions": ["5.26.0"], "edition": "enterprise"})], None, []
+        # get_schema introspection queries; an empty graph is enough here
+        self.introspections += 1
+        return neo4j.EagerResult([], None, [])
+
+    def close(self):
+        self._closed = True
+
+    def __del__(self):
+        # No connections to release
+        pass
+
+def test_fingerprint_ignores_order_and_tracks_new_labels():
+    assert database_fingerprint(FakeDriver(["Person", "Movie"]), "neo4j") == database_fingerprint(FakeDriver(["Movie", "Person"]), "neo4j")
+    assert database_fingerprint(FakeDriver(["Person"]), "neo4j") != database_fingerprint(FakeDriver(["Person", "Movie"]), "neo4j")
+
+def test_schema_is_fetched_once_per_run():
+    driver = FakeDriver()
+    cache = SchemaCache()
+    first = cache.get_schema(driver, "movies", "neo4j")
+    introspections = driver.introspections
+    assert cache.get_schema(driver, "movies", "neo4j") == first
+    assert driver.introspections == introspections
+    assert driver.fingerprints == 1
+    assert [entry["source"] for entry in cache.stats()] == ["database"]
+
+def test_schema_is_reused_across_runs_until_the_database_changes():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        disk_cache = DiskCache(os.path.join(tmpdir, "schemas.sqlite"), namespace="schemas")
+        SchemaCache(disk_cache).get_schema(FakeDriver(), "movies", "neo4j")
+
+        driver = FakeDriver()
+        next_run = SchemaCache(disk_cache)
+        next_run.get_schema(driver, "movies", "neo4j")
+        assert driver.introspections == 0
+        entry = next_run.stats()[0]
+        assert entry["source"] == "cache"
+        assert entry["fetch_ms"] is None
+
+        # A new label changes the fingerprint, and refresh ignores the stored schema
+        changed = FakeDriver(["Person", "Movie", "Genre"])
+        SchemaCache(disk_cache).get_schema(changed, "movies", "neo4j")
+        assert changed.introspections > 0
+        refreshed = FakeDriver()
+        SchemaCache(disk_cache, refresh=True).get_schema(refreshed, "movies", "neo4j")
+        assert refreshed.introspections > 0
+        disk_cache.close()
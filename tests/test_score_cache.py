@@ -0,0 +1,36 @@
+import os
+import tempfile
+from ragas.metrics import Faithfulness, RougeScore
+from src.cache_store import DiskCache
+from src.score_cache import ScoreCache, metric_columns
+
+ROW = {
+    "user_input": "What is Neo4j?",
+    "reference": "A graph database",
+    "response": "Neo4j is a graph database",
+    "contexts": ["A graph database"]
+}
+
+def test_metric_columns():
+    scores = {"faithfulness": 1.0, "rouge_score(mode=fmeasure)": 0.5, "nv_accuracy": 0.75}
+    assert metric_columns(Faithfulness(), scores) == {"faithfulness": 1.0}
+    assert metric_columns(RougeScore(), scores) == {"rouge_score(mode=fmeasure)": 0.5}
+
+def test_score_cache_roundtrip():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        disk_cache = DiskCache(os.path.join(tmpdir, "scores.sqlite"), namespace="scores")
+        cache = ScoreCache(disk_cache, "gpt-4o")
+        rouge = RougeScore()
+        assert cache.lookup(ROW, rouge) is None
+        cache.store(ROW, rouge, {"faithfulness": 1.0, "rouge_score(mode=fmeasure)": 0.5})
+        assert cache.lookup(ROW, rouge) == {"rouge_score(mode=fmeasure)": 0.5}
+        # Only the metric's own columns are stored
+        assert cache.lookup(ROW, Faithfulness()) is None
+        # A different response or judge model is a different entry
+        assert cache.lookup(dict(ROW, response="Something else"), rouge) is None
+        assert ScoreCache(disk_cache, "gpt-4o-mini").lookup(ROW, rouge) is None
+        # A metric with no computed column is not stored
+        cache.store(ROW, Faithfulness(), {})
+        assert cache.lookup(ROW, Faithfulness()) is None
+        assert cache.stats()["entries"] == 1
+        disk_cache.close()
@@ -0,0 +1,56 @@
+import pytest
+from src.questions import Questions, Question, shard_index
+from src.sharding import parse_shard, shard_report_path, merge_reports
+
+def make_questions(count):
+    questions = Questions()
+    for i in range(count):
+        questions.add_question(Question(f"q{i}", f"question {i}", f"answer {i}"))
+    return questions
+
+def test_parse_shard():
+    assert parse_shard("0/4") == (0, 4)
+    assert parse_shard("3/4") == (3, 4)
+    for spec in ("4/4", "-1/4", "1", "a/b", "0/0"):
+        with pytest.raises(ValueError):
+            parse_shard(spec)
+
+def test_shards_partition_questions():
+    questions = make_questions(50)
+    shards = [questions.get_shard(i, 4) for i in range(4)]
+    ids = [question_id for shard in shards for question_id in shard.get_questions()]
+    assert sorted(ids) == sorted(questions.get_questions())
+    # The split only depends on the id
+    assert shard_index("q7", 4) == shard_index("q7", 4)
+    assert "q7" in shards[shard_index("q7", 4)].get_questions()
+
+def test_shard_report_path():
+    assert shard_report_path("reports/pg_20250101_120000.json", 1, 4) == "reports/pg_20250101_120000_shard1of4.json"
+
+def make_report(questions, start, duration, shard):
+    return {
+        "metadata": {
+            "date_run": "2025-01-01", "start_time_epoch": start, "total_duration_sec": duration,
+            "kg_config": {"neo4j_password": "***"}, "config": {"metrics": []}, "shard": shard
+        },
+        "report": [
+            {"question": q, "reference": "ref", "retrievers": [
+                {"name": "vector", "answers": [{"response": "r", "scores": {"faithfulness": 1.0}, "rag_duration_sec": 1.0, "latency_phase": "warm"}]}
+            ]}
+            for q in questions
+        ]
+    }
+
+def test_merge_reports():
+    shard0 = make_report(["question 2", "question 0"], start=1000.0, duration=30.0, shard={"index": 0, "count": 2})
+    shard1 = make_report(["question 1"], start=1005.0, duration=60.0, shard={"index": 1, "count": 2})
+    merged = merge_reports([shard0, shard1], ["s0.json", "s1.json"], ["question 0", "question 1", "question 2"])
+    assert [q["question"] for q in merged["report"]] == ["question 0", "question 1", "question 2"]
+    metadata = merged["metadata"]
+    assert metadata["start_time_epoch"] == 1000.0
+    assert metadata["total_duration_sec"] == 65.0
+    assert metadata["total_duration"] == "01m :05s"
+    assert [shard["report"] for shard in metadata["shards"]] == ["s0.json", "s1.json"]
+    assert metadata["shards"][1]["total_duration_sec"] == 60.0
+    assert "config" not in metadata["shards"][0]
+    assert metadata["latency_by_phase"]["vector"]["warm"]["count"] == 3
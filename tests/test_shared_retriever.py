@@ -0,0 +1,79 @@
+import threading
+import pytest
+from neo4j_graphrag.types import RetrieverResult, RetrieverResultItem
+from src.shared_retriever import SharedTopKSearch
+
+class CountingRetriever:
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def search(self, query_text, top_k, **kwargs):
+        with self.lock:
+            self.calls.append((query_text, top_k))
+        items = [RetrieverResultItem(content=f"{query_text} {i}") for i in range(top_k)]
+        return RetrieverResult(items=items, metadata={})
+
+def test_one_search_per_query_sliced_per_member():
+    inner = CountingRetriever()
+    shared = SharedTopKSearch(inner, max_top_k=5, member_count=2)
+    small = shared.search("q1", top_k=1)
+    large = shared.search("q1", top_k=5)
+    assert inner.calls == [("q1", 5)]
+    assert [item.content for item in small.items] == ["q1 0"]
+    assert len(large.items) == 5
+    assert shared._pending == {}
+
+def test_concurrent_members_share_the_search():
+    inner = CountingRetriever()
+    shared = SharedTopKSearch(inner, max_top_k=4, member_count=4)
+    results = {}
+
+    def run(top_k):
+        results[top_k] = shared.search("q1", top_k=top_k)
+
+    threads = [threading.Thread(target=run, args=(top_k,)) for top_k in (1, 2, 3, 4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert inner.calls == [("q1", 4)]
+    assert {top_k: len(result.items) for top_k, result in results.items()} == {1: 1, 2: 2, 3: 3, 4: 4}
+
+def test_questions_with_the_same_text_are_searched_separately():
+    inner = CountingRetriever()
+    shared = SharedTopKSearch(inner, max_top_k=5, member_count=2)
+    shared.search("q1", top_k=1, question_id="a")
+    shared.search("q1", top_k=1, question_id="b")
+    assert inner.calls == [("q1", 5), ("q1", 5)]
+
+def test_finished_search_is_not_reused_by_a_new_round():
+    inner = CountingRetriever()
+    shared = SharedTopKSearch(inner, max_top_k=5, member_count=2)
+    # The other member was skipped, e.g. by --resume
+    shared.search("q1", top_k=1, question_id="a")
+    shared.search("q1", top_k=1, question_id="a")
+    assert inner.calls == [("q1", 5), ("q1", 5)]
+
+def test_failed_search_is_not_reused():
+    class FailingOnce(CountingRetriever):
+        def search(self, query_text, top_k, **kwargs):
+            if not self.calls:
+                self.calls.append((query_text, top_k))
+                raise RuntimeError("timeout")
+            return super().search(query_text, top_k, **kwargs)
+
+    inner = FailingOnce()
+    shared = SharedTopKSearch(inner, max_top_k=5, member_count=2)
+    with pytest.raises(RuntimeError):
+        shared.search("q1", top_k=1, question_id="a")
+    assert len(shared.search("q1", top_k=5, question_id="a").items) == 5
+    assert len(inner.calls) == 2
+
+def test_results_of_skipped_members_are_bounded():
+    inner = CountingRetriever()
+    shared = SharedTopKSearch(inner, max_top_k=5, member_count=2)
+    shared.MAX_ENTRIES = 3
+    for i in range(10):
+        shared.search(f"q{i}", top_k=1, question_id=str(i))
+    assert list(shared._pending) == [("7", "q7"), ("8", "q8"), ("9", "q9")]
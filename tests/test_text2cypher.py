@@ -0,0 +1,190 @@
+import os
+import tempfile
+from types import SimpleNamespace
+import neo4j
+import pytest
+from neo4j.exceptions import CypherSyntaxError
+from neo4j_graphrag.exceptions import SearchValidationError
+from neo4j_graphrag.llm import LLMInterface, LLMResponse
+from src.cache_store import DiskCache
+from src.text2cypher import GuardedText2CypherRetriever, CypherQueryCache, CypherQueryError, plan_rejection
+
+QUERY = "MATCH (p:Person) RETURN p.name AS name"
+
+def plan(operator, rows, children=()):
+    return {"operatorType": f"{operator}@neo4j", "args": {"EstimatedRows": rows}, "children": list(children)}
+
+class FakeResult:
+    def __init__(self, rows):
+        self.records = [neo4j.Record(row) for row in rows]
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if not self.records:
+            raise StopIteration
+        return self.records.pop(0)
+
+    def peek(self):
+        return self.records[0] if self.records else None
+
+    def keys(self):
+        return ["name"]
+
+    def consume(self):
+        return None
+
+class FakeDriver(neo4j.Driver):
+    def __init__(self, explain_plan=None, explain_error=None, rows=3):
+        self._pool = SimpleNamespace(pool_config=SimpleNamespace(user_agent=None), close=lambda: None)
+        self._closed = False
+        self.explain_plan = explain_plan or plan("ProduceResults", 3.0)
+        self.explain_error = explain_error
+        self.rows = rows
+        self.queries = []
+
+    def execute_query(self, query_, parameters_=None, routing_=None, database_=None, result_transformer_=None, **kwargs):
+        if isinstance(query_, str) and "dbms.components" in query_:
+            return [neo4j.Record({"versions": ["5.26.0"], "edition": "enterprise"})], None, []
+        self.queries.append(query_)
+        if isinstance(query_, str) and query_.startswith("EXPLAIN"):
+            if self.explain_error is not None:
+                raise self.explain_error
+            return [], SimpleNamespace(plan=self.explain_plan), []
+        result = FakeResult([{"name": f"person {i}"} for i in range(self.rows)])
+        if result_transformer_ is not None:
+            return result_transformer_(result)
+        return list(result), None, []
+
+    def close(self):
+        self._closed = True
+
+    def __del__(self):
+        # No connections to release
+        pass
+
+class FakeLLM(LLMInterface):
+    def __init__(self):
+        super().__init__(model_name="fake")
+        self.prompts = []
+
+    def invoke(self, input, message_history=None, system_instruction=None):
+        self.prompts.append(input)
+        return LLMResponse(content=QUERY)
+
+    async def ainvoke(self, input, message_history=None, system_instruction=None):
+        return self.invoke(input)
+
+def make_retriever(driver, cypher_cache=None, **guards):
+    llm = FakeLLM()
+    retriever = GuardedText2CypherRetriever(
+        driver=driver, llm=llm, neo4j_schema="Person {name: STRING}", examples=["example"],
+        cypher_cache=cypher_cache, **guards
+    )
+    return retriever, llm
+
+def test_plan_rejection():
+    assert plan_rejection(plan("ProduceResults", 10, [plan("NodeByLabelScan", 10)]), 1000) is None
+    assert plan_rejection(plan("ProduceResults", 10, [plan("Create", 1)]), 1000) == "plan writes to the graph (Create)"
+    reason = plan_rejection(plan("ProduceResults", 10, [plan("CartesianProduct", 5e6)]), 1000)
+    assert reason == "CartesianProduct is estimated at 5000000 rows, over the limit of 1000"
+    assert plan_rejection(plan("CartesianProduct", 5e6), None) is None
+
+def test_checked_query_runs_with_timeout_and_row_limit():
+    driver = FakeDriver(rows=5)
+    retriever, _ = make_retriever(driver, query_timeout_sec=30, max_rows=2)
+    result = retriever.search(query_text="Who is in the graph?")
+    check = result.metadata["cypher_check"]
+    assert len(result.items) == 2
+    assert check["query"] == QUERY
+    assert check["cache_hit"] is False
+    assert check["plan_check_ms"] is not None
+    assert check["rejected"] is None
+    assert check["truncated"] is True
+    assert driver.queries[0] == f"EXPLAIN {QUERY}"
+    assert driver.queries[1].text == QUERY
+    assert driver.queries[1].timeout == 30
+
+def test_explosive_plan_is_rejected_before_running():
+    driver = FakeDriver(explain_plan=plan("ProduceResults", 1, [plan("CartesianProduct", 1e9)]))
+    retriever, _ = make_retriever(driver, max_estimated_rows=1000)
+    with pytest.raises(CypherQueryError) as error:
+        retriever.search(query_text="Everything times everything")
+    assert "CartesianProduct" in error.value.cypher_check["rejected"]
+    assert len(driver.queries) == 1
+
+def test_invalid_query_is_rejected():
+    driver = FakeDriver(explain_error=CypherSyntaxError._hydrate_neo4j(
+        code="Neo.ClientError.Statement.SyntaxError", message="Invalid input 'MATC'"
+    ))
+    retriever, _ = make_retriever(driver)
+    with pytest.raises(CypherQueryError) as error:
+        retriever.search(query_text="Who?")
+    assert error.value.cypher_check["rejected"] == "invalid Cypher: Invalid input 'MATC'"
+
+def test_cache_skips_generation_and_plan_check():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache = CypherQueryCache(DiskCache(os.path.join(tmpdir, "cache.sqlite"), namespace="cypher"))
+        driver = FakeDriver()
+        retriever, llm = make_retriever(driver, cypher_cache=cache)
+        retriever.search(query_text="Who is in the graph?")
+        result = retriever.search(query_text="Who is in the graph?")
+        assert result.metadata["cypher_check"]["cache_hit"] is True
+        assert result.metadata["cypher_check"]["plan_check_ms"] is None
+        assert len(llm.prompts) == 1
+        assert [getattr(query, "text", query) for query in driver.queries] == [f"EXPLAIN {QUERY}", QUERY, QUERY]
+        assert cache.stats()["hits"] == 1
+        # A different schema is a different key
+        retriever.neo4j_schema = "Movie {title: STRING}"
+        retriever.search(query_text="Who is in the graph?")
+        assert len(llm.prompts) == 2
+        cache.disk_cache.close()
+
+def test_rejected_query_is_not_cached():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache = CypherQueryCache(DiskCache(os.path.join(tmpdir, "cache.sqlite"), namespace="cypher"))
+        driver = FakeDriver(explain_plan=plan("Create", 1))
+        retriever, llm = make_retriever(driver, cypher_cache=cache)
+        for _ in range(2):
+            with pytest.raises(CypherQueryError):
+                retriever.search(query_text="Add a person")
+        assert len(llm.prompts) == 2
+        cache.disk_cache.close()
+
+def test_result_under_the_row_limit_is_not_truncated():
+    retriever, _ = make_retriever(FakeDriver(rows=2), max_rows=2)
+    check = retriever.search(query_text="Who?").metadata["cypher_check"]
+    assert check["rows"] == 2
+    assert check["truncated"] is False
+
+def test_unchecked_queries_are_not_cached():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        disk_cache = DiskCache(os.path.join(tmpdir, "cache.sqlite"), namespace="cypher")
+        retriever, _ = make_retriever(FakeDriver(), cypher_cache=CypherQueryCache(disk_cache), explain=False)
+        retriever.search(query_text="Who is in the graph?")
+        assert len(disk_cache) == 0
+        # A later run with the plan check on generates and checks the query itself
+        driver = FakeDriver()
+        retriever, llm = make_retriever(driver, cypher_cache=CypherQueryCache(disk_cache))
+        result = retriever.search(query_text="Who is in the graph?")
+        assert result.metadata["cypher_check"]["cache_hit"] is False
+        assert driver.queries[0] == f"EXPLAIN {QUERY}"
+        disk_cache.close()
+
+def test_tighter_plan_limit_checks_cached_queries_again():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache = CypherQueryCache(DiskCache(os.path.join(tmpdir, "cache.sqlite"), namespace="cypher"))
+        make_retriever(FakeDriver(), cypher_cache=cache, max_estimated_rows=1000)[0].search(query_text="Who?")
+        driver = FakeDriver()
+        retriever, _ = make_retriever(driver, cypher_cache=cache, max_estimated_rows=2)
+        with pytest.raises(CypherQueryError):
+            retriever.search(query_text="Who?")
+        assert driver.queries == [f"EXPLAIN {QUERY}"]
+        cache.disk_cache.close()
+
+def test_empty_question_is_rejected():
+    retriever, llm = make_retriever(FakeDriver())
+    with pytest.raises(SearchValidationError):
+        retriever.search(query_text=None)
+    assert llm.prompts == []
@@ -0,0 +1,147 @@
+import asyncio
+import threading
+import pytest
+from langchain_core.language_models import BaseChatModel
+from langchain_core.prompt_values import StringPromptValue
+from ragas.llms import LangchainLLMWrapper
+from src.tracing import Tracer, TracedDriver, instrument_method, attach_judge_error_handler, collect_judge_errors
+
+class FakeSummary:
+    result_available_after = 3
+    result_consumed_after = 5
+
+class FakeDriver:
+    def __init__(self):
+        self.closed = False
+
+    def execute_query(self, query_, parameters_=None, **kwargs):
+        return [{"n": 1}, {"n": 2}], FakeSummary(), ["n"]
+
+    def close(self):
+        self.closed = True
+
+def test_spans_nest_and_export():
+    tracer = Tracer(keep_spans=True)
+    with tracer.span("rag", retriever="vectorRetriever") as root:
+        with tracer.span("embed"):
+            pass
+        with tracer.span("llm.generate"):
+            pass
+    tree = root.to_dict()
+    assert tree["name"] == "rag"
+    assert tree["attrs"] == {"retriever": "vectorRetriever"}
+    assert [child["name"] for child in tree["children"]] == ["embed", "llm.generate"]
+    assert tree["duration_ms"] >= 0
+    events = tracer.to_chrome_trace()["traceEvents"]
+    assert {event["name"] for event in events} == {"rag", "embed", "llm.generate"}
+    assert all(event["ph"] == "X" for event in events)
+
+def test_accumulated_time_becomes_child_span():
+    tracer = Tracer()
+    with tracer.span("retriever.search") as span:
+        span.accumulate("result_formatter", 0.002)
+        span.accumulate("result_formatter", 0.001)
+    child = span.to_dict()["children"][0]
+    assert child["name"] == "result_formatter"
+    assert abs(child["duration_ms"] - 3.0) < 0.01
+
+def test_spans_are_tracked_per_thread():
+    tracer = Tracer()
+    roots = {}
+
+    def run(name):
+        with tracer.span(name) as root:
+            with tracer.span(f"{name}.child"):
+                pass
+        roots[name] = root.to_dict()
+
+    threads = [threading.Thread(target=run, args=(f"task{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for name, tree in roots.items():
+        assert [child["name"] for child in tree["children"]] == [f"{name}.child"]
+
+def test_traced_driver_records_server_timings():
+    tracer = Tracer()
+    driver = TracedDriver(FakeDriver(), tracer)
+    with tracer.span("retriever.search") as span:
+        records, _, _ = driver.execute_query("MATCH (n) RETURN n", {})
+        # Text2CypherRetriever passes the query by keyword
+        driver.execute_query(query_="MATCH (n) RETURN n")
+    assert len(records) == 2
+    query_span = span.to_dict()["children"][0]
+    assert query_span["attrs"] == {"records": 2, "server_available_after_ms": 3, "server_consumed_after_ms": 5}
+    driver.close()
+    assert driver._driver.closed
+
+def test_instrument_method():
+    tracer = Tracer()
+
+    class LLM:
+        def invoke(self, prompt):
+            return prompt.upper()
+
+    llm = instrument_method(tracer, LLM(), "invoke", "llm.generate", model="gpt-4o")
+    with tracer.span("rag") as root:
+        assert llm.invoke("hi") == "HI"
+    assert root.to_dict()["children"][0] == {"name": "llm.generate", "duration_ms": root.children[0].duration_ms, "attrs": {"model": "gpt-4o"}}
+
+def test_traced_retrievers_are_accepted_by_graphrag():
+    from types import SimpleNamespace
+    import neo4j
+    from neo4j_graphrag.llm import LLMInterface, LLMResponse
+    from src.config_helper import get_retrievers
+
+    class FakeNeo4jDriver(neo4j.Driver):
+        def __init__(self):
+            self._pool = SimpleNamespace(pool_config=SimpleNamespace(user_agent=None), close=lambda: None)
+            self._closed = False
+
+        def execute_query(self, query_, parameters_=None, **kwargs):
+            if "dbms.components" in query_:
+                return [neo4j.Record({"versions": ["5.26.0"], "edition": "enterprise"})], None, []
+            # SHOW VECTOR INDEXES, read through a result transformer
+            return neo4j.EagerResult([neo4j.Record({"labels": ["Chunk"], "properties": ["embedding"], "dimensions": 3})], None, [])
+
+        def __del__(self):
+            # No connections to release
+            pass
+
+    class FakeLLM(LLMInterface):
+        def invoke(self, input, message_history=None, system_instruction=None):
+            return LLMResponse(content="answer")
+
+        async def ainvoke(self, input, message_history=None, system_instruction=None):
+            return self.invoke(input)
+
+    config = {"retrievers": [
+        {"name": "k=1", "type": "vectorRetriever", "params": {"index_name": "chunks"}, "retriever_config": {"top_k": 1}},
+        {"name": "k=5", "type": "vectorRetriever", "params": {"index_name": "chunks"}, "retriever_config": {"top_k": 5}},
+        {"name": "plain", "type": "vectorRetriever", "params": {"index_name": "chunks"}, "retriever_config": {"top_k": 5, "effective_search_ratio": 2}},
+        {"name": "cypher", "type": "vectorCypherRetriever", "params": {"index_name": "chunks", "retrieval_query": "RETURN node.text AS text"}},
+    ]}
+    kg_config = SimpleNamespace(neo4j_database="neo4j")
+    retrievers = get_retrievers(config, kg_config, FakeNeo4jDriver(), FakeLLM(model_name="fake"), embedder=None, tracer=Tracer())
+    assert set(retrievers) == {"k=1", "k=5", "plain", "cypher"}
+    # get_retrievers imports tracing as a top-level module, not as src.tracing
+    assert type(retrievers["cypher"].retriever.driver).__name__ == "TracedDriver"
+
+def test_judge_errors_are_collected_per_block():
+    class RateLimitedChatModel(BaseChatModel):
+        @property
+        def _llm_type(self):
+            return "rate-limited"
+
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+            raise RuntimeError("Error code: 429")
+
+    judge = attach_judge_error_handler(LangchainLLMWrapper(RateLimitedChatModel()))
+    prompt = StringPromptValue(text="Rate this answer")
+    with collect_judge_errors() as errors:
+        with pytest.raises(RuntimeError):
+            asyncio.run(judge.agenerate_text(prompt))
+    with pytest.raises(RuntimeError):
+        asyncio.run(judge.agenerate_text(prompt))
+    assert [str(error) for error in errors] == ["Error code: 429"]